@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class AccountConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'Account'
+
+    def ready(self):
+        from Admin.authentication import connect_signals
+
+        # Drop cached users on save, deactivation and reactivation
+        connect_signals()
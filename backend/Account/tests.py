@@ -1,9 +1,13 @@
-from django.test import TestCase
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
 from rest_framework_simplejwt.tokens import AccessToken
 from Account.models import User
+from Admin.authentication import get_auth_user_mode
+from Login.serializers import MyTokenObtainPairSerializer
 
 
 class RegisterViewTest(APITestCase):
@@ -90,3 +94,58 @@ class SoftDeleteUserTest(APITestCase):
             self.user.isActive
         )  # Check that the user is marked as inactive
         print("Deletion Test Success!")
+
+
+@override_settings(AUTH_USER_CACHE="cache")
+class AuthUserCacheTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="cacheduser",
+            password="password123",
+            email="cacheduser@example.com",
+            first_name="Cached",
+            last_name="User",
+            accType="staff",
+        )
+        token = MyTokenObtainPairSerializer.get_token(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        self.url = reverse("check-auth")
+
+    def test_user_is_cached_between_requests(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertEqual(response.data["username"], "cacheduser")
+
+    def test_save_invalidates_cached_user(self):
+        self.client.get(self.url)
+        self.user.first_name = "Renamed"
+        self.user.save()
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.data["first_name"], "Renamed")
+
+    def test_deactivation_invalidates_cached_user(self):
+        self.client.get(self.url)
+        self.client.put(reverse("Deactivate user", args=[self.user.id]))
+
+        self.assertFalse(self.client.get(self.url).wsgi_request.user.isActive)
+
+    @override_settings(AUTH_USER_CACHE="stateless")
+    def test_stateless_user_comes_from_token(self):
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertEqual(response.data["user_id"], self.user.id)
+        self.assertEqual(response.data["accType"], "staff")
+
+    @override_settings(AUTH_USER_CACHE="off")
+    def test_cache_can_be_turned_off(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(1):
+            self.client.get(self.url)
+
+    def test_cache_is_off_unless_configured(self):
+        with self.settings():
+            del settings.AUTH_USER_CACHE
+            self.assertEqual(get_auth_user_mode(), "off")
@@ -2,14 +2,15 @@ from rest_framework import permissions, status
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.views import APIView
 from rest_framework.response import Response
+from Admin.pagination import list_response
+from Admin.Dashboard.counters import get_counter
 from django.utils import timezone
 from django.contrib.auth.hashers import make_password
 from django.shortcuts import get_object_or_404
 from .serializers import RegisterSerializer, UserSerializer
 from .models import User
 from Admin.AdminPermission import IsAdminUser
-from Admin.authentication import CookieJWTAuthentication
-from rest_framework_simplejwt.authentication import JWTAuthentication
+from Admin.authentication import CachedJWTAuthentication, CookieJWTAuthentication
 import re
 
 
@@ -55,9 +56,12 @@ class UserListView(APIView):
                 )
 
         # Fetch all users based on isActive status, excluding superadmins
-        users = User.objects.filter(isActive=is_active).exclude(accType="superadmin")
-        serializer = UserSerializer(users, many=True)
-        return Response(serializer.data)
+        users = (
+            User.objects.filter(isActive=is_active)
+            .exclude(accType="superadmin")
+            .order_by("-dateCreated")
+        )
+        return list_response(request, users, UserSerializer)
 
     def put(self, request, user_id=None):
         if user_id is not None:
@@ -186,7 +190,7 @@ class ChangePassword(APIView):
 
 
 class CheckAuthenticationView(APIView):
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
@@ -235,7 +239,7 @@ class TotalStaffCount(APIView):
     permission_classes = [AllowAny]
 
     def get(self, request):
-        total_staff = User.objects.count()
+        total_staff = get_counter("total_staff")
         return Response({total_staff}, status=status.HTTP_200_OK)
 
 
@@ -245,7 +249,7 @@ class TotalActiveUserCount(APIView):
 
     def get(self, request):
         # Count the number of active users
-        total_active_users = User.objects.filter(isActive=True).count()
+        total_active_users = get_counter("total_active_users")
         return Response({total_active_users}, status=status.HTTP_200_OK)
 
 
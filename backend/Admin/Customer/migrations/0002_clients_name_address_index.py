@@ -0,0 +1,19 @@
+# Generated by Django 5.1.3 on 2026-10-18 16:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("Customer", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="clients",
+            index=models.Index(
+                fields=["name", "address"], name="CLIENTS_NAME_ADDRESS_IDX"
+            ),
+        ),
+    ]
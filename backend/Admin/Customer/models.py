@@ -9,3 +9,9 @@ class Clients(models.Model):
 
     def __str__(self):
         return self.name
+
+    class Meta:
+        indexes = [
+            # Sales orders look customers up by name and address
+            models.Index(fields=["name", "address"], name="CLIENTS_NAME_ADDRESS_IDX"),
+        ]
@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class DashboardConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "Admin.Dashboard"
+
+    def ready(self):
+        from .counters import connect_signals
+
+        connect_signals()
@@ -0,0 +1,109 @@
+import logging
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from Admin.Delivery.models import InboundDelivery, OutboundDelivery
+from Admin.Logs.models import Logs
+from Admin.Order.Sales_Order.models import SalesOrder
+from Admin.Product.models import Product, ProductCategory
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "dashboard:counter:"
+
+
+User = get_user_model()
+
+# name -> (count query, models whose writes change the count)
+COUNTERS = {
+    "total_products": (lambda: Product.objects.count(), [Product]),
+    "total_categories": (lambda: ProductCategory.objects.count(), [ProductCategory]),
+    "total_staff": (lambda: User.objects.count(), [User]),
+    "total_active_users": (
+        lambda: User.objects.filter(isActive=True).count(),
+        [User],
+    ),
+    "total_logs": (lambda: Logs.objects.count(), [Logs]),
+    "pending_sales_orders": (
+        lambda: SalesOrder.objects.filter(SALES_ORDER_STATUS="Pending").count(),
+        [SalesOrder],
+    ),
+    "pending_outbound_deliveries": (
+        lambda: OutboundDelivery.objects.filter(OUTBOUND_DEL_STATUS="Pending").count(),
+        [OutboundDelivery],
+    ),
+    "pending_inbound_deliveries": (
+        lambda: InboundDelivery.objects.filter(INBOUND_DEL_STATUS="Pending").count(),
+        [InboundDelivery],
+    ),
+}
+
+
+def get_cache():
+    return caches[getattr(settings, "DASHBOARD_CACHE", "default")]
+
+
+def _timeout():
+    # Safety net for writes that bypass signals (bulk_create, update())
+    return getattr(settings, "DASHBOARD_COUNTER_TIMEOUT", 300)
+
+
+def get_counters(names=None):
+    """
+    Returns {name: count} for the given counters, or all of them. Counts are
+    read from the cache in one round trip; only the missing ones are counted
+    in the database and cached.
+    """
+    names = list(names or COUNTERS)
+    cache = get_cache()
+    cached = cache.get_many([KEY_PREFIX + name for name in names])
+
+    values = {}
+    missing = {}
+    for name in names:
+        key = KEY_PREFIX + name
+        if key in cached:
+            values[name] = cached[key]
+        else:
+            count, _ = COUNTERS[name]
+            values[name] = missing[key] = count()
+    if missing:
+        cache.set_many(missing, _timeout())
+    return values
+
+
+def get_counter(name):
+    return get_counters([name])[name]
+
+
+def invalidate_counters(model):
+    """
+    Drops the cached counters that depend on `model`. Called by the signals
+    below; bulk writes, which send no signals, should call it themselves.
+    """
+    keys = [
+        KEY_PREFIX + name
+        for name, (_, models) in COUNTERS.items()
+        if any(issubclass(model, counted) for counted in models)
+    ]
+    if keys:
+        cache = get_cache()
+        cache.delete_many(keys)
+        # A poll between the write and its commit would cache the old count
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def _invalidate(sender, **kwargs):
+    invalidate_counters(sender)
+
+
+def connect_signals():
+    models = {model for _, counted in COUNTERS.values() for model in counted}
+    for model in models:
+        uid = f"dashboard-counters-{model._meta.label}"
+        post_save.connect(_invalidate, sender=model, dispatch_uid=uid)
+        post_delete.connect(_invalidate, sender=model, dispatch_uid=uid)
+    logger.debug(f"Dashboard counters invalidated by {len(models)} models.")
@@ -0,0 +1,57 @@
+from django.core.cache import cache
+from rest_framework.test import APITestCase
+
+from Account.models import User
+from Admin.Logs.models import Logs
+from .counters import COUNTERS
+
+
+class DashboardCountersTest(APITestCase):
+    url = "/dashboard/summary"
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="dashboard",
+            password="testpassword",
+            email="dashboard@example.com",
+            first_name="Dash",
+            last_name="Board",
+        )
+
+    def test_summary_returns_every_counter(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.data), set(COUNTERS))
+        self.assertEqual(response.data["total_staff"], 1)
+        self.assertEqual(response.data["total_logs"], 0)
+
+    def test_cached_summary_costs_no_queries(self):
+        self.client.get(self.url)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+
+    def test_save_and_delete_invalidate_counters(self):
+        self.client.get(self.url)
+
+        log = Logs.objects.create(
+            LLOG_TYPE="User logs", LOG_DESCRIPTION="Created", USER_ID=self.user
+        )
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.data["total_logs"], 1)
+
+        log.delete()
+        self.assertEqual(self.client.get(self.url).data["total_logs"], 0)
+
+    def test_count_views_read_the_cache(self):
+        self.assertEqual(self.client.get("/logs/total/").data, {0})
+
+        Logs.objects.create(
+            LLOG_TYPE="User logs", LOG_DESCRIPTION="Created", USER_ID=self.user
+        )
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get("/logs/total/").data, {1})
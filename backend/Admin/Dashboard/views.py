@@ -0,0 +1,17 @@
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .counters import get_counters
+
+
+class DashboardSummaryView(APIView):
+    """
+    All dashboard counters in one response, served from the cache. When
+    nothing has changed since the last poll no query is run.
+    """
+
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request):
+        return Response(get_counters(), status=status.HTTP_200_OK)
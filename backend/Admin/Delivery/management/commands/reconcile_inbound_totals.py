@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+
+from Admin.Delivery.models import InboundDelivery
+from Admin.Delivery.utils import recalculate_inbound_totals
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes line defect quantities and totals for inbound deliveries, in "
+        "chunks. Meant for nightly reconciliation; deliveries that received more "
+        "than was ordered are reported and left unchanged."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--delivery",
+            type=int,
+            action="append",
+            dest="deliveries",
+            help="Only reconcile this inbound delivery ID (may be repeated).",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=500,
+            help="Deliveries recalculated per transaction (default 500).",
+        )
+
+    def handle(self, *args, **options):
+        deliveries = InboundDelivery.objects.order_by("pk")
+        if options["deliveries"]:
+            deliveries = deliveries.filter(pk__in=options["deliveries"])
+        delivery_ids = list(deliveries.values_list("pk", flat=True))
+
+        chunk_size = max(options["chunk_size"], 1)
+        updated = 0
+        for start in range(0, len(delivery_ids), chunk_size):
+            chunk = delivery_ids[start : start + chunk_size]
+            updated += len(recalculate_inbound_totals(chunk, strict=False))
+
+        skipped = len(delivery_ids) - updated
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Reconciled {updated} inbound deliveries, skipped {skipped}."
+            )
+        )
@@ -75,6 +75,17 @@ class OutboundDelivery(models.Model):
         db_table = "OUTBOUND_DELIVERY"
         verbose_name = "Outbound Delivery"
         verbose_name_plural = "Outbound Deliveries"
+        indexes = [
+            # Status filters and counts, newest first
+            models.Index(
+                fields=["OUTBOUND_DEL_STATUS", "-OUTBOUND_DEL_CREATED"],
+                name="OUTBOUND_DEL_STATUS_IDX",
+            ),
+            # The list and the date range views
+            models.Index(
+                fields=["-OUTBOUND_DEL_CREATED"], name="OUTBOUND_DEL_CREATED_IDX"
+            ),
+        ]
 
 
 def update_status(self, new_status):
@@ -170,6 +181,18 @@ class InboundDelivery(models.Model):
         db_table = "INBOUND_DELIVERY"
         verbose_name = "Inbound Delivery"
         verbose_name_plural = "Inbound Deliveries"
+        indexes = [
+            # Status filters and counts, newest first
+            models.Index(
+                fields=["INBOUND_DEL_STATUS", "-INBOUND_DEL_ORDER_DATE_CREATED"],
+                name="INBOUND_DEL_STATUS_IDX",
+            ),
+            # The list and the date range views
+            models.Index(
+                fields=["-INBOUND_DEL_ORDER_DATE_CREATED"],
+                name="INBOUND_DEL_CREATED_IDX",
+            ),
+        ]
 
 
 class InboundDeliveryDetails(models.Model):
@@ -1,3 +1,75 @@
+from io import StringIO
+from django.core.management import call_command
 from django.test import TestCase
 
-# Create your tests here.
+from Admin.Product.models import Product
+from Admin.test_utils import create_supplier
+from .models import InboundDelivery, InboundDeliveryDetails
+from .utils import recalculate_inbound_totals
+
+
+class InboundTotalsTest(TestCase):
+    def setUp(self):
+        self.supplier = create_supplier()
+        self.product = Product.objects.create(PROD_NAME="Amoxicillin")
+
+    def create_delivery(self, lines, ordered=10, accepted=6, price=50):
+        delivery = InboundDelivery.objects.create(
+            INBOUND_DEL_SUPP_ID=self.supplier,
+            INBOUND_DEL_TOTAL_ORDERED_QTY=ordered * lines,
+        )
+        InboundDeliveryDetails.objects.bulk_create(
+            [
+                InboundDeliveryDetails(
+                    INBOUND_DEL_ID=delivery,
+                    INBOUND_DEL_DETAIL_PROD_ID=self.product,
+                    INBOUND_DEL_DETAIL_PROD_NAME=self.product.PROD_NAME,
+                    INBOUND_DEL_DETAIL_ORDERED_QTY=ordered,
+                    INBOUND_DEL_DETAIL_LINE_QTY_ACCEPT=accepted,
+                    INBOUND_DEL_DETAIL_LINE_PRICE=price,
+                )
+                for _ in range(lines)
+            ]
+        )
+        return delivery
+
+    def test_recalculates_many_deliveries(self):
+        first = self.create_delivery(2)
+        second = self.create_delivery(3, accepted=10)
+
+        totals = recalculate_inbound_totals([first.pk, second.pk])
+        self.assertEqual(totals[first.pk]["INBOUND_DEL_TOTAL_RCVD_QTY"], 12)
+        self.assertEqual(totals[second.pk]["INBOUND_DEL_TOTAL_PRICE"], 150)
+
+        first.refresh_from_db()
+        self.assertEqual(first.INBOUND_DEL_TOTAL_PRICE, 100)
+        self.assertEqual(
+            set(
+                InboundDeliveryDetails.objects.filter(INBOUND_DEL_ID=first).values_list(
+                    "INBOUND_DEL_DETAIL_LINE_QTY_DEFECT", flat=True
+                )
+            ),
+            {4},
+        )
+
+    def test_query_count_is_independent_of_line_count(self):
+        small = self.create_delivery(1)
+        large = [self.create_delivery(20) for _ in range(5)]
+
+        # savepoint, lock, defect update, totals aggregate, bulk update, release
+        with self.assertNumQueries(6):
+            recalculate_inbound_totals([small.pk])
+        with self.assertNumQueries(6):
+            recalculate_inbound_totals([delivery.pk for delivery in large])
+
+    def test_over_received_delivery(self):
+        delivery = self.create_delivery(1)
+        delivery.INBOUND_DEL_TOTAL_ORDERED_QTY = 1
+        delivery.save()
+
+        with self.assertRaises(ValueError):
+            recalculate_inbound_totals([delivery.pk])
+
+        out = StringIO()
+        call_command("reconcile_inbound_totals", stdout=out)
+        self.assertIn("Reconciled 0 inbound deliveries, skipped 1.", out.getvalue())
@@ -1,5 +1,8 @@
+from datetime import datetime, time, timedelta
 from django.db import transaction
-from django.utils.timezone import now
+from django.db.models import F, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils.timezone import make_aware, now
 from .models import InboundDelivery, InboundDeliveryDetails
 import logging
 
@@ -7,108 +10,115 @@ import logging
 logger = logging.getLogger(__name__)
 
 
-def update_inbound_delivery_totals(inbound_delivery_id):
-    try:
-        logger.info(
-            f"Starting update for InboundDelivery with ID: {inbound_delivery_id}"
+def day_range(start_date, end_date=None):
+    """
+    The [start, end) datetimes covering the local days from `start_date` to
+    `end_date` inclusive. Filtering with __gte/__lt on these is the same as a
+    __date lookup but can use an index on the column.
+    """
+    end_date = end_date or start_date
+    start = make_aware(datetime.combine(start_date, time.min))
+    end = make_aware(datetime.combine(end_date + timedelta(days=1), time.min))
+    return start, end
+
+
+def recalculate_inbound_totals(inbound_delivery_ids, strict=True):
+    """
+    Recomputes line defect quantities and delivery totals for many inbound
+    deliveries at once: one UPDATE for the defects, one grouped aggregate for
+    the totals and one bulk update for the deliveries, however many lines
+    there are.
+
+    Deliveries whose received quantity exceeds the ordered quantity raise
+    ValueError when `strict`, otherwise they are logged and left unchanged.
+    Returns {delivery_id: totals} for the deliveries that were updated.
+    """
+    inbound_delivery_ids = list(inbound_delivery_ids)
+    with transaction.atomic():
+        deliveries = InboundDelivery.objects.select_for_update().in_bulk(
+            inbound_delivery_ids
         )
+        missing = set(inbound_delivery_ids) - set(deliveries)
+        if strict and missing:
+            raise ValueError(
+                f"InboundDelivery with ID {', '.join(map(str, missing))} does not exist."
+            )
 
-        with transaction.atomic():
-            # Fetch the InboundDelivery object
-            try:
-                inbound_delivery = InboundDelivery.objects.get(pk=inbound_delivery_id)
-            except InboundDelivery.DoesNotExist:
-                logger.error(
-                    f"InboundDelivery with ID {inbound_delivery_id} does not exist."
-                )
-                raise ValueError(
-                    f"InboundDelivery with ID {inbound_delivery_id} does not exist."
-                )
-
-            logger.info(f"Fetched InboundDelivery with ID {inbound_delivery_id}")
-
-            # Fetch related details
-            details = InboundDeliveryDetails.objects.filter(
-                INBOUND_DEL_ID=inbound_delivery_id
+        details = InboundDeliveryDetails.objects.filter(
+            INBOUND_DEL_ID__in=list(deliveries)
+        )
+        details.update(
+            INBOUND_DEL_DETAIL_LINE_QTY_DEFECT=Greatest(
+                F("INBOUND_DEL_DETAIL_ORDERED_QTY")
+                - Coalesce("INBOUND_DEL_DETAIL_LINE_QTY_ACCEPT", 0),
+                Value(0),
             )
-            logger.info(
-                f"Fetched {details.count()} related details for InboundDelivery ID {inbound_delivery_id}"
+        )
+        line_totals = {
+            row["INBOUND_DEL_ID"]: row
+            for row in details.values("INBOUND_DEL_ID")
+            .annotate(
+                total_price=Sum("INBOUND_DEL_DETAIL_LINE_PRICE"),
+                total_received=Sum("INBOUND_DEL_DETAIL_LINE_QTY_ACCEPT"),
             )
+            .order_by()
+        }
 
-            total_price = 0
-            total_received_qty = 0
-
-            for detail in details:
-                # Calculate line defect quantity
-                line_qty_defect = (
-                    detail.INBOUND_DEL_DETAIL_ORDERED_QTY
-                    - detail.INBOUND_DEL_DETAIL_LINE_QTY_ACCEPT
-                )
-                detail.INBOUND_DEL_DETAIL_LINE_QTY_DEFECT = line_qty_defect
-
-                # Log defect quantity calculation
-                logger.debug(
-                    f"Detail ID {detail.INBOUND_DEL_DETAIL_ID}: Ordered qty - {detail.INBOUND_DEL_DETAIL_ORDERED_QTY}, "
-                    f"Accepted qty - {detail.INBOUND_DEL_DETAIL_LINE_QTY_ACCEPT}, "
-                    f"Defect qty - {line_qty_defect}"
-                )
-
-                # Calculate line price
-                line_price = detail.INBOUND_DEL_DETAIL_LINE_PRICE
-                detail.INBOUND_DEL_DETAIL_LINE_PRICE = line_price
-
-                # Log price calculation
-                logger.debug(
-                    f"Detail ID {detail.INBOUND_DEL_DETAIL_ID}: Line price - {line_price}"
-                )
-
-                # Update total price and total received quantity
-                total_price += line_price
-                total_received_qty += detail.INBOUND_DEL_DETAIL_LINE_QTY_ACCEPT
-
-                # Log total price and received quantity
-                logger.debug(
-                    f"Detail ID {detail.INBOUND_DEL_DETAIL_ID}: Total price so far - {total_price}, "
-                    f"Total received qty so far - {total_received_qty}"
-                )
-
-                # Save the updated detail
-                detail.save()
+        results = {}
+        updated_at = now()
+        for delivery_id, delivery in deliveries.items():
+            row = line_totals.get(delivery_id, {})
+            total_price = row.get("total_price") or 0
+            total_received_qty = row.get("total_received") or 0
 
             # Check for valid deduction before updating the total ordered quantity
-            if inbound_delivery.INBOUND_DEL_TOTAL_ORDERED_QTY < total_received_qty:
-                logger.error(
-                    f"Total received quantity ({total_received_qty}) exceeds ordered quantity "
-                    f"({inbound_delivery.INBOUND_DEL_TOTAL_ORDERED_QTY}) for InboundDelivery ID {inbound_delivery_id}."
+            if delivery.INBOUND_DEL_TOTAL_ORDERED_QTY < total_received_qty:
+                message = (
+                    f"Total received quantity ({total_received_qty}) exceeds ordered "
+                    f"quantity ({delivery.INBOUND_DEL_TOTAL_ORDERED_QTY}) for "
+                    f"InboundDelivery ID {delivery_id}."
                 )
-                raise ValueError(
-                    "Total received quantity exceeds total ordered quantity."
-                )
-
-            # Update the InboundDelivery fields
-            inbound_delivery.INBOUND_DEL_TOTAL_PRICE = total_price
-            inbound_delivery.INBOUND_DEL_TOTAL_RCVD_QTY = total_received_qty
+                if strict:
+                    logger.error(message)
+                    raise ValueError(
+                        "Total received quantity exceeds total ordered quantity."
+                    )
+                logger.warning(message)
+                continue
+
+            delivery.INBOUND_DEL_TOTAL_PRICE = total_price
+            delivery.INBOUND_DEL_TOTAL_RCVD_QTY = total_received_qty
+            delivery.INBOUND_DEL_ORDER_DATE_UPDATED = updated_at
+            results[delivery_id] = {
+                "INBOUND_DEL_TOTAL_PRICE": total_price,
+                "INBOUND_DEL_TOTAL_RCVD_QTY": total_received_qty,
+                "INBOUND_DEL_TOTAL_ORDERED_QTY": delivery.INBOUND_DEL_TOTAL_ORDERED_QTY,
+            }
 
-            # Log totals before saving
-            logger.info(
-                f"Updating InboundDelivery: Total price - {total_price}, "
-                f"Total received qty - {total_received_qty}, "
-                f"Total ordered qty after deduction - {inbound_delivery.INBOUND_DEL_TOTAL_ORDERED_QTY}"
-            )
+        InboundDelivery.objects.bulk_update(
+            [deliveries[delivery_id] for delivery_id in results],
+            [
+                "INBOUND_DEL_TOTAL_PRICE",
+                "INBOUND_DEL_TOTAL_RCVD_QTY",
+                "INBOUND_DEL_ORDER_DATE_UPDATED",
+            ],
+            batch_size=1000,
+        )
 
-            # Save the updated InboundDelivery
-            inbound_delivery.save()
+    logger.info(f"Recalculated totals for {len(results)} inbound deliveries.")
+    return results
 
-            logger.info(
-                f"Successfully updated InboundDelivery with ID {inbound_delivery_id}"
-            )
 
-            return {
-                "message": "InboundDelivery and details updated successfully.",
-                "INBOUND_DEL_TOTAL_PRICE": total_price,
-                "INBOUND_DEL_TOTAL_RCVD_QTY": total_received_qty,
-                "INBOUND_DEL_TOTAL_ORDERED_QTY": inbound_delivery.INBOUND_DEL_TOTAL_ORDERED_QTY,
-            }
+def update_inbound_delivery_totals(inbound_delivery_id):
+    try:
+        totals = recalculate_inbound_totals([inbound_delivery_id])[inbound_delivery_id]
+        logger.info(
+            f"Successfully updated InboundDelivery with ID {inbound_delivery_id}"
+        )
+        return {
+            "message": "InboundDelivery and details updated successfully.",
+            **totals,
+        }
 
     except Exception as e:
         logger.error(
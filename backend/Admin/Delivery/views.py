@@ -1,7 +1,8 @@
 from rest_framework import status, permissions
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.pagination import PageNumberPagination
+from Admin.pagination import KeysetPagination, list_response
+from Admin.Dashboard.counters import get_counter
 from .models import (
     OutboundDelivery,
     OutboundDeliveryDetails,
@@ -21,15 +22,18 @@ from .serializers import (
     CreateOutboundDeliverySerializer,
     UpdateInboundStatus,
 )
+from .utils import day_range
 from datetime import datetime
 from django.utils import timezone
 from django.db import transaction
 from django.shortcuts import get_object_or_404
 from django.http import Http404
 from Admin.Inventory.models import Inventory
+from Admin.Inventory.utils import allocate_fefo, InsufficientInventoryError
 from Admin.Sales.models import SalesInvoice, SalesInvoiceItems, CustomerPayment
 from Admin.Product.models import Product, ProductDetails
 from Account.models import User
+from PHILVETS.routers import ReplicaReadMixin
 
 import logging
 
@@ -40,10 +44,9 @@ class OutboundDeliveryListCreateAPIView(APIView):
     permission_classes = [permissions.AllowAny]
 
     def get(self, request):
-        """List all Outbound Deliveries."""
-        queryset = OutboundDelivery.objects.all()
-        serializer = OutboundDeliverySerializer(queryset, many=True)
-        return Response(serializer.data)
+        """List Outbound Deliveries, paginated or streamed with ?stream=true."""
+        queryset = OutboundDelivery.objects.all().order_by("-OUTBOUND_DEL_CREATED")
+        return list_response(request, queryset, OutboundDeliverySerializer)
 
     def post(self, request):
         """Create a new Outbound Delivery with associated details."""
@@ -93,9 +96,7 @@ class GetTotalOutboundPendingCount(APIView):
 
     def get(self, request):
         try:
-            pending_count = OutboundDelivery.objects.filter(
-                OUTBOUND_DEL_STATUS="Pending"
-            ).count()
+            pending_count = get_counter("pending_outbound_deliveries")
 
             return Response({"pending_total": pending_count}, status=status.HTTP_200_OK)
         except Exception as e:
@@ -128,9 +129,11 @@ class AcceptOutboundDeliveryAPI(APIView):
         try:
             # Start a transaction to ensure atomicity
             with transaction.atomic():
-                # Fetch the OutboundDelivery by pk
+                # Fetch and lock the OutboundDelivery so it is dispatched only once
                 logger.debug(f"Attempting to fetch OutboundDelivery with pk: {pk}")
-                outbound_delivery = get_object_or_404(OutboundDelivery, pk=pk)
+                outbound_delivery = get_object_or_404(
+                    OutboundDelivery.objects.select_for_update(), pk=pk
+                )
                 logger.info(f"Fetched OutboundDelivery: {outbound_delivery}")
 
                 # Get the status from the request data
@@ -148,20 +151,20 @@ class AcceptOutboundDeliveryAPI(APIView):
                     if outbound_delivery.OUTBOUND_DEL_STATUS == "Pending":
                         logger.info("Processing status transition to 'Dispatched'.")
 
-                        # Deduct inventory for all products in the delivery
-                        outbound_delivery_details = (
+                        # Validate every line before touching any stock
+                        outbound_delivery_details = list(
                             outbound_delivery.outbound_details.all()
                         )
                         logger.debug(
                             f"OutboundDeliveryDetails count: {len(outbound_delivery_details)}"
                         )
 
+                        requirements = []
                         for detail in outbound_delivery_details:
-                            product_id = detail.OUTBOUND_DETAILS_PROD_ID
+                            product_id = detail.OUTBOUND_DETAILS_PROD_ID_id
                             quantity_to_deduct = (
                                 detail.OUTBOUND_DETAILS_PROD_QTY_ORDERED
                             )
-                            logger.error(f"Product ID: {product_id}")
 
                             if not product_id:
                                 logger.error(
@@ -185,64 +188,26 @@ class AcceptOutboundDeliveryAPI(APIView):
                                     status=status.HTTP_400_BAD_REQUEST,
                                 )
 
-                            # Fetch inventory batches for the product
-                            inventory_batches = Inventory.objects.filter(
-                                PRODUCT_ID=product_id
-                            ).order_by("EXPIRY_DATE")
-                            logger.debug(
-                                f"Fetched {len(inventory_batches)} inventory batches for product ID {product_id}."
-                            )
-                            logger.error(
-                                f"Inventory batches for product {product_id}: {list(inventory_batches)}"
-                            )
-
-                            if not inventory_batches.exists():
-                                logger.error(
-                                    f"No inventory available for product {product_id}."
-                                )
-                                return Response(
-                                    {
-                                        "error": f"No inventory available for product {product_id}."
-                                    },
-                                    status=status.HTTP_400_BAD_REQUEST,
-                                )
-
-                            total_deducted = 0
-
-                            for batch in inventory_batches:
-                                if total_deducted >= quantity_to_deduct:
-                                    break
-
-                                deduct_from_batch = min(
-                                    batch.QUANTITY_ON_HAND,
-                                    quantity_to_deduct - total_deducted,
-                                )
-                                batch.QUANTITY_ON_HAND -= deduct_from_batch
-                                total_deducted += deduct_from_batch
-
-                                # Set IS_ACTIVE to False if QUANTITY_ON_HAND reaches 0
-                                if batch.QUANTITY_ON_HAND == 0:
-                                    batch.IS_ACTIVE = False
-
-                                batch.save()
-
-                                logger.info(
-                                    f"Deducted {deduct_from_batch} from batch {batch.BATCH_ID} "
-                                    f"for product {batch.PRODUCT_NAME}. Remaining in batch: {batch.QUANTITY_ON_HAND}"
+                            requirements.append(
+                                (
+                                    detail.OUTBOUND_DEL_DETAIL_ID,
+                                    product_id,
+                                    quantity_to_deduct,
                                 )
+                            )
 
-                            if total_deducted < quantity_to_deduct:
-                                logger.error(
-                                    f"Insufficient inventory for product {product_id}. "
-                                    f"Needed: {quantity_to_deduct}, Available: {total_deducted}."
-                                )
-                                return Response(
-                                    {
-                                        "error": f"Insufficient inventory for product {product_id}. "
-                                        f"Needed: {quantity_to_deduct}, Available: {total_deducted}."
-                                    },
-                                    status=status.HTTP_400_BAD_REQUEST,
-                                )
+                        # Deduct inventory for all products in the delivery (FEFO)
+                        try:
+                            allocation_plan = allocate_fefo(
+                                requirements,
+                                reference=f"Outbound Delivery {outbound_delivery.pk}",
+                            )
+                        except InsufficientInventoryError as e:
+                            logger.error(str(e))
+                            return Response(
+                                {"error": str(e)},
+                                status=status.HTTP_400_BAD_REQUEST,
+                            )
 
                         # Update the delivery status
                         outbound_delivery.OUTBOUND_DEL_STATUS = "Dispatched"
@@ -264,7 +229,8 @@ class AcceptOutboundDeliveryAPI(APIView):
 
                         return Response(
                             {
-                                "message": "Outbound Delivery marked as Dispatched, inventory updated, and SalesOrder marked as Completed."
+                                "message": "Outbound Delivery marked as Dispatched, inventory updated, and SalesOrder marked as Completed.",
+                                "allocations": allocation_plan,
                             },
                             status=status.HTTP_200_OK,
                         )
@@ -413,9 +379,7 @@ class GetTotalInboundPendingCount(APIView):
 
     def get(self, request):
         try:
-            pending_count = InboundDelivery.objects.filter(
-                INBOUND_DEL_STATUS="Pending"
-            ).count()
+            pending_count = get_counter("pending_inbound_deliveries")
             return Response({"pending_count": pending_count}, status=status.HTTP_200_OK)
         except Exception as e:
             return Response(
@@ -423,7 +387,7 @@ class GetTotalInboundPendingCount(APIView):
             )
 
 
-class InboundDeliveryPagination(PageNumberPagination):
+class InboundDeliveryPagination(KeysetPagination):
     """
     Custom pagination class for Inbound Deliveries.
     """
@@ -431,22 +395,23 @@ class InboundDeliveryPagination(PageNumberPagination):
     page_size = 10  # Number of records per page
     page_size_query_param = "page_size"
     max_page_size = 100
+    ordering = ("-INBOUND_DEL_ORDER_DATE_CREATED",)  # Keyset order when unordered
 
 
 class InboundDeliveryListCreateAPIView(APIView):
     permission_classes = [permissions.AllowAny]
 
     def get(self, request):
-        # """List all Inbound Deliveries."""
-        queryset = InboundDelivery.objects.all()
-        serializer = InboundDeliverySerializer(queryset, many=True)
-        return Response(serializer.data)
-
-        # queryset = InboundDelivery.objects.all()
-        # paginator = InboundDeliveryPagination()
-        # paginated_queryset = paginator.paginate_queryset(queryset, request)
-        # serializer = InboundDeliverySerializer(paginated_queryset, many=True)
-        # return paginator.get_paginated_response(serializer.data)
+        """List Inbound Deliveries, paginated or streamed with ?stream=true."""
+        queryset = InboundDelivery.objects.all().order_by(
+            "-INBOUND_DEL_ORDER_DATE_CREATED"
+        )
+        return list_response(
+            request,
+            queryset,
+            InboundDeliverySerializer,
+            pagination_class=InboundDeliveryPagination,
+        )
 
     def post(self, request):
         """Create a new Inbound Delivery with details."""
@@ -686,8 +651,10 @@ class InboundDeliveryTodayAPIView(APIView):
             )
 
         # Filter InboundDeliveries by the latest date
+        day_start, day_end = day_range(latest_date)
         inbound_deliveries_latest = InboundDelivery.objects.filter(
-            INBOUND_DEL_ORDER_DATE_CREATED__date=latest_date
+            INBOUND_DEL_ORDER_DATE_CREATED__gte=day_start,
+            INBOUND_DEL_ORDER_DATE_CREATED__lt=day_end,
         )
 
         # Serialize the data
@@ -696,7 +663,7 @@ class InboundDeliveryTodayAPIView(APIView):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class InboundDeliveryDateRangeAPIView(APIView):
+class InboundDeliveryDateRangeAPIView(ReplicaReadMixin, APIView):
     permission_classes = [permissions.AllowAny]
 
     def get(self, request, *args, **kwargs):
@@ -721,9 +688,11 @@ class InboundDeliveryDateRangeAPIView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Filter InboundDeliveries by the date range
+        # Filter InboundDeliveries by the date range, as bounds on the column
+        range_start, range_end = day_range(start_date, end_date)
         inbound_deliveries = InboundDelivery.objects.filter(
-            INBOUND_DEL_ORDER_DATE_CREATED__date__range=[start_date, end_date]
+            INBOUND_DEL_ORDER_DATE_CREATED__gte=range_start,
+            INBOUND_DEL_ORDER_DATE_CREATED__lt=range_end,
         )
 
         if not inbound_deliveries:
@@ -756,8 +725,9 @@ class OutboundDeliveryTodayAPIView(APIView):
             )
 
         # Filter OutboundDeliveries by the latest date
+        day_start, day_end = day_range(latest_date)
         outbound_deliveries_latest = OutboundDelivery.objects.filter(
-            OUTBOUND_DEL_CREATED__date=latest_date
+            OUTBOUND_DEL_CREATED__gte=day_start, OUTBOUND_DEL_CREATED__lt=day_end
         )
 
         # Serialize the data
@@ -766,7 +736,7 @@ class OutboundDeliveryTodayAPIView(APIView):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class OutboundDeliveryDateRangeAPIView(APIView):
+class OutboundDeliveryDateRangeAPIView(ReplicaReadMixin, APIView):
     permission_classes = [permissions.AllowAny]  # Modify permissions as needed
 
     def get(self, request, *args, **kwargs):
@@ -791,9 +761,10 @@ class OutboundDeliveryDateRangeAPIView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Filter OutboundDeliveries by the date range
+        # Filter OutboundDeliveries by the date range, as bounds on the column
+        range_start, range_end = day_range(start_date, end_date)
         outbound_deliveries = OutboundDelivery.objects.filter(
-            OUTBOUND_DEL_CREATED__date__range=[start_date, end_date]
+            OUTBOUND_DEL_CREATED__gte=range_start, OUTBOUND_DEL_CREATED__lt=range_end
         )
 
         if not outbound_deliveries:
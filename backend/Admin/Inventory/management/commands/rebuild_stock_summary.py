@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from Admin.Inventory.utils import rebuild_product_stock
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes the per-product stock summary and PROD_QOH from the inventory "
+        "batches. Run once after deploying the stock ledger, or to repair drift."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--product",
+            type=int,
+            action="append",
+            dest="products",
+            help="Only rebuild this product ID (may be repeated).",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            updated = rebuild_product_stock(options["products"])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt stock for {updated} products."))
@@ -1,8 +1,15 @@
+import re
 from datetime import datetime
 from django.db import models
+from django.db.models import BigIntegerField, Max, Q
+from django.db.models.functions import Cast, Substr
 
 from Admin.Product.models import Product
 from Admin.Delivery.models import InboundDeliveryDetails, InboundDelivery
+from Admin.Sequence.utils import reserve_ids
+
+INVENTORY_SERIES = "inventory"
+BATCH_SERIES = "batch"
 
 
 # Create your models here.
@@ -18,43 +25,42 @@ class Inventory(models.Model):
         related_name="inventory_batches",
     )
     BATCH_ID = models.CharField(max_length=50, unique=True)
-    EXPIRY_DATE = models.DateField(null=True, blank=True)
+    EXPIRY_DATE = models.DateField(null=True, blank=True, db_index=True)
     QUANTITY_ON_HAND = models.PositiveIntegerField()  # Quantity available in stock
     IS_ACTIVE = models.BooleanField(default=True)
     LAST_UPDATED = models.DateTimeField(auto_now=True)
     DATE_CREATED = models.DateTimeField(auto_now_add=True)
 
     def save(self, *args, **kwargs):
-        if not self.INVENTORY_ID:
-            # Generate the next INVENTORY_ID
-            last_inventory = Inventory.objects.order_by("-INVENTORY_ID").first()
-            if last_inventory:
-                last_id = int(last_inventory.INVENTORY_ID[3:])  # Extract numeric part
-                new_id = f"INV{last_id + 1:05d}"  # Increment and format
-            else:
-                new_id = "INV00001"  # Start ID
-            self.INVENTORY_ID = new_id
-
-        if not self.BATCH_ID:
-            # Generate a BATCH_ID starting with MM-YY + ID
-            current_date_prefix = datetime.now().strftime("%m-%y")
-            last_batch = (
-                Inventory.objects.filter(BATCH_ID__startswith=current_date_prefix)
-                .order_by("-BATCH_ID")
-                .first()
-            )
-
-            if last_batch:
-                last_batch_number = int(
-                    last_batch.BATCH_ID.split("-")[-1]
-                )  # Extract numeric part after MM-YY
-                new_batch_id = f"{current_date_prefix}-{last_batch_number + 1:03d}"  # Increment and format
-            else:
-                new_batch_id = f"{current_date_prefix}-001"  # Start with MM-YY-001
-            self.BATCH_ID = new_batch_id
-
+        if not self.INVENTORY_ID or not self.BATCH_ID:
+            Inventory.assign_ids([self])
         super().save(*args, **kwargs)
 
+    @staticmethod
+    def assign_ids(batches):
+        """
+        Fills in INVENTORY_ID and BATCH_ID for the batches that don't have one
+        yet, reserving a block of numbers for each series in a single call so
+        bulk receiving doesn't allocate row by row.
+        """
+        needs_id = [batch for batch in batches if not batch.INVENTORY_ID]
+        numbers = reserve_ids(
+            INVENTORY_SERIES, len(needs_id), seed=last_inventory_number
+        )
+        for batch, number in zip(needs_id, numbers):
+            batch.INVENTORY_ID = f"INV{number:05d}"  # INV00001
+
+        # BATCH_ID is MM-YY plus a counter that restarts every month
+        needs_batch = [batch for batch in batches if not batch.BATCH_ID]
+        prefix = datetime.now().strftime("%m-%y")
+        numbers = reserve_ids(
+            f"{BATCH_SERIES}:{prefix}",
+            len(needs_batch),
+            seed=lambda: last_batch_number(prefix),
+        )
+        for batch, number in zip(needs_batch, numbers):
+            batch.BATCH_ID = f"{prefix}-{number:03d}"  # MM-YY-001
+
     def __str__(self):
         return (
             f"{self.PRODUCT_ID} - Batch {self.BATCH_ID} - Qty: {self.QUANTITY_ON_HAND}"
@@ -64,3 +70,93 @@ class Inventory(models.Model):
         db_table = "PRODUCT_INVENTORY"
         verbose_name = "PRODUCT INVENTORY"
         verbose_name_plural = "PRODUCTS INVENTORY"
+        indexes = [
+            # FEFO allocation and next expiry only look at batches with stock,
+            # the active ones (IS_ACTIVE goes False when a batch runs out)
+            models.Index(
+                fields=["PRODUCT_ID", "EXPIRY_DATE", "DATE_CREATED"],
+                condition=Q(QUANTITY_ON_HAND__gt=0),
+                name="INVENTORY_IN_STOCK_FEFO_IDX",
+            ),
+        ]
+
+
+class StockMovement(models.Model):
+    # Append-only ledger, one row per batch touched by a stock change
+    RECEIPT = "Receipt"
+    DISPATCH = "Dispatch"
+    ISSUE_REPLACEMENT = "Issue Replacement"
+    ISSUE_RETURN = "Issue Return"
+    ADJUSTMENT = "Adjustment"
+    MOVEMENT_TYPES = [
+        (RECEIPT, "Receipt"),
+        (DISPATCH, "Dispatch"),
+        (ISSUE_REPLACEMENT, "Issue Replacement"),
+        (ISSUE_RETURN, "Issue Return"),
+        (ADJUSTMENT, "Adjustment"),
+    ]
+
+    MOVEMENT_ID = models.BigAutoField(primary_key=True)
+    PRODUCT_ID = models.ForeignKey(
+        Product, on_delete=models.CASCADE, related_name="stock_movements"
+    )
+    INVENTORY_ID = models.ForeignKey(
+        Inventory,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="movements",
+    )
+    MOVEMENT_TYPE = models.CharField(max_length=20, choices=MOVEMENT_TYPES)
+    QUANTITY = models.IntegerField()  # Positive for stock in, negative for stock out
+    REFERENCE = models.CharField(max_length=60, null=True, blank=True)
+    CREATED_AT = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.MOVEMENT_TYPE} {self.QUANTITY:+d} - {self.PRODUCT_ID_id}"
+
+    class Meta:
+        db_table = "STOCK_MOVEMENT"
+        verbose_name = "STOCK MOVEMENT"
+        verbose_name_plural = "STOCK MOVEMENTS"
+        indexes = [
+            models.Index(fields=["PRODUCT_ID", "CREATED_AT"]),
+        ]
+
+
+class ProductStock(models.Model):
+    # Per-product on-hand summary maintained from StockMovement
+    PRODUCT = models.OneToOneField(
+        Product, on_delete=models.CASCADE, primary_key=True, related_name="stock"
+    )
+    ON_HAND = models.IntegerField(default=0, db_index=True)
+    NEXT_EXPIRY = models.DateField(null=True, blank=True, db_index=True)
+    LAST_MOVEMENT_AT = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.PRODUCT_id} - On hand: {self.ON_HAND}"
+
+    class Meta:
+        db_table = "PRODUCT_STOCK"
+        verbose_name = "PRODUCT STOCK"
+        verbose_name_plural = "PRODUCTS STOCK"
+
+
+def last_inventory_number():
+    """Highest numeric part of the existing INVnnnnn inventory IDs."""
+    return (
+        Inventory.objects.filter(INVENTORY_ID__regex=r"^INV[0-9]+$")
+        .annotate(number=Cast(Substr("INVENTORY_ID", 4), BigIntegerField()))
+        .aggregate(last=Max("number"))["last"]
+        or 0
+    )
+
+
+def last_batch_number(prefix):
+    """Highest counter used by the existing MM-YY-nnn batch IDs for `prefix`."""
+    return (
+        Inventory.objects.filter(BATCH_ID__regex=rf"^{re.escape(prefix)}-[0-9]+$")
+        .annotate(number=Cast(Substr("BATCH_ID", len(prefix) + 2), BigIntegerField()))
+        .aggregate(last=Max("number"))["last"]
+        or 0
+    )
@@ -1,8 +1,11 @@
 from rest_framework import serializers
-from .models import Inventory
+from .models import Inventory, ProductStock
 
 
 class ProductDetailsSerializer(serializers.ModelSerializer):
+    # Plain ID, the products are looked up together when the delivery is received
+    PRODUCT_ID = serializers.IntegerField(source="PRODUCT_ID_id")
+
     class Meta:
         model = Inventory
         fields = [
@@ -38,3 +41,21 @@ class InventorySerializer(serializers.ModelSerializer):
             "LAST_UPDATED",
             "DATE_CREATED",
         ]
+
+
+class ProductStockSerializer(serializers.ModelSerializer):
+    PRODUCT_NAME = serializers.CharField(source="PRODUCT.PROD_NAME", read_only=True)
+    REORDER_LEVEL = serializers.IntegerField(
+        source="PRODUCT.PROD_RO_LEVEL", read_only=True
+    )
+
+    class Meta:
+        model = ProductStock
+        fields = [
+            "PRODUCT",
+            "PRODUCT_NAME",
+            "ON_HAND",
+            "REORDER_LEVEL",
+            "NEXT_EXPIRY",
+            "LAST_MOVEMENT_AT",
+        ]
@@ -1,3 +1,192 @@
+from datetime import date
+from django.db import connection, transaction
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
 
-# Create your tests here.
+from Admin.Delivery.models import InboundDelivery, InboundDeliveryDetails
+from Admin.Product.models import Product
+from Admin.test_utils import create_batch, create_inbound_delivery, create_supplier
+from .models import Inventory, ProductStock, StockMovement
+from .utils import (
+    allocate_fefo,
+    InsufficientInventoryError,
+    rebuild_product_stock,
+    record_movements,
+)
+
+
+class AllocateFefoTest(TestCase):
+    def setUp(self):
+        self.delivery = create_inbound_delivery()
+        self.product = Product.objects.create(PROD_NAME="Amoxicillin")
+        self.late = self.add_batch(self.product, 10, date(2031, 1, 1))
+        self.early = self.add_batch(self.product, 5, date(2030, 1, 1))
+
+    def add_batch(self, product, quantity, expiry):
+        return create_batch(product, self.delivery, quantity, expiry)
+
+    def test_deducts_earliest_expiry_first(self):
+        with transaction.atomic():
+            plan = allocate_fefo([(1, self.product.pk, 7)])
+
+        self.assertEqual(
+            [(p["inventory_id"], p["quantity"]) for p in plan],
+            [(self.early.pk, 5), (self.late.pk, 2)],
+        )
+        self.early.refresh_from_db()
+        self.late.refresh_from_db()
+        self.product.refresh_from_db()
+        self.assertEqual(self.early.QUANTITY_ON_HAND, 0)
+        self.assertFalse(self.early.IS_ACTIVE)
+        self.assertEqual(self.late.QUANTITY_ON_HAND, 8)
+        self.assertEqual(self.product.PROD_QOH, 8)
+
+    def test_insufficient_stock_writes_nothing(self):
+        with self.assertRaises(InsufficientInventoryError):
+            with transaction.atomic():
+                allocate_fefo([(1, self.product.pk, 10), (2, self.product.pk, 6)])
+
+        self.early.refresh_from_db()
+        self.assertEqual(self.early.QUANTITY_ON_HAND, 5)
+
+    def test_query_count_is_independent_of_line_count(self):
+        products = [Product.objects.create(PROD_NAME=f"Item {i}") for i in range(20)]
+        for product in products:
+            self.add_batch(product, 3, date(2030, 6, 1))
+
+        with transaction.atomic():
+            # lock, bulk update, ledger insert, summary lookup, summary
+            # create + fill, PROD_QOH sync
+            with self.assertNumQueries(7):
+                allocate_fefo([(p.pk, p.pk, 2) for p in products])
+
+
+class StockLedgerTest(TestCase):
+    def setUp(self):
+        self.delivery = create_inbound_delivery()
+        self.product = Product.objects.create(PROD_NAME="Amoxicillin", PROD_RO_LEVEL=5)
+
+    def receive(self, quantity, expiry):
+        batch = create_batch(self.product, self.delivery, quantity, expiry)
+        record_movements([(self.product.pk, batch.pk, quantity)], StockMovement.RECEIPT)
+        return batch
+
+    def test_summary_follows_movements(self):
+        self.receive(10, date(2031, 1, 1))
+        self.receive(4, date(2030, 1, 1))
+        with transaction.atomic():
+            allocate_fefo([(1, self.product.pk, 6)], reference="Outbound Delivery 1")
+
+        stock = ProductStock.objects.get(PRODUCT=self.product)
+        self.product.refresh_from_db()
+        self.assertEqual(stock.ON_HAND, 8)
+        self.assertEqual(stock.NEXT_EXPIRY, date(2031, 1, 1))
+        self.assertEqual(self.product.PROD_QOH, 8)
+        self.assertEqual(
+            sum(StockMovement.objects.values_list("QUANTITY", flat=True)), 8
+        )
+        self.assertEqual(
+            StockMovement.objects.filter(MOVEMENT_TYPE=StockMovement.DISPATCH).count(),
+            2,
+        )
+
+    def test_rebuild_repairs_drift(self):
+        self.receive(10, date(2031, 1, 1))
+        ProductStock.objects.filter(PRODUCT=self.product).update(ON_HAND=99)
+
+        rebuild_product_stock()
+
+        self.assertEqual(ProductStock.objects.get(PRODUCT=self.product).ON_HAND, 10)
+
+    def test_low_stock_reads_summary(self):
+        self.receive(3, date(2031, 1, 1))
+
+        response = self.client.get("/inventory/stock/", {"low_stock": "true"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [row["PRODUCT"] for row in response.json()["results"]], [self.product.pk]
+        )
+
+
+class ReceiveInboundDeliveryTest(APITestCase):
+    def setUp(self):
+        self.supplier = create_supplier()
+
+    def create_delivery(self, lines):
+        delivery = InboundDelivery.objects.create(
+            INBOUND_DEL_SUPP_ID=self.supplier,
+            INBOUND_DEL_TOTAL_ORDERED_QTY=10 * lines,
+        )
+        details = []
+        for i in range(lines):
+            product = Product.objects.create(PROD_NAME=f"Item {i}")
+            InboundDeliveryDetails.objects.create(
+                INBOUND_DEL_ID=delivery,
+                INBOUND_DEL_DETAIL_PROD_ID=product,
+                INBOUND_DEL_DETAIL_PROD_NAME=product.PROD_NAME,
+                INBOUND_DEL_DETAIL_ORDERED_QTY=10,
+            )
+            details.append(
+                {
+                    "PRODUCT_ID": product.pk,
+                    "PRODUCT_NAME": product.PROD_NAME,
+                    "QUANTITY_ON_HAND": 8,
+                    "EXPIRY_DATE": "2030-01-01",
+                    "PRICE": 100,
+                }
+            )
+        return delivery, details
+
+    def receive(self, delivery, details):
+        return self.client.post(
+            reverse("add-product-inventory"),
+            {
+                "INBOUND_DEL_ID": delivery.pk,
+                "details": details,
+                "status": "Delivered",
+                "user": "Receiver",
+            },
+            format="json",
+        )
+
+    def test_receives_every_line(self):
+        delivery, details = self.create_delivery(3)
+        response = self.receive(delivery, details)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["totals"]["INBOUND_DEL_TOTAL_RCVD_QTY"], 24)
+
+        self.assertEqual(Inventory.objects.filter(INBOUND_DEL_ID=delivery).count(), 3)
+        self.assertEqual(StockMovement.objects.count(), 3)
+        line = InboundDeliveryDetails.objects.filter(INBOUND_DEL_ID=delivery).first()
+        self.assertEqual(line.INBOUND_DEL_DETAIL_LINE_QTY_ACCEPT, 8)
+        self.assertEqual(line.INBOUND_DEL_DETAIL_LINE_QTY_DEFECT, 2)
+        self.assertEqual(line.INBOUND_DEL_DETAIL_PROD_ID.PROD_QOH, 8)
+        delivery.refresh_from_db()
+        self.assertEqual(delivery.INBOUND_DEL_STATUS, "Delivered")
+        self.assertEqual(delivery.INBOUND_DEL_TOTAL_PRICE, 300)
+
+    def test_invalid_line_writes_nothing(self):
+        delivery, details = self.create_delivery(2)
+        details[1]["PRICE"] = -1
+        details.append(dict(details[0], PRODUCT_ID=999999))
+
+        response = self.receive(delivery, details)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(len(response.data["errors"]), 2)
+        self.assertFalse(Inventory.objects.exists())
+
+    def test_query_count_is_independent_of_line_count(self):
+        # The first receipt seeds the ID counters
+        self.receive(*self.create_delivery(1))
+
+        counts = []
+        for lines in (2, 40):
+            delivery, details = self.create_delivery(lines)
+            with CaptureQueriesContext(connection) as queries:
+                response = self.receive(delivery, details)
+            self.assertEqual(response.status_code, 201)
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
@@ -4,6 +4,7 @@ from .views import (
     InventoryListView,
     InventorySearchView,
     ExpiringProductsView,
+    StockSummaryView,
 )
 
 urlpatterns = [
@@ -23,4 +24,6 @@ urlpatterns = [
     path("search/", InventorySearchView.as_view(), name="inventory-search"),
     # path for expired soon
     path("expiredsoon/", ExpiringProductsView.as_view(), name="expiring soon"),
+    # path for the per-product stock summary
+    path("stock/", StockSummaryView.as_view(), name="stock-summary"),
 ]
@@ -0,0 +1,435 @@
+from collections import defaultdict
+from django.db.models import (
+    Case,
+    F,
+    IntegerField,
+    Min,
+    OuterRef,
+    Subquery,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from .models import Inventory, ProductStock, StockMovement
+from Admin.Delivery.models import InboundDeliveryDetails
+from Admin.Delivery.utils import recalculate_inbound_totals
+from Admin.Product.models import Product
+from Admin.Search.utils import index_inventory
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class InsufficientInventoryError(ValueError):
+    """Raised when the batches on hand cannot cover a requested quantity."""
+
+    def __init__(self, product_id, needed, available):
+        self.product_id = product_id
+        self.needed = needed
+        self.available = available
+        if available:
+            message = (
+                f"Insufficient inventory for product {product_id}. "
+                f"Needed: {needed}, Available: {available}."
+            )
+        else:
+            message = f"No inventory available for product {product_id}."
+        super().__init__(message)
+
+
+class InvalidReceiptError(ValueError):
+    """
+    Raised when a received delivery fails validation. `errors` lists every
+    problem found, `not_found` is set when the first one is a missing product
+    or delivery line.
+    """
+
+    def __init__(self, errors, not_found=False):
+        self.errors = errors
+        self.not_found = not_found
+        super().__init__(errors[0])
+
+
+def allocate_fefo(requirements, movement_type=StockMovement.DISPATCH, reference=None):
+    """
+    Deducts stock for many lines at once, first-expiry-first-out.
+
+    `requirements` is a list of (line_key, product_id, quantity) tuples. All
+    candidate batches for the products involved are loaded and row-locked in a
+    single query, the deduction is planned in memory and written back with one
+    bulk update. Must be called inside `transaction.atomic()`.
+
+    Returns the allocation plan, a list of dicts recording which batch each
+    line was taken from, and records each deduction in the stock ledger under
+    `movement_type`. `reference` is either one ledger reference for every
+    line or a callable returning the reference for a line key. Raises
+    InsufficientInventoryError before anything is written if any product
+    cannot be covered.
+    """
+    product_ids = {product_id for _, product_id, _ in requirements}
+    if not product_ids:
+        return []
+
+    # Lock every candidate batch up front, in a stable order, so concurrent
+    # dispatches queue on the same rows instead of over-allocating them.
+    batches = (
+        Inventory.objects.select_for_update()
+        .filter(PRODUCT_ID__in=product_ids, QUANTITY_ON_HAND__gt=0)
+        .order_by("PRODUCT_ID", "EXPIRY_DATE", "DATE_CREATED", "INVENTORY_ID")
+    )
+
+    batches_by_product = defaultdict(list)
+    for batch in batches:
+        batches_by_product[batch.PRODUCT_ID_id].append(batch)
+
+    # Check coverage per product first so nothing is deducted on failure
+    needed_by_product = defaultdict(int)
+    for _, product_id, quantity in requirements:
+        needed_by_product[product_id] += quantity
+    for product_id, needed in needed_by_product.items():
+        available = sum(b.QUANTITY_ON_HAND for b in batches_by_product[product_id])
+        if available < needed:
+            raise InsufficientInventoryError(product_id, needed, available)
+
+    plan = []
+    touched = {}
+    for line_key, product_id, quantity in requirements:
+        remaining = quantity
+        for batch in batches_by_product[product_id]:
+            if remaining <= 0:
+                break
+            if batch.QUANTITY_ON_HAND == 0:
+                continue
+
+            deduct_from_batch = min(batch.QUANTITY_ON_HAND, remaining)
+            batch.QUANTITY_ON_HAND -= deduct_from_batch
+            remaining -= deduct_from_batch
+
+            # Set IS_ACTIVE to False if QUANTITY_ON_HAND reaches 0
+            if batch.QUANTITY_ON_HAND == 0:
+                batch.IS_ACTIVE = False
+            touched[batch.pk] = batch
+
+            plan.append(
+                {
+                    "line": line_key,
+                    "product_id": product_id,
+                    "inventory_id": batch.INVENTORY_ID,
+                    "batch_id": batch.BATCH_ID,
+                    "quantity": deduct_from_batch,
+                    "remaining_in_batch": batch.QUANTITY_ON_HAND,
+                }
+            )
+
+    # bulk_update skips auto_now and the post_save QOH signal, the ledger below
+    # brings the stock summary and PROD_QOH up to date instead
+    now = timezone.now()
+    for batch in touched.values():
+        batch.LAST_UPDATED = now
+    Inventory.objects.bulk_update(
+        touched.values(), ["QUANTITY_ON_HAND", "IS_ACTIVE", "LAST_UPDATED"]
+    )
+    line_reference = reference if callable(reference) else lambda line: reference
+    record_movements(
+        [
+            (
+                p["product_id"],
+                p["inventory_id"],
+                -p["quantity"],
+                line_reference(p["line"]),
+            )
+            for p in plan
+        ],
+        movement_type,
+    )
+
+    logger.info(
+        f"FEFO allocation deducted from {len(touched)} batches for "
+        f"{len(requirements)} lines."
+    )
+    return plan
+
+
+def sync_product_qoh(product_ids):
+    """
+    Recomputes PROD_QOH for the given products from their batches in a single
+    UPDATE. Used after bulk writes that bypass the Inventory post_save signal.
+    """
+    return Product.objects.filter(pk__in=product_ids).update(
+        PROD_QOH=Coalesce(
+            Subquery(_batch_total(OuterRef("pk"))), 0, output_field=IntegerField()
+        )
+    )
+
+
+def _batch_total(product_ref):
+    return (
+        Inventory.objects.filter(PRODUCT_ID=product_ref)
+        .values("PRODUCT_ID")
+        .annotate(total=Sum("QUANTITY_ON_HAND"))
+        .values("total")
+    )
+
+
+def _batch_next_expiry(product_ref):
+    return (
+        Inventory.objects.filter(PRODUCT_ID=product_ref, QUANTITY_ON_HAND__gt=0)
+        .values("PRODUCT_ID")
+        .annotate(next_expiry=Min("EXPIRY_DATE"))
+        .values("next_expiry")
+    )
+
+
+def record_movements(movements, movement_type, reference=None):
+    """
+    Appends stock movements to the ledger and applies them to the per-product
+    stock summary.
+
+    `movements` is a list of (product_id, inventory_id, quantity) tuples with a
+    signed quantity, negative for stock leaving. A movement may carry its own
+    reference as a fourth element, overriding `reference`. Call it after the batches
+    themselves have been written, inside the same transaction. The number of
+    queries does not depend on how many movements or products are involved.
+    """
+    rows = [
+        StockMovement(
+            PRODUCT_ID_id=product_id,
+            INVENTORY_ID_id=inventory_id,
+            MOVEMENT_TYPE=movement_type,
+            QUANTITY=quantity,
+            REFERENCE=movement_reference[0] if movement_reference else reference,
+        )
+        for product_id, inventory_id, quantity, *movement_reference in movements
+        if quantity
+    ]
+    if not rows:
+        return []
+    StockMovement.objects.bulk_create(rows)
+
+    deltas = defaultdict(int)
+    for row in rows:
+        deltas[row.PRODUCT_ID_id] += row.QUANTITY
+    apply_stock_deltas(deltas)
+
+    logger.info(
+        f"Recorded {len(rows)} {movement_type} movements for {len(deltas)} products."
+    )
+    return rows
+
+
+def apply_stock_deltas(deltas):
+    """
+    Applies {product_id: quantity change} to ProductStock incrementally and
+    mirrors the new on-hand figure into Product.PROD_QOH.
+    """
+    product_ids = list(deltas)
+    now = timezone.now()
+    existing = set(
+        ProductStock.objects.filter(PRODUCT__in=product_ids).values_list(
+            "PRODUCT", flat=True
+        )
+    )
+
+    missing = [product_id for product_id in product_ids if product_id not in existing]
+    if missing:
+        # No summary yet, start from the batches, which already include the change
+        ProductStock.objects.bulk_create(
+            [ProductStock(PRODUCT_id=product_id) for product_id in missing],
+            ignore_conflicts=True,
+        )
+        ProductStock.objects.filter(PRODUCT__in=missing).update(
+            ON_HAND=Coalesce(
+                Subquery(_batch_total(OuterRef("PRODUCT"))),
+                0,
+                output_field=IntegerField(),
+            ),
+            NEXT_EXPIRY=Subquery(_batch_next_expiry(OuterRef("PRODUCT"))),
+            LAST_MOVEMENT_AT=now,
+        )
+
+    if existing:
+        ProductStock.objects.filter(PRODUCT__in=existing).update(
+            ON_HAND=F("ON_HAND")
+            + Case(
+                *[
+                    When(PRODUCT=product_id, then=Value(deltas[product_id]))
+                    for product_id in existing
+                ],
+                default=Value(0),
+                output_field=IntegerField(),
+            ),
+            NEXT_EXPIRY=Subquery(_batch_next_expiry(OuterRef("PRODUCT"))),
+            LAST_MOVEMENT_AT=now,
+        )
+
+    on_hand = ProductStock.objects.filter(PRODUCT=OuterRef("pk")).values("ON_HAND")
+    Product.objects.filter(pk__in=product_ids).update(PROD_QOH=Subquery(on_hand))
+
+
+def rebuild_product_stock(product_ids=None):
+    """
+    Recomputes ProductStock (and PROD_QOH) from the inventory batches, for the
+    given products or for every product. Returns the number of summaries
+    written.
+    """
+    products = Product.objects.all()
+    if product_ids is not None:
+        products = products.filter(pk__in=product_ids)
+    product_ids = list(products.values_list("pk", flat=True))
+
+    ProductStock.objects.bulk_create(
+        [ProductStock(PRODUCT_id=product_id) for product_id in product_ids],
+        ignore_conflicts=True,
+        batch_size=1000,
+    )
+    updated = ProductStock.objects.filter(PRODUCT__in=product_ids).update(
+        ON_HAND=Coalesce(
+            Subquery(_batch_total(OuterRef("PRODUCT"))),
+            0,
+            output_field=IntegerField(),
+        ),
+        NEXT_EXPIRY=Subquery(_batch_next_expiry(OuterRef("PRODUCT"))),
+    )
+    sync_product_qoh(product_ids)
+    return updated
+
+
+def receive_inbound_delivery(inbound_delivery, details):
+    """
+    Receives every line of an inbound delivery in bulk.
+
+    `details` is the list of received lines (PRODUCT_ID, PRODUCT_NAME,
+    QUANTITY_ON_HAND, EXPIRY_DATE and PRICE). The whole list is validated
+    first, in two queries, and InvalidReceiptError is raised before anything
+    is written. Then the batches get their IDs in one reservation and are
+    inserted with one bulk insert, the delivery lines are updated with one bulk
+    update and the receipts are recorded in the stock ledger. Must be called
+    inside `transaction.atomic()`.
+
+    Returns the created batches and the delivery totals.
+    """
+    product_ids = set()
+    for detail in details:
+        try:
+            product_ids.add(int(detail.get("PRODUCT_ID")))
+        except (TypeError, ValueError):
+            pass
+    products = Product.objects.in_bulk(product_ids)
+    delivery_lines = {
+        line.INBOUND_DEL_DETAIL_PROD_ID_id: line
+        for line in InboundDeliveryDetails.objects.filter(
+            INBOUND_DEL_ID=inbound_delivery,
+            INBOUND_DEL_DETAIL_PROD_ID__in=product_ids,
+        )
+    }
+
+    errors = []  # (message, not_found)
+    batches = []
+    updated_lines = {}
+    for detail in details:
+        label = detail.get("PRODUCT_ID", "Unknown")
+
+        price = detail.get("PRICE")
+        if price is None or not isinstance(price, (int, float)) or price < 0:
+            errors.append(
+                (
+                    f"Invalid PRICE for product {label}. "
+                    "Must be a non-negative number.",
+                    False,
+                )
+            )
+            continue
+
+        quantity = detail.get("QUANTITY_ON_HAND")
+        if not isinstance(quantity, int) or quantity < 0:
+            errors.append(
+                (
+                    f"Invalid QUANTITY_ON_HAND for product {label}. "
+                    "Must be a non-negative whole number.",
+                    False,
+                )
+            )
+            continue
+
+        expiry_date = detail.get("EXPIRY_DATE")
+        if isinstance(expiry_date, str):
+            try:
+                expiry_date = parse_date(expiry_date)
+            except ValueError:
+                expiry_date = None
+            if expiry_date is None:
+                errors.append((f"Invalid EXPIRY_DATE for product {label}.", False))
+                continue
+
+        try:
+            product = products[int(label)]
+        except (KeyError, TypeError, ValueError):
+            errors.append((f"Product with ID {label} not found.", True))
+            continue
+
+        line = delivery_lines.get(product.pk)
+        if line is None:
+            errors.append((f"Delivery detail not found for product {label}.", True))
+            continue
+        if quantity > line.INBOUND_DEL_DETAIL_ORDERED_QTY:
+            errors.append(
+                (
+                    f"Received quantity for product {label} exceeds the ordered "
+                    f"quantity of {line.INBOUND_DEL_DETAIL_ORDERED_QTY}.",
+                    False,
+                )
+            )
+            continue
+
+        batches.append(
+            Inventory(
+                INBOUND_DEL_ID=inbound_delivery,
+                PRODUCT_ID=product,
+                PRODUCT_NAME=detail.get("PRODUCT_NAME"),
+                QUANTITY_ON_HAND=quantity,
+                EXPIRY_DATE=expiry_date,
+            )
+        )
+        line.INBOUND_DEL_DETAIL_LINE_QTY_ACCEPT = quantity
+        line.INBOUND_DEL_DETAIL_LINE_PRICE = price
+        line.INBOUND_DEL_DETAIL_PROD_EXP_DATE = expiry_date
+        updated_lines[line.pk] = line
+
+    if errors:
+        raise InvalidReceiptError(
+            [message for message, _ in errors], not_found=errors[0][1]
+        )
+
+    # bulk_create skips save() and the post_save QOH signal, so IDs are
+    # reserved here and PROD_QOH is kept in step by the stock ledger
+    Inventory.assign_ids(batches)
+    Inventory.objects.bulk_create(batches, batch_size=1000)
+    index_inventory(batches)
+    InboundDeliveryDetails.objects.bulk_update(
+        updated_lines.values(),
+        [
+            "INBOUND_DEL_DETAIL_LINE_QTY_ACCEPT",
+            "INBOUND_DEL_DETAIL_LINE_PRICE",
+            "INBOUND_DEL_DETAIL_PROD_EXP_DATE",
+        ],
+        batch_size=1000,
+    )
+    record_movements(
+        [(b.PRODUCT_ID_id, b.INVENTORY_ID, b.QUANTITY_ON_HAND) for b in batches],
+        StockMovement.RECEIPT,
+        reference=f"Inbound Delivery {inbound_delivery.pk}",
+    )
+
+    # Defect quantities and delivery totals, set-based
+    totals = recalculate_inbound_totals([inbound_delivery.pk])[inbound_delivery.pk]
+    inbound_delivery.INBOUND_DEL_TOTAL_PRICE = totals["INBOUND_DEL_TOTAL_PRICE"]
+    inbound_delivery.INBOUND_DEL_TOTAL_RCVD_QTY = totals["INBOUND_DEL_TOTAL_RCVD_QTY"]
+
+    logger.info(
+        f"Received {len(batches)} batches for Inbound Delivery {inbound_delivery.pk}."
+    )
+    return batches, totals
@@ -5,16 +5,22 @@ from django.utils import timezone
 from rest_framework import status, permissions
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework.pagination import PageNumberPagination
-from .serializers import AddProductInventorySerializer, InventorySerializer
-from .models import Inventory
+from Admin.pagination import KeysetPagination
+from .serializers import (
+    AddProductInventorySerializer,
+    InventorySerializer,
+    ProductStockSerializer,
+)
+from .models import Inventory, ProductStock, StockMovement
+from .utils import InvalidReceiptError, receive_inbound_delivery
 from django.db import transaction
-from django.db.models import Q
+from django.db.models import F, Q
 from rest_framework.generics import GenericAPIView
 
 from Admin.Delivery.models import InboundDeliveryDetails, InboundDelivery
-from Admin.Delivery.utils import update_inbound_delivery_totals
 from Admin.Product.models import Product
+from Admin.Search.models import SearchDocument
+from Admin.Search.utils import search_ids
 from Admin.Order.Purchase.models import PurchaseOrder
 
 logger = logging.getLogger(__name__)
@@ -75,73 +81,22 @@ class AddProductInventoryView(APIView):
                     logger.info(
                         f"Processing inventory entries for {len(details)} items."
                     )
-                    for detail in details:
-                        logger.info(f"Processing detail: {detail}")
-
-                        # Validate PRICE manually
-                        price = detail.get("PRICE")
-                        logger.info(f"Processing Price:{price}")
-                        logger.debug(f"Processing Price:{price}")
-                        if (
-                            price is None
-                            or not isinstance(price, (int, float))
-                            or price < 0
-                        ):
-                            error_message = (
-                                f"Invalid PRICE for product {detail.get('PRODUCT_ID', 'Unknown')}. "
-                                "Must be a non-negative number."
-                            )
-                            logger.error(error_message)
-                            return Response(
-                                {"error": error_message},
-                                status=status.HTTP_400_BAD_REQUEST,
-                            )
-
-                        # Retrieve the Product instance corresponding to PRODUCT_ID
-                        try:
-                            product = Product.objects.get(pk=detail["PRODUCT_ID"])
-                        except Product.DoesNotExist:
-                            error_message = (
-                                f"Product with ID {detail['PRODUCT_ID']} not found."
-                            )
-                            logger.error(error_message)
-                            return Response(
-                                {"error": error_message},
-                                status=status.HTTP_404_NOT_FOUND,
-                            )
-
-                        # Add inventory entry
-                        Inventory.objects.create(
-                            INBOUND_DEL_ID_id=inbound_delivery_id,
-                            PRODUCT_ID=product,  # Use the Product instance here
-                            PRODUCT_NAME=detail["PRODUCT_NAME"],
-                            QUANTITY_ON_HAND=detail["QUANTITY_ON_HAND"],
-                            EXPIRY_DATE=detail.get("EXPIRY_DATE"),
+                    # Validates every line, then writes the batches, delivery
+                    # details, ledger entries and totals in bulk
+                    try:
+                        _, totals = receive_inbound_delivery(
+                            inbound_delivery_obj, details
+                        )
+                    except InvalidReceiptError as e:
+                        logger.error(f"Invalid receipt: {e.errors}")
+                        return Response(
+                            {"error": e.errors[0], "errors": e.errors},
+                            status=(
+                                status.HTTP_404_NOT_FOUND
+                                if e.not_found
+                                else status.HTTP_400_BAD_REQUEST
+                            ),
                         )
-
-                        # Retrieve corresponding InboundDeliveryDetails entry
-                        try:
-                            delivery_detail = InboundDeliveryDetails.objects.get(
-                                INBOUND_DEL_ID=inbound_delivery_id,
-                                INBOUND_DEL_DETAIL_PROD_ID=detail["PRODUCT_ID"],
-                            )
-                        except InboundDeliveryDetails.DoesNotExist:
-                            error_message = f"Delivery detail not found for product {detail['PRODUCT_ID']}."
-                            logger.error(error_message)
-                            return Response(
-                                {"error": error_message},
-                                status=status.HTTP_404_NOT_FOUND,
-                            )
-
-                        # Update delivery detail
-                        delivery_detail.INBOUND_DEL_DETAIL_LINE_QTY_ACCEPT = detail[
-                            "QUANTITY_ON_HAND"
-                        ]
-                        delivery_detail.INBOUND_DEL_DETAIL_LINE_PRICE = price
-                        delivery_detail.INBOUND_DEL_DETAIL_PROD_EXP_DATE = detail[
-                            "EXPIRY_DATE"
-                        ]
-                        delivery_detail.save()
 
                     # Update the status of the Inbound Delivery
                     if new_status == "Delivered":
@@ -170,39 +125,19 @@ class AddProductInventoryView(APIView):
                             status=status.HTTP_400_BAD_REQUEST,
                         )
 
-                    # Save the updated InboundDelivery
+                    # Save the updated InboundDelivery with its new totals
                     inbound_delivery_obj.save()
 
-                    # Update totals
-                    logger.info(
-                        f"Updating totals for Inbound Delivery with ID: {inbound_delivery_id}."
-                    )
-                    totals_update_result = update_inbound_delivery_totals(
-                        inbound_delivery_id
-                    )
-
-                    # Check for errors in totals update
-                    if (
-                        isinstance(totals_update_result, dict)
-                        and "error" in totals_update_result
-                    ):
-                        error_message = f"Error occurred while updating totals: {totals_update_result['error']}"
-                        logger.error(error_message)
-                        return Response(
-                            {
-                                "error": "Failed to update InboundDelivery totals.",
-                                "details": totals_update_result["error"],
-                            },
-                            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                        )
-
                     logger.info(
                         "Inventory entries, delivery details, and totals updated successfully."
                     )
                     return Response(
                         {
                             "message": "Inventory, delivery details, and totals updated successfully.",
-                            "totals": totals_update_result,
+                            "totals": {
+                                "message": "InboundDelivery and details updated successfully.",
+                                **totals,
+                            },
                         },
                         status=status.HTTP_201_CREATED,
                     )
@@ -231,10 +166,11 @@ class AddProductInventoryView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class InventoryPagination(PageNumberPagination):
+class InventoryPagination(KeysetPagination):
     page_size = 20  # Set default page size
     page_size_query_param = "page_size"  # Allow clients to customize page size
     max_page_size = 100  # Limit the maximum number of items per page
+    ordering = ("-DATE_CREATED", "-INVENTORY_ID")  # Keyset order when unordered
 
 
 class InventoryListView(GenericAPIView):
@@ -292,11 +228,30 @@ class InventorySearchView(APIView):
         expiry_date_query = request.query_params.get("expiry_date", None)
 
         # Build the filter dynamically based on provided query parameters
+        # Names and batch IDs are looked up in the search index, without typo
+        # tolerance so a batch ID doesn't match the batches sharing most of it
         filters = Q()
         if product_name_query:
-            filters &= Q(PRODUCT_NAME__icontains=product_name_query)
+            filters &= Q(
+                pk__in=search_ids(
+                    product_name_query,
+                    SearchDocument.INVENTORY,
+                    Inventory.objects.filter(
+                        PRODUCT_NAME__icontains=product_name_query
+                    ).order_by("PRODUCT_NAME"),
+                )
+            )
         if batch_id_query:
-            filters &= Q(BATCH_ID__icontains=batch_id_query)
+            # Batch documents also hold the product name, keep the ID matches
+            filters &= Q(BATCH_ID__icontains=batch_id_query) & Q(
+                pk__in=search_ids(
+                    batch_id_query,
+                    SearchDocument.INVENTORY,
+                    Inventory.objects.filter(
+                        BATCH_ID__icontains=batch_id_query
+                    ).order_by("BATCH_ID"),
+                )
+            )
         if expiry_date_query:
             filters &= Q(EXPIRY_DATE=expiry_date_query)
 
@@ -345,3 +300,37 @@ class ExpiringProductsView(APIView):
         # Serialize the inventory items
         serializer = InventorySerializer(expiring_inventory, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class StockSummaryView(APIView):
+    """
+    Per-product stock read from the ProductStock summary instead of the batches.
+    Supports ?low_stock=true and ?expiring_within=<days>.
+    """
+
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request):
+        queryset = ProductStock.objects.select_related("PRODUCT").order_by("PRODUCT")
+
+        if request.query_params.get("low_stock", "").lower() == "true":
+            queryset = queryset.filter(ON_HAND__lte=F("PRODUCT__PROD_RO_LEVEL"))
+
+        expiring_within = request.query_params.get("expiring_within")
+        if expiring_within:
+            try:
+                days = int(expiring_within)
+            except ValueError:
+                return Response(
+                    {"error": "expiring_within must be a number of days."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            today = timezone.now().date()
+            queryset = queryset.filter(
+                NEXT_EXPIRY__gte=today, NEXT_EXPIRY__lte=today + timedelta(days=days)
+            )
+
+        paginator = InventoryPagination()
+        page = paginator.paginate_queryset(queryset, request)
+        serializer = ProductStockSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
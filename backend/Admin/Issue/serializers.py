@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from .models import DeliveryIssue, DeliveryItemIssue
+from .utils import delivery_name, delivery_names
 
 
 class DeliveryItemIssueSerializer(serializers.ModelSerializer):
@@ -14,3 +15,24 @@ class DeliveryIssueSerializer(serializers.ModelSerializer):
     class Meta:
         model = DeliveryIssue
         fields = "__all__"
+
+
+class DeliveryIssueListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        # Resolve the delivery names for the whole page (or stream chunk) at once
+        issues = list(data.all() if hasattr(data, "all") else data)
+        self.delivery_names = delivery_names(issues)
+        return super().to_representation(issues)
+
+
+class DeliveryIssueListItemSerializer(DeliveryIssueSerializer):
+    name = serializers.SerializerMethodField()
+
+    class Meta(DeliveryIssueSerializer.Meta):
+        list_serializer_class = DeliveryIssueListSerializer
+
+    def get_name(self, issue):
+        names = getattr(self.parent, "delivery_names", None)
+        if names is None:
+            names = delivery_names([issue])
+        return delivery_name(issue, names)
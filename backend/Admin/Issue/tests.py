@@ -1,3 +1,212 @@
-from django.test import TestCase
+import json
+from datetime import date
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
 
-# Create your tests here.
+from Admin.Customer.models import Clients
+from Admin.Delivery.models import OutboundDelivery, OutboundDeliveryDetails
+from Admin.Inventory.models import Inventory, StockMovement
+from Admin.Order.Sales_Order.models import SalesOrder
+from Admin.Product.models import Product
+from Admin.test_utils import create_batch, create_inbound_delivery
+from .models import DeliveryIssue, DeliveryItemIssue
+
+
+class DeliveryIssueListTest(APITestCase):
+    def setUp(self):
+        customer = Clients.objects.create(
+            name="Happy Paws", address="Main St", province="Cebu"
+        )
+        self.inbound = create_inbound_delivery(INBOUND_DEL_SUPP_NAME="Vet Supplies")
+        self.outbound = OutboundDelivery.objects.create(
+            SALES_ORDER_ID=SalesOrder.objects.create(CLIENT_ID=customer),
+            CLIENT_ID=customer,
+            OUTBOUND_DEL_CUSTOMER_NAME="Happy Paws",
+        )
+
+    def add_issues(self, delivery, count, **fields):
+        content_type = ContentType.objects.get_for_model(delivery)
+        for _ in range(count):
+            issue = DeliveryIssue.objects.create(
+                DELIVERY_TYPE=content_type,
+                DELIVERY_ID=delivery.pk,
+                ISSUE_TYPE="Damaged",
+                **fields,
+            )
+            DeliveryItemIssue.objects.create(ISSUE_NO=issue, ISSUE_QTY_DEFECT=1)
+
+    def list_issues(self, **params):
+        return self.client.get(reverse("issue_list"), params)
+
+    def test_names_come_from_each_delivery_type(self):
+        self.add_issues(self.inbound, 1, ORDER_TYPE="Supplier Delivery")
+        self.add_issues(self.outbound, 1, ORDER_TYPE="Customer Delivery")
+        DeliveryIssue.objects.create(ISSUE_TYPE="Other")
+
+        results = self.list_issues().data["results"]
+        names = ["Uncategorized Delivery", "Happy Paws", "Vet Supplies"]
+        self.assertEqual([issue["name"] for issue in results], names)
+        self.assertEqual(len(results[1]["item_issues"]), 1)
+
+        response = self.list_issues(stream="true")
+        streamed = json.loads(b"".join(response.streaming_content))
+        self.assertEqual([issue["name"] for issue in streamed], names)
+
+    def test_filters(self):
+        self.add_issues(self.inbound, 2, ORDER_TYPE="Supplier Delivery")
+        self.add_issues(self.outbound, 1, STATUS="Resolved")
+
+        self.assertEqual(self.list_issues(status="Resolved").data["count"], 1)
+        self.assertEqual(
+            self.list_issues(order_type="Supplier Delivery").data["count"], 2
+        )
+        self.assertEqual(self.list_issues(issue_type="Expired").data["count"], 0)
+
+    def test_query_count_is_independent_of_issue_count(self):
+        # Warm the ContentType cache
+        self.add_issues(self.inbound, 1)
+        self.add_issues(self.outbound, 1)
+        self.list_issues()
+
+        counts = []
+        for extra in (0, 15):
+            self.add_issues(self.inbound, extra)
+            self.add_issues(self.outbound, extra)
+            with CaptureQueriesContext(connection) as queries:
+                response = self.list_issues(page_size=50)
+            self.assertEqual(len(response.data["results"]), 2 + 2 * extra)
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+
+
+class ResolveIssueTest(APITestCase):
+    def setUp(self):
+        self.customer = Clients.objects.create(
+            name="Happy Paws", address="Main St", province="Cebu"
+        )
+        self.inbound = create_inbound_delivery()
+        self.product = Product.objects.create(PROD_NAME="Amoxicillin")
+        self.early = self.add_batch(5, date(2030, 1, 1))
+        self.late = self.add_batch(10, date(2031, 1, 1))
+
+    def add_batch(self, quantity, expiry, product=None):
+        return create_batch(product or self.product, self.inbound, quantity, expiry)
+
+    def customer_issue(self, quantity):
+        outbound = OutboundDelivery.objects.create(
+            SALES_ORDER_ID=SalesOrder.objects.create(CLIENT_ID=self.customer),
+            CLIENT_ID=self.customer,
+            OUTBOUND_DEL_CUSTOMER_NAME=self.customer.name,
+        )
+        OutboundDeliveryDetails.objects.create(
+            OUTBOUND_DEL_ID=outbound,
+            OUTBOUND_DETAILS_PROD_ID=self.product,
+            OUTBOUND_DETAILS_PROD_NAME=self.product.PROD_NAME,
+            OUTBOUND_DETAILS_PROD_QTY_ACCEPTED=1,
+        )
+        issue = DeliveryIssue.objects.create(
+            ORDER_TYPE="Customer Delivery", ISSUE_TYPE="Damaged"
+        )
+        return {
+            "Issue No": issue.pk,
+            "Delivery ID": outbound.pk,
+            "Delivery Type": "Customer Delivery",
+            "Resolution": "Replacement",
+            "items": [
+                {"PROD_ID": self.product.pk, "QTY_DEFECT": quantity, "PRICE": 20}
+            ],
+        }
+
+    def supplier_issue(self, product, quantity):
+        issue = DeliveryIssue.objects.create(
+            ORDER_TYPE="Supplier Delivery", ISSUE_TYPE="Damaged"
+        )
+        return {
+            "Issue No": issue.pk,
+            "Delivery ID": self.inbound.pk,
+            "Delivery Type": "Supplier Delivery",
+            "Resolution": "Replacement",
+            "items": [{"PROD_ID": product.pk, "QTY_DEFECT": quantity}],
+        }
+
+    def resolve_batch(self, issues):
+        return self.client.post(
+            reverse("resolve-issue-batch"), {"issues": issues}, format="json"
+        )
+
+    def test_customer_replacement_uses_fefo(self):
+        data = self.customer_issue(7)
+        response = self.client.post(reverse("resolve-issue"), data, format="json")
+        self.assertEqual(response.status_code, 200)
+
+        report = response.data["report"]
+        self.assertEqual(
+            [(d["inventory_id"], d["quantity"]) for d in report["dispatched"]],
+            [(self.early.pk, 5), (self.late.pk, 2)],
+        )
+        detail = OutboundDeliveryDetails.objects.get(
+            OUTBOUND_DEL_ID=data["Delivery ID"]
+        )
+        self.assertEqual(detail.OUTBOUND_DETAILS_PROD_QTY_ACCEPTED, 8)
+        self.assertEqual(detail.OUTBOUND_DETAIL_LINE_TOTAL, 140)
+        self.assertEqual(
+            set(StockMovement.objects.values_list("REFERENCE", flat=True)),
+            {f"Issue {data['Issue No']}"},
+        )
+        issue = DeliveryIssue.objects.get(pk=data["Issue No"])
+        self.assertEqual((issue.STATUS, issue.IS_RESOLVED), ("Resolved", True))
+
+        # Resolving it again is rejected
+        response = self.client.post(reverse("resolve-issue"), data, format="json")
+        self.assertEqual(response.status_code, 400)
+
+    def test_supplier_replacement_restocks_delivery_batches(self):
+        other = Product.objects.create(PROD_NAME="Ivermectin")
+        response = self.resolve_batch(
+            [self.supplier_issue(self.product, 3), self.supplier_issue(other, 4)]
+        )
+        self.assertEqual(response.status_code, 200)
+
+        returned = response.data["report"]["returned"]
+        self.assertEqual([r["created"] for r in returned], [False, True])
+        self.late.refresh_from_db()
+        self.assertEqual(self.late.QUANTITY_ON_HAND, 13)
+        self.assertEqual(Inventory.objects.get(PRODUCT_ID=other).QUANTITY_ON_HAND, 4)
+        other.refresh_from_db()
+        self.assertEqual(other.PROD_QOH, 4)
+
+    def test_failed_batch_writes_nothing(self):
+        response = self.resolve_batch(
+            [self.customer_issue(2), self.customer_issue(100)]
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(StockMovement.objects.exists())
+        self.assertFalse(DeliveryIssue.objects.filter(STATUS="Resolved").exists())
+
+    def test_batch_entries_must_be_objects(self):
+        response = self.resolve_batch([self.customer_issue(1), "oops"])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["index"], 1)
+        self.assertFalse(DeliveryIssue.objects.filter(STATUS="Resolved").exists())
+
+    def test_query_count_is_independent_of_issue_count(self):
+        # The first run seeds the batch ID counters
+        self.resolve_batch(
+            [self.customer_issue(1), self.supplier_issue(self.product, 1)]
+        )
+
+        counts = []
+        for size in (1, 8):
+            issues = []
+            for _ in range(size):
+                product = Product.objects.create(PROD_NAME="New")
+                issues += [self.customer_issue(1), self.supplier_issue(product, 1)]
+            with CaptureQueriesContext(connection) as queries:
+                response = self.resolve_batch(issues)
+            self.assertEqual(response.status_code, 200)
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
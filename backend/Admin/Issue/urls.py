@@ -5,6 +5,7 @@ from .views import (
     DeliveryItemIssueAPIView,
     DeliveryIssueListAPI,
     ResolveIssueAPIView,
+    ResolveIssueBatchAPIView,
 )
 
 urlpatterns = [
@@ -14,4 +15,8 @@ urlpatterns = [
     path("submit/", DeliveryIssueAPIView.as_view(), name="submit_issue"),
     # path to resolve issue
     path("resolve/", ResolveIssueAPIView.as_view(), name="resolve-issue"),
+    # path to resolve many issues at once
+    path(
+        "resolve/batch/", ResolveIssueBatchAPIView.as_view(), name="resolve-issue-batch"
+    ),
 ]
@@ -0,0 +1,340 @@
+import logging
+from collections import defaultdict
+from decimal import Decimal, InvalidOperation
+from django.contrib.contenttypes.models import ContentType
+from django.utils import timezone
+
+from Admin.Delivery.models import (
+    InboundDelivery,
+    OutboundDelivery,
+    OutboundDeliveryDetails,
+)
+from Admin.Inventory.models import Inventory, StockMovement
+from Admin.Inventory.utils import allocate_fefo, record_movements
+from Admin.Product.models import Product
+from Admin.Search.utils import index_inventory
+from .models import DeliveryIssue
+
+logger = logging.getLogger(__name__)
+
+CUSTOMER_DELIVERY = "Customer Delivery"
+SUPPLIER_DELIVERY = "Supplier Delivery"
+REPLACEMENT = "Replacement"
+OFFSET = "Offset"
+
+UNCATEGORIZED_DELIVERY = "Uncategorized Delivery"
+
+# Field holding the display name for each delivery model an issue can point to
+DELIVERY_NAME_FIELDS = {
+    OutboundDelivery: "OUTBOUND_DEL_CUSTOMER_NAME",  # Customer Delivery
+    InboundDelivery: "INBOUND_DEL_SUPP_NAME",  # Supply Delivery
+}
+
+
+def delivery_names(issues):
+    """
+    Resolves the delivery name of many issues at once. Delivery IDs are grouped
+    by content type and each delivery table is read once, instead of following
+    the GenericForeignKey issue by issue.
+
+    Returns {(content_type_id, delivery_id): name}.
+    """
+    wanted = defaultdict(set)
+    for issue in issues:
+        if issue.DELIVERY_TYPE_id and issue.DELIVERY_ID:
+            wanted[issue.DELIVERY_TYPE_id].add(issue.DELIVERY_ID)
+
+    # Cached by the ContentType manager after the first call
+    content_types = ContentType.objects.get_for_models(*DELIVERY_NAME_FIELDS)
+
+    names = {}
+    for model, name_field in DELIVERY_NAME_FIELDS.items():
+        content_type_id = content_types[model].id
+        if content_type_id not in wanted:
+            continue
+        rows = model.objects.filter(pk__in=wanted[content_type_id]).values_list(
+            "pk", name_field
+        )
+        for delivery_id, name in rows:
+            names[(content_type_id, delivery_id)] = name
+    return names
+
+
+def delivery_name(issue, names):
+    """The issue's delivery name from a delivery_names() lookup."""
+    return names.get(
+        (issue.DELIVERY_TYPE_id, issue.DELIVERY_ID), UNCATEGORIZED_DELIVERY
+    )
+
+
+class IssueResolutionError(ValueError):
+    """Raised when an issue resolution request is invalid. Nothing is written."""
+
+    def __init__(self, message, not_found=False):
+        self.not_found = not_found
+        super().__init__(message)
+
+
+def _issue_reference(issue_no):
+    return f"Issue {issue_no}"
+
+
+def _validate_resolution(resolution):
+    """
+    Normalises one resolution request and returns its replacement lines as
+    (line_key, product_id, quantity, price, product_name) tuples.
+    """
+    if not resolution.get("issue_no") or not resolution.get("delivery_id"):
+        raise IssueResolutionError("Missing required fields")
+    try:
+        issue_no = resolution["issue_no"] = int(resolution["issue_no"])
+        resolution["delivery_id"] = int(resolution["delivery_id"])
+    except (TypeError, ValueError):
+        raise IssueResolutionError("Issue No and Delivery ID must be numbers")
+    if resolution.get("delivery_type") not in (CUSTOMER_DELIVERY, SUPPLIER_DELIVERY):
+        raise IssueResolutionError("Invalid resolution or delivery type")
+    if resolution.get("resolution") not in (REPLACEMENT, OFFSET):
+        raise IssueResolutionError("Invalid resolution or delivery type")
+    if resolution["resolution"] == OFFSET:
+        return []
+
+    items = resolution.get("items")
+    if not isinstance(items, list) or not items:
+        raise IssueResolutionError("Items must be a non-empty list")
+
+    lines = []
+    for index, item in enumerate(items):
+        product_id = item.get("PROD_ID")
+        quantity = item.get("QTY_DEFECT")
+        if not product_id:
+            raise IssueResolutionError("Missing product ID for item.")
+        try:
+            product_id = int(product_id)
+        except (TypeError, ValueError):
+            raise IssueResolutionError(f"Invalid product ID {product_id}.")
+        if not isinstance(quantity, int) or quantity <= 0:
+            raise IssueResolutionError(
+                f"Invalid quantity to deduct for product {product_id}."
+            )
+        try:
+            price = Decimal(str(item.get("PRICE", 0)))
+        except InvalidOperation:
+            raise IssueResolutionError(f"Invalid price for product {product_id}.")
+        lines.append(
+            ((issue_no, index), product_id, quantity, price, item.get("PROD_NAME"))
+        )
+    return lines
+
+
+def resolve_issues(resolutions):
+    """
+    Resolves many delivery issues at once in a constant number of queries.
+
+    Each resolution is a dict with issue_no, delivery_type ("Customer Delivery"
+    or "Supplier Delivery"), delivery_id, resolution ("Replacement" or
+    "Offset") and, for replacements, the defective items (PROD_ID, PROD_NAME,
+    QTY_DEFECT, PRICE).
+
+    - Customer replacements ship new stock: every line of every issue goes
+      through one locked FEFO allocation, shared with outbound dispatch, and
+      the outbound delivery lines are credited with one bulk update.
+    - Supplier replacements put the replaced stock back on the delivery's
+      latest batch for the product, creating a batch where there is none.
+    - Offsets only mark the issue resolved.
+
+    Everything is validated before anything is written. Must be called inside
+    `transaction.atomic()`. Raises IssueResolutionError or
+    InsufficientInventoryError, otherwise returns an adjustment report.
+    """
+    report = {
+        "resolved": [],
+        "dispatched": [],
+        "returned": [],
+        "outbound_details": [],
+    }
+    if not resolutions:
+        return report
+
+    lines = {}
+    for resolution in resolutions:
+        issue_lines = _validate_resolution(resolution)
+        if resolution["issue_no"] in lines:
+            raise IssueResolutionError(
+                f"Issue {resolution['issue_no']} is listed more than once."
+            )
+        lines[resolution["issue_no"]] = issue_lines
+
+    issues = DeliveryIssue.objects.select_for_update().in_bulk(list(lines))
+    for issue_no in lines:
+        if issue_no not in issues:
+            raise IssueResolutionError(
+                f"Issue with ID {issue_no} not found", not_found=True
+            )
+        if issues[issue_no].STATUS == "Resolved":
+            raise IssueResolutionError(f"Issue {issue_no} is already resolved.")
+
+    customer = [
+        r
+        for r in resolutions
+        if r["resolution"] == REPLACEMENT and r["delivery_type"] == CUSTOMER_DELIVERY
+    ]
+    supplier = [
+        r
+        for r in resolutions
+        if r["resolution"] == REPLACEMENT and r["delivery_type"] == SUPPLIER_DELIVERY
+    ]
+    if customer:
+        _replace_to_customers(customer, lines, report)
+    if supplier:
+        _return_from_suppliers(supplier, lines, report)
+
+    for resolution in resolutions:
+        issue = issues[resolution["issue_no"]]
+        issue.STATUS = "Resolved"
+        issue.IS_RESOLVED = True
+        issue.RESOLUTION = resolution["resolution"]
+        report["resolved"].append(issue.pk)
+    DeliveryIssue.objects.bulk_update(
+        issues.values(), ["STATUS", "IS_RESOLVED", "RESOLUTION"]
+    )
+
+    logger.info(
+        f"Resolved {len(report['resolved'])} issues: "
+        f"{len(report['dispatched'])} batch deductions, "
+        f"{len(report['returned'])} batch returns."
+    )
+    return report
+
+
+def _replace_to_customers(resolutions, lines, report):
+    delivery_ids = {r["delivery_id"] for r in resolutions}
+    found = set(
+        OutboundDelivery.objects.filter(pk__in=delivery_ids).values_list(
+            "pk", flat=True
+        )
+    )
+    for resolution in resolutions:
+        if resolution["delivery_id"] not in found:
+            raise IssueResolutionError(
+                "No matching outbound delivery found for the delivery ID."
+            )
+
+    delivery_of = {r["issue_no"]: r["delivery_id"] for r in resolutions}
+    requirements = [
+        (line_key, product_id, quantity)
+        for r in resolutions
+        for line_key, product_id, quantity, _, _ in lines[r["issue_no"]]
+    ]
+    plan = allocate_fefo(
+        requirements,
+        StockMovement.ISSUE_REPLACEMENT,
+        reference=lambda line_key: _issue_reference(line_key[0]),
+    )
+    report["dispatched"] = [dict(entry, issue=entry.pop("line")[0]) for entry in plan]
+
+    # Credit the replaced quantity to the first matching outbound line
+    details = OutboundDeliveryDetails.objects.filter(
+        OUTBOUND_DEL_ID__in=delivery_ids,
+        OUTBOUND_DETAILS_PROD_ID__in={product_id for _, product_id, _ in requirements},
+    ).order_by("-pk")
+    detail_for = {
+        (d.OUTBOUND_DEL_ID_id, d.OUTBOUND_DETAILS_PROD_ID_id): d for d in details
+    }
+    touched = {}
+    for r in resolutions:
+        for _, product_id, quantity, price, _ in lines[r["issue_no"]]:
+            detail = detail_for.get((delivery_of[r["issue_no"]], product_id))
+            if detail is None:
+                continue
+            detail.OUTBOUND_DETAILS_PROD_QTY_ACCEPTED += quantity
+            detail.OUTBOUND_DETAIL_LINE_TOTAL += price * quantity
+            touched[detail.pk] = detail
+            report["outbound_details"].append(
+                {
+                    "issue": r["issue_no"],
+                    "delivery_id": delivery_of[r["issue_no"]],
+                    "product_id": product_id,
+                    "quantity_added": quantity,
+                    "line_total_added": price * quantity,
+                }
+            )
+    OutboundDeliveryDetails.objects.bulk_update(
+        touched.values(),
+        ["OUTBOUND_DETAILS_PROD_QTY_ACCEPTED", "OUTBOUND_DETAIL_LINE_TOTAL"],
+    )
+
+
+def _return_from_suppliers(resolutions, lines, report):
+    delivery_of = {r["issue_no"]: r["delivery_id"] for r in resolutions}
+    product_ids = {
+        product_id
+        for r in resolutions
+        for _, product_id, _, _, _ in lines[r["issue_no"]]
+    }
+    products = Product.objects.in_bulk(product_ids)
+    missing = product_ids - set(products)
+    if missing:
+        raise IssueResolutionError(
+            f"Product with ID {min(missing)} not found.", not_found=True
+        )
+
+    # The most recent batch of each product on each delivery takes the stock
+    batches = (
+        Inventory.objects.select_for_update()
+        .filter(
+            INBOUND_DEL_ID__in=set(delivery_of.values()), PRODUCT_ID__in=product_ids
+        )
+        .order_by("DATE_CREATED", "INVENTORY_ID")
+    )
+    batch_for = {(b.INBOUND_DEL_ID_id, b.PRODUCT_ID_id): b for b in batches}
+
+    now = timezone.now()
+    touched = {}
+    created = {}
+    returned = []
+    for r in resolutions:
+        issue_no = r["issue_no"]
+        for _, product_id, quantity, _, product_name in lines[issue_no]:
+            key = (delivery_of[issue_no], product_id)
+            batch = batch_for.get(key)
+            if batch is None:
+                batch = Inventory(
+                    PRODUCT_ID=products[product_id],
+                    PRODUCT_NAME=product_name or products[product_id].PROD_NAME,
+                    INBOUND_DEL_ID_id=delivery_of[issue_no],
+                    QUANTITY_ON_HAND=0,
+                )
+                batch_for[key] = created[key] = batch
+            elif key not in created:
+                touched[key] = batch
+            batch.QUANTITY_ON_HAND += quantity
+            batch.IS_ACTIVE = True
+            batch.LAST_UPDATED = now
+            returned.append((issue_no, key, quantity))
+
+    # IDs are reserved for every new batch in one call; bulk writes skip the
+    # post_save QOH signal, the ledger below keeps PROD_QOH in step
+    Inventory.assign_ids(list(created.values()))
+    Inventory.objects.bulk_create(created.values())
+    index_inventory(created.values())
+    Inventory.objects.bulk_update(
+        touched.values(), ["QUANTITY_ON_HAND", "IS_ACTIVE", "LAST_UPDATED"]
+    )
+    record_movements(
+        [
+            (key[1], batch_for[key].INVENTORY_ID, quantity, _issue_reference(issue_no))
+            for issue_no, key, quantity in returned
+        ],
+        StockMovement.ISSUE_RETURN,
+    )
+    report["returned"] = [
+        {
+            "issue": issue_no,
+            "product_id": key[1],
+            "inventory_id": batch_for[key].INVENTORY_ID,
+            "batch_id": batch_for[key].BATCH_ID,
+            "quantity": quantity,
+            "created": key in created,
+        }
+        for issue_no, key, quantity in returned
+    ]
@@ -0,0 +1,109 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from Admin.Logs.models import Logs
+from Admin.Logs.utils import (
+    archive_month,
+    archived_months,
+    backfill_log_months,
+    months_before,
+    parse_month,
+    restore_month,
+)
+
+
+def subtract_months(month, count):
+    index = month.year * 12 + month.month - 1 - count
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+class Command(BaseCommand):
+    help = (
+        "Moves months of logs older than the retention period into gzipped "
+        "files under MEDIA_ROOT/log_archive, or restores archived months."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--keep-months",
+            type=int,
+            default=getattr(settings, "LOG_RETENTION_MONTHS", 12),
+            help="Months kept in the database, the current one included.",
+        )
+        parser.add_argument(
+            "--before",
+            help="Archive every month before this one (YYYY-MM) instead.",
+        )
+        parser.add_argument(
+            "--restore",
+            nargs="+",
+            metavar="YYYY-MM",
+            help="Load these archived months back into the database.",
+        )
+        parser.add_argument(
+            "--remove-archive",
+            action="store_true",
+            help="With --restore, delete the archive files once loaded.",
+        )
+        parser.add_argument(
+            "--list", action="store_true", help="List the archived months."
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only print the months that would be archived.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            if options["list"]:
+                for month in archived_months():
+                    self.stdout.write(f"{month:%Y-%m}")
+                return
+            if options["restore"]:
+                self.restore([parse_month(m) for m in options["restore"]], options)
+                return
+            if options["before"]:
+                cutoff = parse_month(options["before"])
+            else:
+                current = timezone.localdate().replace(day=1)
+                cutoff = subtract_months(current, options["keep_months"] - 1)
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        if options["dry_run"]:
+            missing = Logs.objects.filter(LOG_MONTH__isnull=True).count()
+            if missing:
+                self.stdout.write(f"Would fill the month bucket on {missing} logs.")
+        else:
+            filled = backfill_log_months()
+            if filled:
+                self.stdout.write(f"Filled the month bucket on {filled} logs.")
+
+        months = months_before(cutoff)
+        if not months:
+            self.stdout.write(f"No logs before {cutoff:%Y-%m} to archive.")
+            return
+        for month in months:
+            if options["dry_run"]:
+                self.stdout.write(f"{month:%Y-%m}: would be archived")
+                continue
+            count = archive_month(month)
+            self.stdout.write(f"{month:%Y-%m}: archived {count} logs")
+        if not options["dry_run"]:
+            self.stdout.write(self.style.SUCCESS(f"Archived {len(months)} months."))
+
+    def restore(self, months, options):
+        for month in months:
+            try:
+                restored, skipped = restore_month(
+                    month, remove_archive=options["remove_archive"]
+                )
+            except FileNotFoundError as e:
+                raise CommandError(str(e))
+            message = f"{month:%Y-%m}: restored {restored} logs"
+            if skipped:
+                message += f", skipped {skipped} of deleted users"
+            self.stdout.write(message)
+        self.stdout.write(self.style.SUCCESS(f"Restored {len(months)} months."))
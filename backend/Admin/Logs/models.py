@@ -2,16 +2,42 @@ from django.db import models
 from django.utils import timezone
 from Account.models import User
 
+
+def log_month(value):
+    """First day of the month `value` falls in, the bucket a log is stored under."""
+    if timezone.is_aware(value):
+        value = timezone.localtime(value)
+    return value.date().replace(day=1)
+
+
 class Logs(models.Model):
     LLOG_TYPE = models.CharField(max_length=255, blank=False, null=False)
     LOG_DESCRIPTION = models.TextField(blank=False, null=False)
     LOG_DATETIME = models.DateTimeField(default=timezone.now)
+    LOG_MONTH = models.DateField(null=True, blank=True)  # Month bucket, see log_month
     USER_ID = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
         related_name="logs"
     )
 
+    def save(self, *args, **kwargs):
+        self.LOG_MONTH = log_month(self.LOG_DATETIME)
+        super().save(*args, **kwargs)
+
     def __str__(self):
         formatted_datetime = self.LOG_DATETIME.strftime('%B %d, %Y %H:%M')  # Example: "September 20, 2024 08:56"
         return f"{self.LLOG_TYPE} - {self.USER_ID.username} at {formatted_datetime}"
+
+    class Meta:
+        indexes = [
+            # The type lists and the per-user list, newest first
+            models.Index(
+                fields=["LLOG_TYPE", "-LOG_DATETIME", "-id"], name="LOGS_TYPE_DATETIME_IDX"
+            ),
+            models.Index(
+                fields=["USER_ID", "-LOG_DATETIME"], name="LOGS_USER_DATETIME_IDX"
+            ),
+            # Whole months are archived and restored at once
+            models.Index(fields=["LOG_MONTH"], name="LOGS_MONTH_IDX"),
+        ]
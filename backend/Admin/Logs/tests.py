@@ -1,3 +1,313 @@
-from django.test import TestCase
+import os
+import shutil
+import tempfile
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+from unittest import mock
+from django.core.management import call_command
+from django.test import TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
 
-# Create your tests here.
+from Account.models import User
+from Admin.Dashboard.counters import get_counter
+from .models import Logs
+from .utils import AuditLogWriter, archive_path, log_event
+
+
+class LogsKeysetPaginationTest(APITestCase):
+    url = "/logs/logs/user/"
+
+    def setUp(self):
+        user = User.objects.create_user(
+            username="auditor",
+            password="testpassword",
+            email="auditor@example.com",
+            first_name="Audit",
+            last_name="User",
+        )
+        now = timezone.now()
+        # Pairs of logs share a timestamp so the primary key has to break ties
+        Logs.objects.bulk_create(
+            Logs(
+                LLOG_TYPE="User logs",
+                LOG_DESCRIPTION=f"Log {i}",
+                LOG_DATETIME=now - timedelta(minutes=i // 2),
+                USER_ID=user,
+            )
+            for i in range(25)
+        )
+        self.expected = list(
+            Logs.objects.order_by("-LOG_DATETIME", "-id").values_list("id", flat=True)
+        )
+
+    def walk(self, url, link):
+        seen = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            seen.append([row["id"] for row in response.data["results"]])
+            url = response.data[link]
+        return seen
+
+    def test_forward_and_backward_walks_are_stable(self):
+        pages = self.walk(f"{self.url}?cursor=&page_size=10", "next")
+        self.assertEqual([len(page) for page in pages], [10, 10, 5])
+        self.assertEqual(sum(pages, []), self.expected)
+
+        # Walk back from the last page using the previous links
+        response = self.client.get(f"{self.url}?cursor=&page_size=10")
+        last = response.data["next"]
+        while True:
+            next_url = self.client.get(last).data["next"]
+            if not next_url:
+                break
+            last = next_url
+        back = self.walk(last, "previous")
+        self.assertEqual(sum(reversed(back), []), self.expected)
+
+    def test_count_is_opt_in(self):
+        response = self.client.get(f"{self.url}?cursor=")
+        self.assertNotIn("count", response.data)
+
+        # exists() check plus one keyset SELECT, no COUNT(*)
+        with self.assertNumQueries(2):
+            self.client.get(f"{self.url}?cursor=")
+
+        response = self.client.get(f"{self.url}?cursor=&with_count=true")
+        self.assertEqual(response.data["count"], 25)
+
+    def test_page_numbers_still_work(self):
+        response = self.client.get(f"{self.url}?page=2")
+        self.assertEqual(response.data["count"], 25)
+        self.assertEqual(len(response.data["results"]), 10)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(f"{self.url}?cursor=not-a-cursor")
+        self.assertEqual(response.status_code, 404)
+
+
+def make_user(username="writer"):
+    return User.objects.create_user(
+        username=username,
+        password="testpassword",
+        email=f"{username}@example.com",
+        first_name="Log",
+        last_name="Writer",
+    )
+
+
+class AuditLogWriterTest(APITestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.writer = AuditLogWriter(batch_size=2, max_queue=3, background=False)
+
+    def log(self, description):
+        return Logs(
+            LLOG_TYPE="User logs", LOG_DESCRIPTION=description, USER_ID=self.user
+        )
+
+    def test_rows_are_buffered_until_flushed(self):
+        self.assertEqual(get_counter("total_logs"), 0)
+        self.writer.enqueue(self.log("one"))
+        self.writer.enqueue(self.log("two"))
+        self.assertEqual(Logs.objects.count(), 0)
+
+        self.assertEqual(self.writer.flush(), 2)
+        self.assertEqual(Logs.objects.count(), 2)
+        self.assertEqual(get_counter("total_logs"), 2)
+
+    def test_full_buffer_is_written_inline(self):
+        with self.assertLogs("Admin.Logs.utils", "WARNING"):
+            for i in range(4):
+                self.writer.enqueue(self.log(str(i)))
+
+        self.assertEqual(Logs.objects.count(), 4)
+        self.assertEqual(self.writer.buffer, [])
+
+    @override_settings(AUDIT_LOG_ASYNC=True)
+    def test_log_event_queues_on_commit(self):
+        with mock.patch("Admin.Logs.utils.writer", self.writer):
+            with self.captureOnCommitCallbacks(execute=True):
+                log_event("Transaction logs", "Delivery dispatched", self.user)
+            self.assertEqual(len(self.writer.buffer), 1)
+            self.assertEqual(Logs.objects.count(), 0)
+
+            self.writer.flush()
+        self.assertEqual(Logs.objects.get().LOG_DESCRIPTION, "Delivery dispatched")
+
+    @override_settings(AUDIT_LOG_ASYNC=True)
+    def test_post_returns_accepted(self):
+        with mock.patch("Admin.Logs.utils.writer", self.writer):
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(
+                    "/logs/logs/",
+                    {
+                        "LLOG_TYPE": "User logs",
+                        "LOG_DESCRIPTION": "Logged in",
+                        "USER_ID": self.user.pk,
+                    },
+                )
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(len(self.writer.buffer), 1)
+
+    @override_settings(AUDIT_LOG_ASYNC=False)
+    def test_post_writes_inline_when_sync(self):
+        response = self.client.post(
+            "/logs/logs/",
+            {
+                "LLOG_TYPE": "User logs",
+                "LOG_DESCRIPTION": "Logged in",
+                "USER_ID": self.user.pk,
+            },
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["id"], Logs.objects.get().pk)
+
+
+class AuditLogThreadTest(TransactionTestCase):
+    def test_background_thread_flushes_and_drains_on_shutdown(self):
+        user = make_user()
+        writer = AuditLogWriter(batch_size=2, flush_interval=60)
+        self.addCleanup(writer.shutdown)
+
+        def enqueue(description):
+            writer.enqueue(
+                Logs(LLOG_TYPE="User logs", LOG_DESCRIPTION=description, USER_ID=user)
+            )
+
+        # A full batch wakes the thread
+        enqueue("one")
+        enqueue("two")
+        for _ in range(100):
+            if Logs.objects.count() == 2:
+                break
+            writer.thread.join(0.05)
+        self.assertEqual(Logs.objects.count(), 2)
+
+        # A partial batch waits for the interval, or for shutdown
+        enqueue("three")
+        self.assertEqual(Logs.objects.count(), 2)
+        writer.shutdown()
+        self.assertEqual(Logs.objects.count(), 3)
+        self.assertIsNone(writer.thread)
+
+
+class LogArchiveTest(APITestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        media = override_settings(MEDIA_ROOT=self.media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+        self.user = make_user()
+        for month, count in [(1, 3), (2, 2), (3, 1)]:
+            for i in range(count):
+                Logs.objects.create(
+                    LLOG_TYPE="User logs",
+                    LOG_DESCRIPTION=f"{month}-{i}",
+                    LOG_DATETIME=datetime(2024, month, 10 + i, tzinfo=dt_timezone.utc),
+                    USER_ID=self.user,
+                )
+
+    def run_command(self, *args):
+        out = StringIO()
+        call_command("archive_logs", *args, stdout=out)
+        return out.getvalue()
+
+    def test_save_fills_the_month_bucket(self):
+        self.assertEqual(
+            sorted(set(Logs.objects.values_list("LOG_MONTH", flat=True))),
+            [date(2024, 1, 1), date(2024, 2, 1), date(2024, 3, 1)],
+        )
+
+    def test_archive_and_restore_round_trip(self):
+        before = list(
+            Logs.objects.order_by("id").values_list(
+                "id", "LLOG_TYPE", "LOG_DESCRIPTION", "LOG_DATETIME", "USER_ID"
+            )
+        )
+
+        output = self.run_command("--before", "2024-03")
+
+        self.assertIn("2024-01: archived 3 logs", output)
+        self.assertIn("2024-02: archived 2 logs", output)
+        self.assertEqual(Logs.objects.count(), 1)
+        self.assertTrue(os.path.exists(archive_path(date(2024, 1, 1))))
+        self.assertEqual(get_counter("total_logs"), 1)
+
+        output = self.run_command("--restore", "2024-01", "2024-02")
+
+        self.assertIn("2024-01: restored 3 logs", output)
+        after = list(
+            Logs.objects.order_by("id").values_list(
+                "id", "LLOG_TYPE", "LOG_DESCRIPTION", "LOG_DATETIME", "USER_ID"
+            )
+        )
+        self.assertEqual(after, before)
+        self.assertEqual(get_counter("total_logs"), 6)
+
+    def test_dry_run_changes_nothing(self):
+        Logs.objects.update(LOG_MONTH=None)
+
+        output = self.run_command("--before", "2024-02", "--dry-run")
+
+        self.assertIn("Would fill the month bucket on 6 logs.", output)
+        self.assertEqual(Logs.objects.count(), 6)
+        self.assertEqual(Logs.objects.filter(LOG_MONTH__isnull=True).count(), 6)
+
+    def test_backfill(self):
+        Logs.objects.update(LOG_MONTH=None)
+
+        output = self.run_command("--before", "2024-02")
+
+        self.assertIn("Filled the month bucket on 6 logs.", output)
+        self.assertIn("2024-01: archived 3 logs", output)
+        self.assertFalse(Logs.objects.filter(LOG_MONTH__isnull=True).exists())
+
+    def test_archiving_a_restored_month_again(self):
+        self.run_command("--before", "2024-03")
+        self.run_command("--restore", "2024-01")
+
+        output = self.run_command("--before", "2024-03")
+
+        self.assertIn("2024-01: archived 3 logs", output)
+        self.assertEqual(Logs.objects.count(), 1)
+        self.run_command("--restore", "2024-01", "2024-02")
+        self.assertEqual(Logs.objects.count(), 6)
+
+    def test_late_rows_are_merged_into_the_archive(self):
+        self.run_command("--before", "2024-02")
+        Logs.objects.create(
+            LLOG_TYPE="User logs",
+            LOG_DESCRIPTION="late",
+            LOG_DATETIME=datetime(2024, 1, 30, tzinfo=dt_timezone.utc),
+            USER_ID=self.user,
+        )
+
+        output = self.run_command("--before", "2024-02")
+
+        self.assertIn("2024-01: archived 1 logs", output)
+        self.assertFalse(Logs.objects.filter(LOG_MONTH=date(2024, 1, 1)).exists())
+        output = self.run_command("--restore", "2024-01")
+        self.assertIn("2024-01: restored 4 logs", output)
+
+    def test_rows_committed_after_the_read_are_kept(self):
+        # A row the writer thread flushes while the archive is being written,
+        # with an id below the archived ones
+        late = Logs.objects.filter(LOG_MONTH=date(2024, 1, 1)).earliest("id")
+        late_id = late.pk
+        late.delete()
+        late.pk = late_id
+        replace = os.replace
+
+        def flush_late_row(*args):
+            replace(*args)
+            late.save(force_insert=True)
+
+        with mock.patch("Admin.Logs.utils.os.replace", side_effect=flush_late_row):
+            output = self.run_command("--before", "2024-02")
+
+        self.assertIn("2024-01: archived 2 logs", output)
+        self.assertEqual(list(Logs.objects.filter(LOG_MONTH=date(2024, 1, 1))), [late])
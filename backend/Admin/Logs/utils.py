@@ -0,0 +1,315 @@
+import atexit
+import gzip
+import json
+import logging
+import os
+import threading
+from datetime import date
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, connection, transaction
+from django.db.models import DateField
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from Account.models import User
+from Admin.Dashboard.counters import invalidate_counters
+from .models import Logs, log_month
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_DIR = "log_archive"
+ARCHIVE_FIELDS = ["id", "LLOG_TYPE", "LOG_DESCRIPTION", "LOG_DATETIME", "USER_ID_id"]
+ARCHIVE_CHUNK_SIZE = 2000
+
+
+def write_logs(logs):
+    """
+    Inserts the log rows with bulk_create. If the batch fails (a user deleted in
+    the meantime, say) the rows are retried one by one so only the bad ones are
+    lost. Returns the number of rows written.
+    """
+    logs = list(logs)
+    if not logs:
+        return 0
+    for log in logs:
+        # bulk_create skips save(), which fills the month bucket
+        log.LOG_MONTH = log_month(log.LOG_DATETIME)
+    batch_size = getattr(settings, "AUDIT_LOG_BATCH_SIZE", 200)
+    try:
+        with transaction.atomic():
+            Logs.objects.bulk_create(logs, batch_size=batch_size)
+        written = len(logs)
+    except DatabaseError:
+        logger.exception(f"Bulk insert of {len(logs)} logs failed, retrying per row.")
+        written = 0
+        for log in logs:
+            try:
+                with transaction.atomic():
+                    log.save()
+                written += 1
+            except DatabaseError as e:
+                logger.error(f"Dropped log {log.LLOG_TYPE!r}: {e}")
+
+    # bulk_create sends no post_save, refresh the dashboard counter here
+    invalidate_counters(Logs)
+    return written
+
+
+class AuditLogWriter:
+    """
+    Buffers log rows in memory and writes them in batches from a background
+    thread, so request and transaction code never waits on the Logs table.
+
+    The buffer is flushed when it holds `batch_size` rows or `flush_interval`
+    seconds after the last flush, whichever comes first. At interpreter exit
+    the thread is stopped and whatever is left is written synchronously. When
+    the buffer is full the caller writes the rows itself rather than dropping
+    them.
+    """
+
+    def __init__(
+        self, batch_size=None, flush_interval=None, max_queue=None, background=True
+    ):
+        self.batch_size = batch_size or getattr(settings, "AUDIT_LOG_BATCH_SIZE", 200)
+        self.flush_interval = flush_interval or getattr(
+            settings, "AUDIT_LOG_FLUSH_INTERVAL", 2.0
+        )
+        self.max_queue = max_queue or getattr(settings, "AUDIT_LOG_MAX_QUEUE", 10000)
+        self.background = background
+        self.buffer = []
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.wake = threading.Event()
+        self.stopping = threading.Event()
+        self.thread = None
+        self.pid = None
+
+    def enqueue(self, log):
+        with self.lock:
+            if len(self.buffer) >= self.max_queue:
+                overflow, self.buffer = self.buffer, []
+            else:
+                overflow = None
+                self.buffer.append(log)
+                full = len(self.buffer) >= self.batch_size
+        if overflow is not None:
+            logger.warning(f"Audit log buffer full, writing {len(overflow)} inline.")
+            write_logs(overflow + [log])
+            return
+        if self.background:
+            self.ensure_started()
+            if full:
+                self.wake.set()
+
+    def flush(self):
+        """Writes everything buffered so far in the calling thread."""
+        with self.flush_lock:
+            with self.lock:
+                logs, self.buffer = self.buffer, []
+            return write_logs(logs)
+
+    def ensure_started(self):
+        # A forked worker inherits the buffer but not the thread
+        if self.thread is not None and self.pid == os.getpid():
+            return
+        with self.lock:
+            if self.thread is not None and self.pid == os.getpid():
+                return
+            self.pid = os.getpid()
+            self.stopping.clear()
+            self.thread = threading.Thread(
+                target=self.run, name="audit-log-writer", daemon=True
+            )
+            self.thread.start()
+        atexit.register(self.shutdown)
+
+    def run(self):
+        while not self.stopping.is_set():
+            self.wake.wait(self.flush_interval)
+            self.wake.clear()
+            try:
+                close_old_connections()
+                self.flush()
+            except Exception:
+                logger.exception("Audit log flush failed.")
+        connection.close()
+
+    def shutdown(self, timeout=10):
+        """Stops the background thread and writes the remaining rows."""
+        thread = self.thread
+        if thread is not None and self.pid == os.getpid():
+            self.stopping.set()
+            self.wake.set()
+            thread.join(timeout)
+        self.thread = None
+        return self.flush()
+
+
+writer = AuditLogWriter()
+
+
+def log_event(log_type, description, user, when=None):
+    """
+    Records an audit log entry. The time is taken now; with AUDIT_LOG_ASYNC the
+    row is queued once the surrounding transaction commits (and dropped if it
+    rolls back) and written later by the background writer, otherwise it is
+    inserted right away.
+    """
+    log = Logs(
+        LLOG_TYPE=log_type,
+        LOG_DESCRIPTION=description,
+        USER_ID_id=getattr(user, "pk", user),
+        LOG_DATETIME=when or timezone.now(),
+    )
+    if not getattr(settings, "AUDIT_LOG_ASYNC", False):
+        write_logs([log])
+        return log
+    transaction.on_commit(lambda: writer.enqueue(log))
+    return log
+
+
+def parse_month(value):
+    """Parses "YYYY-MM" into the first day of that month."""
+    try:
+        year, month = value.split("-")
+        return date(int(year), int(month), 1)
+    except ValueError:
+        raise ValueError(f"Expected a month as YYYY-MM, got {value!r}.")
+
+
+def archive_path(month):
+    return os.path.join(
+        settings.MEDIA_ROOT, ARCHIVE_DIR, f"logs-{month:%Y-%m}.jsonl.gz"
+    )
+
+
+def archived_months():
+    directory = os.path.join(settings.MEDIA_ROOT, ARCHIVE_DIR)
+    if not os.path.isdir(directory):
+        return []
+    return sorted(
+        parse_month(name[len("logs-") : -len(".jsonl.gz")])
+        for name in os.listdir(directory)
+        if name.startswith("logs-") and name.endswith(".jsonl.gz")
+    )
+
+
+def backfill_log_months():
+    """Fills LOG_MONTH on rows written before the bucket existed."""
+    return Logs.objects.filter(LOG_MONTH__isnull=True).update(
+        LOG_MONTH=TruncMonth("LOG_DATETIME", output_field=DateField())
+    )
+
+
+def months_before(cutoff):
+    """The months holding logs, oldest first, that end before `cutoff`."""
+    return list(
+        Logs.objects.filter(LOG_MONTH__lt=cutoff.replace(day=1))
+        .order_by("LOG_MONTH")
+        .values_list("LOG_MONTH", flat=True)
+        .distinct()
+    )
+
+
+def archive_month(month):
+    """
+    Moves one month of logs into a gzipped JSON-lines file under
+    MEDIA_ROOT/log_archive and deletes the rows. The file is complete and
+    renamed into place before anything is deleted, and only the rows that
+    were written to it are deleted. A month archived before (restored since,
+    or with late rows) is merged into its file, the rows in the database
+    replacing the archived rows of the same id. Returns the number of rows
+    archived.
+    """
+    rows = (
+        Logs.objects.filter(LOG_MONTH=month)
+        .order_by("id")
+        .values_list(*ARCHIVE_FIELDS)
+        .iterator(chunk_size=ARCHIVE_CHUNK_SIZE)
+    )
+    path = archive_path(month)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    written = []
+    temp_path = f"{path}.tmp"
+    with gzip.open(temp_path, "wt", encoding="utf-8") as archive:
+        for row in rows:
+            record = dict(zip(ARCHIVE_FIELDS, row))
+            record["LOG_DATETIME"] = record["LOG_DATETIME"].isoformat()
+            archive.write(json.dumps(record) + "\n")
+            written.append(record["id"])
+        count = len(written)
+        if count and os.path.exists(path):
+            archived = set(written)
+            with gzip.open(path, "rt", encoding="utf-8") as previous:
+                for line in previous:
+                    if json.loads(line)["id"] not in archived:
+                        archive.write(line)
+    if not count:
+        os.remove(temp_path)
+        return 0
+    os.replace(temp_path, path)
+
+    # By id, so a row committed after the rows were read stays for the next run
+    with transaction.atomic():
+        for start in range(0, count, ARCHIVE_CHUNK_SIZE):
+            Logs.objects.filter(
+                id__in=written[start : start + ARCHIVE_CHUNK_SIZE]
+            ).delete()
+    logger.info(f"Archived {count} logs for {month:%Y-%m} to {path}.")
+    return count
+
+
+def restore_month(month, remove_archive=False):
+    """
+    Loads an archived month back into Logs with the original ids. Rows of
+    users deleted since the archive was made are skipped. Safe to run twice.
+    Returns (restored, skipped).
+    """
+    path = archive_path(month)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No archive for {month:%Y-%m} at {path}.")
+
+    restored = skipped = 0
+    with gzip.open(path, "rt", encoding="utf-8") as archive:
+        chunk = []
+        for line in archive:
+            chunk.append(json.loads(line))
+            if len(chunk) == ARCHIVE_CHUNK_SIZE:
+                written = _restore_chunk(chunk)
+                restored, skipped = restored + written, skipped + len(chunk) - written
+                chunk = []
+        written = _restore_chunk(chunk)
+        restored, skipped = restored + written, skipped + len(chunk) - written
+
+    invalidate_counters(Logs)
+    if remove_archive:
+        os.remove(path)
+    logger.info(f"Restored {restored} logs for {month:%Y-%m}, skipped {skipped}.")
+    return restored, skipped
+
+
+def _restore_chunk(records):
+    users = set(
+        User.objects.filter(
+            pk__in={record["USER_ID_id"] for record in records}
+        ).values_list("pk", flat=True)
+    )
+    logs = []
+    for record in records:
+        if record["USER_ID_id"] not in users:
+            continue
+        when = parse_datetime(record["LOG_DATETIME"])
+        logs.append(
+            Logs(
+                id=record["id"],
+                LLOG_TYPE=record["LLOG_TYPE"],
+                LOG_DESCRIPTION=record["LOG_DESCRIPTION"],
+                LOG_DATETIME=when,
+                LOG_MONTH=log_month(when),
+                USER_ID_id=record["USER_ID_id"],
+            )
+        )
+    Logs.objects.bulk_create(logs, ignore_conflicts=True)
+    return len(logs)
@@ -1,15 +1,18 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.generics import ListAPIView
-from rest_framework.pagination import PageNumberPagination
+from Admin.pagination import KeysetPagination
+from Admin.Dashboard.counters import get_counter
 from rest_framework import status
 from .models import Logs
 from .serializers import LogsSerializer
+from .utils import log_event
 from Admin.authentication import CookieJWTAuthentication
+from PHILVETS.routers import ReplicaReadMixin
 from rest_framework.permissions import AllowAny
 
 
-class LogsAPIView(APIView):
+class LogsAPIView(ReplicaReadMixin, APIView):
     """
     Handles GET (list logs), POST (create log)
     """
@@ -27,10 +30,23 @@ class LogsAPIView(APIView):
 
     def post(self, request):
         serializer = LogsSerializer(data=request.data)
-        if serializer.is_valid():
-            serializer.save()
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        data = serializer.validated_data
+        log = log_event(data["LLOG_TYPE"], data["LOG_DESCRIPTION"], data["USER_ID"])
+        if log.pk is None:
+            # Queued for the background writer, no id until it is flushed
+            return Response(
+                {
+                    "message": "Log queued.",
+                    "LLOG_TYPE": log.LLOG_TYPE,
+                    "LOG_DESCRIPTION": log.LOG_DESCRIPTION,
+                    "USER_ID": log.USER_ID_id,
+                },
+                status=status.HTTP_202_ACCEPTED,
+            )
+        return Response(LogsSerializer(log).data, status=status.HTTP_201_CREATED)
 
 
 class LogsDetailAPIView(APIView):
@@ -80,7 +96,7 @@ class LogsDetailAPIView(APIView):
         )
 
 
-class LogsByUserAPIView(APIView):
+class LogsByUserAPIView(ReplicaReadMixin, APIView):
     """
     Retrieve all logs associated with a specific user by USER_ID.
     """
@@ -99,13 +115,14 @@ class LogsByUserAPIView(APIView):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class CustomPagination(PageNumberPagination):
+class CustomPagination(KeysetPagination):
     page_size = 10  # Default number of logs per page
     page_size_query_param = "page_size"
     max_page_size = 100
+    ordering = ("-LOG_DATETIME", "-id")  # Keyset order when unordered
 
 
-class UserLogsAPIView(ListAPIView):
+class UserLogsAPIView(ReplicaReadMixin, ListAPIView):
     """
     Retrieve all logs where LOG_TYPE = 'User logs'.
     """
@@ -133,7 +150,7 @@ class UserLogsAPIView(ListAPIView):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class TransactionLogsAPIView(ListAPIView):
+class TransactionLogsAPIView(ReplicaReadMixin, ListAPIView):
     """
     Retrieve all logs where LOG_TYPE = 'Transaction logs'.
     """
@@ -168,5 +185,5 @@ class TotalLogs(APIView):
     permission_classes = [AllowAny]
 
     def get(self, request):
-        total_logs = Logs.objects.count()
+        total_logs = get_counter("total_logs")
         return Response({total_logs}, status=status.HTTP_200_OK)
@@ -0,0 +1,186 @@
+import math
+import re
+import threading
+from collections import deque
+from django.conf import settings
+
+# Samples kept per endpoint for the percentiles; older ones roll off
+DEFAULT_WINDOW = 1000
+PERCENTILES = (50, 90, 99)
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_LIST_RE = re.compile(r"\((?:\s*(?:%s|\?)\s*,)+\s*(?:%s|\?)\s*\)")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def fingerprint(sql):
+    """
+    Normalizes a statement so repeats of the same query compare equal: literals
+    become ?, IN lists collapse to (...) and whitespace is squeezed. N+1 loops
+    show up as one fingerprint with a high count.
+    """
+    sql = _STRING_RE.sub("?", sql)
+    sql = _NUMBER_RE.sub("?", sql)
+    sql = _LIST_RE.sub("(...)", sql)
+    return _SPACE_RE.sub(" ", sql).strip()
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not values:
+        return 0
+    rank = max(1, math.ceil(pct / 100 * len(values)))
+    return values[rank - 1]
+
+
+class EndpointStats:
+    def __init__(self, window):
+        self.count = 0
+        self.errors = 0
+        self.total_duration = 0.0
+        self.total_queries = 0
+        self.total_db_time = 0.0
+        self.total_bytes = 0
+        self.max_queries = 0
+        self.durations = deque(maxlen=window)
+        self.queries = deque(maxlen=window)
+        self.db_times = deque(maxlen=window)
+        self.sizes = deque(maxlen=window)
+
+    def add(self, status_code, duration, queries, db_time, size):
+        self.count += 1
+        if status_code >= 500:
+            self.errors += 1
+        self.total_duration += duration
+        self.total_queries += queries
+        self.total_db_time += db_time
+        self.total_bytes += size
+        self.max_queries = max(self.max_queries, queries)
+        self.durations.append(duration)
+        self.queries.append(queries)
+        self.db_times.append(db_time)
+        self.sizes.append(size)
+
+    def summary(self):
+        durations = sorted(self.durations)
+        queries = sorted(self.queries)
+        db_times = sorted(self.db_times)
+        sizes = sorted(self.sizes)
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "duration_ms": {
+                f"p{pct}": round(percentile(durations, pct) * 1000, 2)
+                for pct in PERCENTILES
+            },
+            "queries": {
+                **{f"p{pct}": percentile(queries, pct) for pct in PERCENTILES},
+                "max": self.max_queries,
+            },
+            "db_time_ms": {
+                f"p{pct}": round(percentile(db_times, pct) * 1000, 2)
+                for pct in PERCENTILES
+            },
+            "response_bytes": {
+                f"p{pct}": percentile(sizes, pct) for pct in PERCENTILES
+            },
+        }
+
+
+class MetricsRegistry:
+    """
+    Rolling per-endpoint request statistics, kept in memory. Each worker
+    process has its own registry, so the endpoints report the worker that
+    served them; scrape every worker (or run one) to see all traffic.
+    """
+
+    def __init__(self, window=None):
+        self.window = window
+        self.lock = threading.Lock()
+        self.endpoints = {}
+
+    def record(self, endpoint, status_code, duration, queries, db_time, size):
+        window = self.window or getattr(settings, "METRICS_WINDOW", DEFAULT_WINDOW)
+        with self.lock:
+            stats = self.endpoints.get(endpoint)
+            if stats is None:
+                stats = self.endpoints[endpoint] = EndpointStats(window)
+            stats.add(status_code, duration, queries, db_time, size)
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                endpoint: stats.summary()
+                for endpoint, stats in sorted(self.endpoints.items())
+            }
+
+    def totals(self):
+        with self.lock:
+            return {
+                endpoint: (
+                    stats.count,
+                    stats.errors,
+                    stats.total_duration,
+                    stats.total_queries,
+                    stats.total_db_time,
+                    stats.total_bytes,
+                )
+                for endpoint, stats in sorted(self.endpoints.items())
+            }
+
+    def reset(self):
+        with self.lock:
+            self.endpoints.clear()
+
+
+registry = MetricsRegistry()
+
+
+def _label(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus_text(registry=registry):
+    """
+    Renders the registry in the Prometheus text exposition format, one series
+    per endpoint.
+    """
+    snapshot = registry.snapshot()
+    totals = registry.totals()
+    lines = []
+
+    counters = [
+        ("http_requests_total", "Requests served.", 0),
+        ("http_request_errors_total", "Requests answered with a 5xx.", 1),
+        ("http_response_bytes_total", "Response bytes sent.", 5),
+    ]
+    for name, help_text, index in counters:
+        lines.append(f"# HELP philvets_{name} {help_text}")
+        lines.append(f"# TYPE philvets_{name} counter")
+        for endpoint, values in totals.items():
+            lines.append(
+                f'philvets_{name}{{endpoint="{_label(endpoint)}"}} {values[index]}'
+            )
+
+    # Quantiles cover the rolling window, _sum and _count all traffic
+    summaries = [
+        ("http_request_duration_seconds", "Wall time.", "duration_ms", 0.001, 2),
+        ("db_queries_per_request", "Database queries.", "queries", 1, 3),
+        ("db_time_seconds_per_request", "Database time.", "db_time_ms", 0.001, 4),
+    ]
+    for name, help_text, key, scale, index in summaries:
+        lines.append(f"# HELP philvets_{name} {help_text}")
+        lines.append(f"# TYPE philvets_{name} summary")
+        for endpoint, summary in snapshot.items():
+            label = _label(endpoint)
+            for pct in PERCENTILES:
+                value = round(summary[key][f"p{pct}"] * scale, 6)
+                lines.append(
+                    f'philvets_{name}{{endpoint="{label}",quantile="{pct / 100}"}} '
+                    f"{value}"
+                )
+            values = totals[endpoint]
+            lines.append(f'philvets_{name}_sum{{endpoint="{label}"}} {values[index]}')
+            lines.append(f'philvets_{name}_count{{endpoint="{label}"}} {values[0]}')
+    return "\n".join(lines) + "\n"
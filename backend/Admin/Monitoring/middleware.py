@@ -0,0 +1,95 @@
+import logging
+import time
+from collections import Counter
+from contextlib import ExitStack
+from django.conf import settings
+from django.db import connections
+
+from .metrics import fingerprint, registry
+
+logger = logging.getLogger(__name__)
+
+
+class QueryCollector:
+    """execute_wrapper hook counting and timing every query of a request."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+        self.fingerprint_time = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            key = fingerprint(sql)
+            self.count += 1
+            self.duration += elapsed
+            self.fingerprints[key] += 1
+            self.fingerprint_time[key] += elapsed
+
+
+def endpoint_name(request):
+    # The URL pattern, not the path, so /items/products/7/ and /8/ share stats
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return None
+    return f"{request.method} /{match.route}"
+
+
+class InstrumentationMiddleware:
+    """
+    Records wall time, query count, database time and response size for every
+    request that resolves to a view, and logs slow or query-heavy requests with
+    their most frequent SQL fingerprints. Off when METRICS_ENABLED is False.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not getattr(settings, "METRICS_ENABLED", True):
+            return self.get_response(request)
+
+        collector = QueryCollector()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(collector))
+            response = self.get_response(request)
+        duration = time.perf_counter() - start
+
+        endpoint = endpoint_name(request)
+        if endpoint is None:
+            return response
+
+        size = 0 if response.streaming else len(response.content)
+        registry.record(
+            endpoint,
+            response.status_code,
+            duration,
+            collector.count,
+            collector.duration,
+            size,
+        )
+        self.log_if_slow(endpoint, response, duration, collector)
+        return response
+
+    def log_if_slow(self, endpoint, response, duration, collector):
+        slow_ms = getattr(settings, "METRICS_SLOW_REQUEST_MS", 500)
+        max_queries = getattr(settings, "METRICS_SLOW_QUERY_COUNT", 50)
+        if duration * 1000 < slow_ms and collector.count < max_queries:
+            return
+
+        top = "\n".join(
+            f"  {count}x {collector.fingerprint_time[sql] * 1000:.1f}ms {sql}"
+            for sql, count in collector.fingerprints.most_common(5)
+        )
+        logger.warning(
+            f"Slow request {endpoint} -> {response.status_code}: "
+            f"{duration * 1000:.1f}ms, {collector.count} queries, "
+            f"{collector.duration * 1000:.1f}ms in the database.\n{top}"
+        )
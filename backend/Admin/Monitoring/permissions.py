@@ -0,0 +1,22 @@
+import hmac
+from django.conf import settings
+from rest_framework.permissions import BasePermission
+
+
+class CanViewMetrics(BasePermission):
+    """
+    Staff users, or scrapers sending `Authorization: Bearer <METRICS_TOKEN>`.
+    """
+
+    def has_permission(self, request, view):
+        token = getattr(settings, "METRICS_TOKEN", None)
+        header = request.headers.get("Authorization", "")
+        if token and header.startswith("Bearer "):
+            return hmac.compare_digest(header[len("Bearer ") :], token)
+
+        user = request.user
+        return bool(
+            user
+            and user.is_authenticated
+            and (getattr(user, "accType", "") or "").lower() == "staff"
+        )
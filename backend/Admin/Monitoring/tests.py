@@ -0,0 +1,82 @@
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from Account.models import User
+from Admin.Product.models import Product
+from .metrics import fingerprint, registry
+
+PRODUCT_LIST = "GET /items/products/"
+
+
+@override_settings(METRICS_TOKEN="scrape-token")
+class InstrumentationTest(APITestCase):
+    def setUp(self):
+        registry.reset()
+        Product.objects.create(PROD_NAME="Amoxicillin")
+
+    def scrape(self, url="/monitoring/metrics"):
+        return self.client.get(url, HTTP_AUTHORIZATION="Bearer scrape-token")
+
+    def test_records_per_endpoint_statistics(self):
+        self.client.get("/items/products/")
+        self.client.get("/items/products/")
+
+        stats = self.scrape().data["endpoints"][PRODUCT_LIST]
+        self.assertEqual(stats["count"], 2)
+        self.assertEqual(stats["errors"], 0)
+        self.assertGreater(stats["queries"]["max"], 0)
+        self.assertGreater(stats["response_bytes"]["p50"], 0)
+
+    def test_prometheus_text(self):
+        self.client.get("/items/products/")
+
+        response = self.scrape("/monitoring/metrics/prometheus")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        body = response.content.decode()
+        self.assertIn(
+            f'philvets_http_requests_total{{endpoint="{PRODUCT_LIST}"}} 1', body
+        )
+        self.assertIn(
+            f'philvets_db_queries_per_request{{endpoint="{PRODUCT_LIST}",'
+            'quantile="0.5"}',
+            body,
+        )
+
+    def test_metrics_need_staff_or_token(self):
+        self.assertEqual(self.client.get("/monitoring/metrics").status_code, 401)
+        response = self.client.get(
+            "/monitoring/metrics", HTTP_AUTHORIZATION="Bearer wrong"
+        )
+        self.assertEqual(response.status_code, 401)
+
+        staff = User.objects.create_user(
+            username="staff",
+            password="testpassword",
+            email="staff@example.com",
+            first_name="Staff",
+            last_name="User",
+            accType="Staff",
+        )
+        self.client.force_authenticate(staff)
+        self.assertEqual(self.client.get("/monitoring/metrics").status_code, 200)
+
+    @override_settings(METRICS_SLOW_QUERY_COUNT=1)
+    def test_logs_slow_requests_with_fingerprints(self):
+        with self.assertLogs("Admin.Monitoring.middleware", "WARNING") as logs:
+            self.client.get("/items/products/")
+
+        self.assertIn(f"Slow request {PRODUCT_LIST}", logs.output[0])
+        self.assertIn(f'FROM "{Product._meta.db_table}"', logs.output[0])
+
+    def test_fingerprint_normalizes_literals(self):
+        self.assertEqual(
+            fingerprint("SELECT * FROM t WHERE id IN (%s, %s,%s) AND name = 'x'"),
+            fingerprint("SELECT *  FROM t WHERE id IN (%s) AND name = 'y'").replace(
+                "(%s)", "(...)"
+            ),
+        )
+        self.assertEqual(
+            fingerprint("SELECT * FROM t LIMIT 21"), "SELECT * FROM t LIMIT ?"
+        )
@@ -0,0 +1,12 @@
+from django.urls import path
+
+from .views import MetricsView, PrometheusMetricsView
+
+urlpatterns = [
+    path("metrics", MetricsView.as_view(), name="metrics"),
+    path(
+        "metrics/prometheus",
+        PrometheusMetricsView.as_view(),
+        name="metrics-prometheus",
+    ),
+]
@@ -0,0 +1,30 @@
+from django.http import HttpResponse
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from Admin.authentication import CookieJWTAuthentication
+from .metrics import prometheus_text, registry
+from .permissions import CanViewMetrics
+
+
+class MetricsView(APIView):
+    """Per-endpoint request statistics of this worker as JSON."""
+
+    authentication_classes = [CookieJWTAuthentication]
+    permission_classes = [CanViewMetrics]
+
+    def get(self, request):
+        return Response({"endpoints": registry.snapshot()}, status=status.HTTP_200_OK)
+
+
+class PrometheusMetricsView(APIView):
+    """The same statistics in the Prometheus text format, for scraping."""
+
+    authentication_classes = [CookieJWTAuthentication]
+    permission_classes = [CanViewMetrics]
+
+    def get(self, request):
+        return HttpResponse(
+            prometheus_text(), content_type="text/plain; version=0.0.4; charset=utf-8"
+        )
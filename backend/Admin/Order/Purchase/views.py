@@ -7,6 +7,7 @@ from django.http import Http404
 from django.utils.timezone import now
 from rest_framework.views import APIView
 from rest_framework.response import Response
+from Admin.pagination import list_response
 from rest_framework import status, permissions
 from django.db.models import Q
 
@@ -54,8 +55,7 @@ class PurchaseOrderListCreateView(APIView):
 
     def get(self, request):
         queryset = PurchaseOrder.objects.all().order_by("-PURCHASE_ORDER_DATE_CREATED")
-        serializer = PurchaseOrderSerializer(queryset, many=True)
-        return Response(serializer.data)
+        return list_response(request, queryset, PurchaseOrderSerializer)
 
     def post(self, request):
         logger.info("Incoming Data: %s", request.data)
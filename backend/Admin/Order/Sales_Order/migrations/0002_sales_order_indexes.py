@@ -0,0 +1,44 @@
+# Generated by Django 5.1.3 on 2026-10-18 16:49
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("Customer", "0002_clients_name_address_index"),
+        ("Sales_Order", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="salesorder",
+            name="SALES_ORDER_PYMNT_TERMS",
+            field=models.PositiveIntegerField(default=0, null=True),
+        ),
+        migrations.AlterField(
+            model_name="salesorderdetails",
+            name="SALES_ORDER_ID",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="sales_order_details",
+                to="Sales_Order.salesorder",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="salesorder",
+            index=models.Index(
+                fields=["SALES_ORDER_STATUS", "-SALES_ORDER_DATE_CREATED"],
+                name="SALES_ORDER_STATUS_IDX",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="salesorder",
+            index=models.Index(
+                fields=["-SALES_ORDER_DATE_CREATED"], name="SALES_ORDER_CREATED_IDX"
+            ),
+        ),
+    ]
@@ -63,6 +63,17 @@ class SalesOrder(models.Model):
         db_table = "SALES_ORDER"
         verbose_name = "Sales Order"
         verbose_name_plural = "Sales Order"
+        indexes = [
+            # Status filters and counts, newest first
+            models.Index(
+                fields=["SALES_ORDER_STATUS", "-SALES_ORDER_DATE_CREATED"],
+                name="SALES_ORDER_STATUS_IDX",
+            ),
+            # The list, newest first
+            models.Index(
+                fields=["-SALES_ORDER_DATE_CREATED"], name="SALES_ORDER_CREATED_IDX"
+            ),
+        ]
 
 
 class SalesOrderDetails(models.Model):
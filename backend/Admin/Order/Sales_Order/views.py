@@ -11,6 +11,8 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 
 # App imports
+from Admin.pagination import list_response
+from Admin.Dashboard.counters import get_counter
 from .models import SalesOrder, SalesOrderDetails
 from .serializers import SalesOrderSerializer, SalesOrderDetailsSerializer
 from ...Customer.utils import (
@@ -43,12 +45,11 @@ class SalesOrderListCreateAPIView(APIView):
     permission_classes = [permissions.AllowAny]
 
     def get(self, request):
-        """List all Sales Orders without their details."""
+        """List Sales Orders without their details, paginated or streamed."""
         queryset = SalesOrder.objects.all().order_by(
             "-SALES_ORDER_DATE_CREATED"
         )  # Prefix the field with '-' for descending order
-        serializer = SalesOrderSerializer(queryset, many=True)
-        return Response(serializer.data)
+        return list_response(request, queryset, SalesOrderSerializer)
 
     def post(self, request):
         """Create a new Sales Order along with its details, auto-accept if admin."""
@@ -193,9 +194,7 @@ class GetPendingTotalView(APIView):
     def get(self, request, *args, **kwargs):
         try:
             # Query for sales orders with a status of 'pending'
-            pending_count = SalesOrder.objects.filter(
-                SALES_ORDER_STATUS="Pending"
-            ).count()
+            pending_count = get_counter("pending_sales_orders")
 
             # Return the total count in the response
             return Response({"pending_total": pending_count}, status=status.HTTP_200_OK)
@@ -1,3 +1,38 @@
+import json
 from django.test import TestCase
+from django.urls import reverse
 
-# Create your tests here.
+from Admin.pagination import stream_json_list
+from .models import Product
+from .serializers import ProductSerializer
+
+
+class ProductListContractTest(TestCase):
+    def setUp(self):
+        Product.objects.bulk_create(Product(PROD_NAME=f"Item {i}") for i in range(45))
+        self.url = reverse("product-list")
+
+    def test_list_is_paginated_by_default(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["count"], 45)
+        self.assertEqual(len(response.data["results"]), 20)
+        self.assertIsNotNone(response.data["next"])
+
+    def test_stream_returns_every_row(self):
+        response = self.client.get(self.url, {"stream": "true"})
+
+        self.assertTrue(response.streaming)
+        rows = json.loads(b"".join(response.streaming_content))
+        self.assertEqual(len(rows), 45)
+        self.assertEqual(rows[0]["PROD_NAME"], "Item 44")
+
+    def test_stream_encodes_chunk_by_chunk(self):
+        queryset = Product.objects.order_by("pk")
+        response = stream_json_list(queryset, ProductSerializer, chunk_size=10)
+
+        chunks = list(response.streaming_content)
+        # Opening bracket, five chunks of rows, closing bracket
+        self.assertEqual(len(chunks), 7)
+        self.assertEqual(len(json.loads(b"".join(chunks))), 45)
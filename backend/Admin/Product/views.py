@@ -1,12 +1,16 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.pagination import PageNumberPagination
+from Admin.pagination import KeysetPagination, list_response
+from Admin.Dashboard.counters import get_counter
+from Admin.Search.models import SearchDocument
+from Admin.Search.utils import search_ids
 from django.shortcuts import get_object_or_404
 from rest_framework.permissions import IsAuthenticated
 from rest_framework import status, permissions
 from Admin.authentication import CookieJWTAuthentication
 from django.db.models import Q
 from django.db.models import F
+from django.db.models.functions import Coalesce
 from .models import ProductCategory, ProductDetails, Product
 from .serializers import (
     ProductCategorySerializer,
@@ -59,7 +63,7 @@ class ProductDetailsManager(APIView):
                 )
 
 
-class ProductPagination(PageNumberPagination):
+class ProductPagination(KeysetPagination):
     """
     Custom pagination class for Product List.
     """
@@ -217,9 +221,8 @@ class ProductManager(APIView):
     permission_classes = [permissions.AllowAny]
 
     def get(self, request):
-        queryset = Product.objects.all()
-        serializer = ProductSerializer(queryset, many=True)
-        return Response(serializer.data)
+        queryset = Product.objects.all().order_by("-pk")
+        return list_response(request, queryset, ProductSerializer)
 
     def post(self, request):
         serializer = ProductSerializer(data=request.data)
@@ -296,22 +299,30 @@ class ProductSearchView(APIView):
     # authentication_classes = [CookieJWTAuthentication]
     permission_classes = [permissions.AllowAny]
     """
-    This view searches for products by name using the LIKE operator (case-insensitive).
+    This view searches products by name, brand, supplier and description through
+    the search index, best matches first and tolerating typos. When there are
+    fewer than MAX_RESULTS, products whose name contains the query follow.
     """
 
     def get(self, request):
         query = request.query_params.get("q", None)  # Get search query parameter 'q'
 
-        if query:
-            # Perform a case-insensitive search on the 'PROD_NAME' field
-            products = Product.objects.filter(PROD_NAME__icontains=query)
-        else:
+        if not query:
             return Response(
                 {"error": "No query parameter provided."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        if not products.exists():
+        ids = search_ids(
+            query,
+            SearchDocument.PRODUCT,
+            Product.objects.filter(PROD_NAME__icontains=query).order_by("PROD_NAME"),
+            fuzzy=True,
+        )
+        found = Product.objects.in_bulk(ids)
+        products = [found[pk] for pk in ids if pk in found]
+
+        if not products:
             return Response(
                 {"message": "No products found matching the query."},
                 status=status.HTTP_404_NOT_FOUND,
@@ -329,7 +340,7 @@ class ProductCountView(APIView):
     ]  # Optional: limit access to authenticated users
 
     def get(self, request):
-        total_products = Product.objects.count()
+        total_products = get_counter("total_products")
         return Response({total_products})
 
 
@@ -338,7 +349,7 @@ class CategoryCountView(APIView):
     permission_classes = [permissions.AllowAny]
 
     def get(self, request):
-        total_categories = ProductCategory.objects.count()
+        total_categories = get_counter("total_categories")
         return Response({total_categories})
 
 
@@ -352,10 +363,11 @@ class LowStockProductsView(APIView):
 
     def get(self, request):
         try:
-            # Correct filter to use the model field `PROD_RO_LEVEL`
-            low_stock_products = Product.objects.filter(
-                PROD_QOH__lte=F("PROD_RO_LEVEL")
-            )
+            # On-hand comes from the stock summary, falling back to PROD_QOH for
+            # products that have not had a stock movement yet
+            low_stock_products = Product.objects.annotate(
+                on_hand=Coalesce("stock__ON_HAND", "PROD_QOH")
+            ).filter(on_hand__lte=F("PROD_RO_LEVEL"))
 
             # Serialize the filtered products
             serializer = ProductSerializer(low_stock_products, many=True)
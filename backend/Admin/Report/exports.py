@@ -0,0 +1,238 @@
+import csv
+import logging
+import os
+from datetime import datetime
+from django.conf import settings
+from django.utils import timezone
+
+from Admin.Delivery.models import InboundDeliveryDetails, OutboundDeliveryDetails
+from Admin.Inventory.models import Inventory
+from Admin.Sales.models import CustomerPayment, SalesInvoice, SalesInvoiceItems
+
+logger = logging.getLogger(__name__)
+
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_DIR = "exports"
+EXPORT_FORMATS = ("csv", "xlsx")
+
+# Each export is a flat table read with values_list() through a server-side
+# cursor, so rows never become model instances and are never all in memory.
+# Deliveries are exported one row per detail line with the header repeated.
+EXPORTS = {
+    "sales-invoices": {
+        "model": SalesInvoice,
+        "date_field": "SALES_INV_DATETIME",
+        "status_field": "PAYMENT_ID__PAYMENT_STATUS",
+        "ordering": ("SALES_INV_DATETIME", "pk"),
+        "columns": [
+            ("Invoice ID", "SALES_INV_ID"),
+            ("Date", "SALES_INV_DATETIME"),
+            ("Client", "CLIENT__name"),
+            ("Outbound Delivery", "OUTBOUND_DEL_ID"),
+            ("Payment Status", "PAYMENT_ID__PAYMENT_STATUS"),
+            ("Discount", "SALES_INV_DISCOUNT"),
+            ("Total Price", "SALES_INV_TOTAL_PRICE"),
+            ("Gross Revenue", "SALES_INV_TOTAL_GROSS_REVENUE"),
+            ("Gross Income", "SALES_INV_TOTAL_GROSS_INCOME"),
+        ],
+    },
+    "sales-invoice-items": {
+        "model": SalesInvoiceItems,
+        "date_field": "SALES_INV_ID__SALES_INV_DATETIME",
+        "status_field": "SALES_INV_ID__PAYMENT_ID__PAYMENT_STATUS",
+        "ordering": ("SALES_INV_ID__SALES_INV_DATETIME", "pk"),
+        "columns": [
+            ("Invoice ID", "SALES_INV_ID__SALES_INV_ID"),
+            ("Date", "SALES_INV_ID__SALES_INV_DATETIME"),
+            ("Client", "SALES_INV_ID__CLIENT__name"),
+            ("Product ID", "SALES_INV_ITEM_PROD_ID"),
+            ("Product", "SALES_INV_ITEM_PROD_NAME"),
+            ("Quantity Delivered", "SALES_INV_item_PROD_DLVRD"),
+            ("Sell Price", "SALES_INV_ITEM_PROD_SELL_PRICE"),
+            ("Purchase Price", "SALES_INV_ITEM_PROD_PURCH_PRICE"),
+            ("Gross Revenue", "SALES_INV_ITEM_LINE_GROSS_REVENUE"),
+            ("Gross Income", "SALES_INV_ITEM_LINE_GROSS_INCOME"),
+        ],
+    },
+    "inventory": {
+        "model": Inventory,
+        "date_field": "DATE_CREATED",
+        "status_field": "IS_ACTIVE",
+        "ordering": ("DATE_CREATED", "pk"),
+        "columns": [
+            ("Inventory ID", "INVENTORY_ID"),
+            ("Batch ID", "BATCH_ID"),
+            ("Product ID", "PRODUCT_ID"),
+            ("Product", "PRODUCT_NAME"),
+            ("Inbound Delivery", "INBOUND_DEL_ID"),
+            ("Expiry Date", "EXPIRY_DATE"),
+            ("Quantity On Hand", "QUANTITY_ON_HAND"),
+            ("Active", "IS_ACTIVE"),
+            ("Date Created", "DATE_CREATED"),
+            ("Last Updated", "LAST_UPDATED"),
+        ],
+    },
+    "inbound-deliveries": {
+        "model": InboundDeliveryDetails,
+        "date_field": "INBOUND_DEL_ID__INBOUND_DEL_ORDER_DATE_CREATED",
+        "status_field": "INBOUND_DEL_ID__INBOUND_DEL_STATUS",
+        "ordering": ("INBOUND_DEL_ID", "pk"),
+        "columns": [
+            ("Delivery ID", "INBOUND_DEL_ID"),
+            ("Date Created", "INBOUND_DEL_ID__INBOUND_DEL_ORDER_DATE_CREATED"),
+            ("Date Delivered", "INBOUND_DEL_ID__INBOUND_DEL_DATE_DELIVERED"),
+            ("Supplier", "INBOUND_DEL_ID__INBOUND_DEL_SUPP_NAME"),
+            ("Status", "INBOUND_DEL_ID__INBOUND_DEL_STATUS"),
+            ("Received By", "INBOUND_DEL_ID__INBOUND_DEL_RCVD_BY_USER_NAME"),
+            ("Delivery Total", "INBOUND_DEL_ID__INBOUND_DEL_TOTAL_PRICE"),
+            ("Product ID", "INBOUND_DEL_DETAIL_PROD_ID"),
+            ("Product", "INBOUND_DEL_DETAIL_PROD_NAME"),
+            ("Ordered Qty", "INBOUND_DEL_DETAIL_ORDERED_QTY"),
+            ("Accepted Qty", "INBOUND_DEL_DETAIL_LINE_QTY_ACCEPT"),
+            ("Defect Qty", "INBOUND_DEL_DETAIL_LINE_QTY_DEFECT"),
+            ("Line Price", "INBOUND_DEL_DETAIL_LINE_PRICE"),
+            ("Expiry Date", "INBOUND_DEL_DETAIL_PROD_EXP_DATE"),
+        ],
+    },
+    "outbound-deliveries": {
+        "model": OutboundDeliveryDetails,
+        "date_field": "OUTBOUND_DEL_ID__OUTBOUND_DEL_CREATED",
+        "status_field": "OUTBOUND_DEL_ID__OUTBOUND_DEL_STATUS",
+        "ordering": ("OUTBOUND_DEL_ID", "pk"),
+        "columns": [
+            ("Delivery ID", "OUTBOUND_DEL_ID"),
+            ("Date Created", "OUTBOUND_DEL_ID__OUTBOUND_DEL_CREATED"),
+            ("Shipped Date", "OUTBOUND_DEL_ID__OUTBOUND_DEL_SHIPPED_DATE"),
+            ("Customer", "OUTBOUND_DEL_ID__OUTBOUND_DEL_CUSTOMER_NAME"),
+            ("Status", "OUTBOUND_DEL_ID__OUTBOUND_DEL_STATUS"),
+            ("Delivery Total", "OUTBOUND_DEL_ID__OUTBOUND_DEL_TOTAL_PRICE"),
+            ("Product ID", "OUTBOUND_DETAILS_PROD_ID"),
+            ("Product", "OUTBOUND_DETAILS_PROD_NAME"),
+            ("Ordered Qty", "OUTBOUND_DETAILS_PROD_QTY_ORDERED"),
+            ("Accepted Qty", "OUTBOUND_DETAILS_PROD_QTY_ACCEPTED"),
+            ("Defect Qty", "OUTBOUND_DETAILS_PROD_QTY_DEFECT"),
+            ("Sell Price", "OUTBOUND_DETAILS_SELL_PRICE"),
+            ("Line Total", "OUTBOUND_DETAIL_LINE_TOTAL"),
+        ],
+    },
+    "customer-payments": {
+        "model": CustomerPayment,
+        "date_field": "PAYMENT_START_DATE",
+        "status_field": "PAYMENT_STATUS",
+        "ordering": ("PAYMENT_START_DATE", "pk"),
+        "columns": [
+            ("Payment ID", "PAYMENT_ID"),
+            ("Outbound Delivery", "OUTBOUND_DEL_ID"),
+            ("Client", "CLIENT_NAME"),
+            ("Payment Method", "PAYMENT_METHOD"),
+            ("Payment Terms", "PAYMENT_TERMS"),
+            ("Start Date", "PAYMENT_START_DATE"),
+            ("Due Date", "PAYMENT_DUE_DATE"),
+            ("Status", "PAYMENT_STATUS"),
+            ("Amount Paid", "AMOUNT_PAID"),
+            ("Balance", "AMOUNT_BALANCE"),
+        ],
+    },
+}
+
+
+class Echo:
+    """File-like object whose write() just returns the value, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def export_rows(name, start_date=None, end_date=None, status=None):
+    """
+    Returns (headers, rows) for the export `name`, filtered by an inclusive
+    date range and a status. `rows` is a lazy iterator of tuples.
+    """
+    export = EXPORTS[name]
+    queryset = export["model"].objects.all()
+
+    date_field = export["date_field"]
+    if start_date:
+        queryset = queryset.filter(**{f"{date_field}__date__gte": start_date})
+    if end_date:
+        queryset = queryset.filter(**{f"{date_field}__date__lte": end_date})
+    if status:
+        status_field = export["status_field"]
+        if status_field == "IS_ACTIVE":
+            status = status.lower() in ("active", "true", "1")
+        queryset = queryset.filter(**{status_field: status})
+
+    headers = [header for header, _ in export["columns"]]
+    rows = (
+        queryset.order_by(*export["ordering"])
+        .values_list(*[lookup for _, lookup in export["columns"]])
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+    return headers, rows
+
+
+def _xlsx_value(value):
+    # openpyxl can't store timezone-aware datetimes
+    if isinstance(value, datetime) and timezone.is_aware(value):
+        return timezone.localtime(value).replace(tzinfo=None)
+    return value
+
+
+def iter_csv(headers, rows):
+    """Yields the CSV export line by line."""
+    writer = csv.writer(Echo())
+    yield writer.writerow(headers)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def write_csv(headers, rows, fileobj):
+    count = 0
+    for count, line in enumerate(iter_csv(headers, rows)):
+        fileobj.write(line.encode("utf-8"))
+    return count  # data rows, the header line is line 0
+
+
+def write_xlsx(headers, rows, fileobj):
+    """
+    Writes the export as an XLSX workbook. Uses openpyxl's write-only mode,
+    which streams rows to disk instead of building the sheet in memory.
+    """
+    # Optional dependency, only needed for XLSX exports
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(headers)
+    count = 0
+    for row in rows:
+        sheet.append([_xlsx_value(value) for value in row])
+        count += 1
+    workbook.save(fileobj)
+    return count
+
+
+WRITERS = {"csv": write_csv, "xlsx": write_xlsx}
+
+
+def export_filename(name, file_format):
+    stamp = timezone.localtime().strftime("%Y%m%d-%H%M%S")
+    return f"{name}-{stamp}.{file_format}"
+
+
+def save_export(name, file_format, **filters):
+    """
+    Writes the export to MEDIA_ROOT/exports for later download. Returns the
+    path relative to MEDIA_ROOT and the number of rows written.
+    """
+    headers, rows = export_rows(name, **filters)
+    filename = export_filename(name, file_format)
+    directory = os.path.join(settings.MEDIA_ROOT, EXPORT_DIR)
+    os.makedirs(directory, exist_ok=True)
+    full_path = os.path.join(directory, filename)
+
+    with open(full_path, "wb") as fileobj:
+        count = WRITERS[file_format](headers, rows, fileobj)
+
+    logger.info(f"Saved {name} export with {count} rows to {full_path}.")
+    return f"{EXPORT_DIR}/{filename}", count
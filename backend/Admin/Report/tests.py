@@ -1,3 +1,117 @@
+import csv
+import io
+import os
+import tempfile
+from datetime import date
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from openpyxl import load_workbook
+from rest_framework.test import APITestCase
 
-# Create your tests here.
+from Account.models import User
+
+from Admin.Product.models import Product
+from Admin.test_utils import create_batch, create_inbound_delivery
+from .models import ReportDetails
+from .utils import create_daily_report, product_stock_snapshot
+
+
+class DailyReportTest(TestCase):
+    def setUp(self):
+        self.delivery = create_inbound_delivery()
+
+    def add_products(self, count):
+        for i in range(count):
+            product = Product.objects.create(PROD_NAME=f"Item {i}", PROD_RO_QTY=i)
+            for quantity in (10, 4):
+                create_batch(product, self.delivery, quantity)
+
+    def count_report_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            create_daily_report(date.today())
+        return len(queries)
+
+    def test_snapshot_uses_first_and_latest_batch(self):
+        self.add_products(1)
+        Product.objects.create(PROD_NAME="No stock")
+
+        rows = {row["product"].PROD_NAME: row for row in product_stock_snapshot()}
+
+        self.assertEqual(rows["Item 0"]["opening_stock"], 10)
+        self.assertEqual(rows["Item 0"]["current_stock"], 4)
+        self.assertIsNotNone(rows["Item 0"]["date_created"])
+        self.assertEqual(rows["No stock"]["opening_stock"], 0)
+        self.assertIsNone(rows["No stock"]["date_created"])
+
+    def test_query_count_is_constant_in_product_count(self):
+        self.add_products(3)
+        small = self.count_report_queries()
+
+        self.add_products(30)
+        large = self.count_report_queries()
+
+        self.assertEqual(small, large)
+        self.assertEqual(ReportDetails.objects.count(), 3 + 33)
+
+
+class ExportTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="exporter",
+            password="testpassword",
+            email="exporter@example.com",
+            first_name="Export",
+            last_name="User",
+        )
+        self.client.force_authenticate(self.user)
+        delivery = create_inbound_delivery()
+        product = Product.objects.create(PROD_NAME="Amoxicillin")
+        for quantity in (5, 0):
+            create_batch(product, delivery, quantity, IS_ACTIVE=bool(quantity))
+
+    def test_csv_is_streamed_with_filters(self):
+        response = self.client.get(
+            "/report/export/inventory/",
+            {"status": "active", "start_date": date.today().isoformat()},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        rows = list(
+            csv.reader(b"".join(response.streaming_content).decode().splitlines())
+        )
+        self.assertEqual(rows[0][:2], ["Inventory ID", "Batch ID"])
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[1][6], "5")
+
+    def test_xlsx_export(self):
+        response = self.client.get("/report/export/inventory/", {"file_format": "xlsx"})
+
+        self.assertEqual(response.status_code, 200)
+        workbook = load_workbook(io.BytesIO(b"".join(response.streaming_content)))
+        self.assertEqual(workbook.active.max_row, 3)
+
+    def test_save_to_media_root(self):
+        with tempfile.TemporaryDirectory() as media_root:
+            with self.settings(MEDIA_ROOT=media_root):
+                response = self.client.get(
+                    "/report/export/inventory/", {"save": "true"}
+                )
+                self.assertEqual(response.status_code, 201)
+                self.assertEqual(response.data["rows"], 2)
+                path = os.path.join(
+                    media_root, response.data["file"].removeprefix("/media/")
+                )
+                self.assertTrue(os.path.exists(path))
+
+    def test_rejects_bad_input(self):
+        self.assertEqual(self.client.get("/report/export/unknown/").status_code, 404)
+        response = self.client.get(
+            "/report/export/inventory/", {"start_date": "yesterday"}
+        )
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(
+            "/report/export/inventory/", {"start_date": "2024-02-30"}
+        )
+        self.assertEqual(response.status_code, 400)
@@ -1,5 +1,5 @@
 from django.urls import path
-from .views import ReportAPIView, DailyReportAPIView, ViewDailyReportAPIView, OutboundProductAPIView
+from .views import ReportAPIView, DailyReportAPIView, ViewDailyReportAPIView, OutboundProductAPIView, ExportAPIView
 
 urlpatterns = [
     path('report/', ReportAPIView.as_view(), name='report'),
@@ -12,4 +12,7 @@ urlpatterns = [
 
     path('current/', OutboundProductAPIView.as_view(), name='View Daily'),
 
+    # path for csv/xlsx exports
+    path('export/<str:name>/', ExportAPIView.as_view(), name='export'),
+
 ]
\ No newline at end of file
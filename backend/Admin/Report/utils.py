@@ -0,0 +1,92 @@
+import logging
+from datetime import datetime
+from django.db import transaction
+from django.db.models import F, RowRange, Window
+from django.db.models.functions import FirstValue, LastValue
+
+from Admin.Inventory.models import Inventory
+from Admin.Product.models import Product
+from .models import Reports, ReportDetails
+
+logger = logging.getLogger(__name__)
+
+
+def product_stock_snapshot():
+    """
+    Returns opening stock, current stock, outbound quantity and the date of the
+    latest batch for every product, in two queries regardless of catalogue size.
+
+    Opening stock is the quantity on the product's earliest batch and current
+    stock the quantity on its most recent one, as the per-product loops used to
+    compute them. Both come from window functions over the inventory table.
+    """
+    window = {
+        "partition_by": [F("PRODUCT_ID")],
+        "order_by": [F("DATE_CREATED").asc(), F("INVENTORY_ID").asc()],
+        "frame": RowRange(start=None, end=None),
+    }
+    batches = (
+        Inventory.objects.annotate(
+            opening=Window(FirstValue("QUANTITY_ON_HAND"), **window),
+            current=Window(LastValue("QUANTITY_ON_HAND"), **window),
+            latest=Window(LastValue("DATE_CREATED"), **window),
+        )
+        .values_list("PRODUCT_ID", "opening", "current", "latest")
+        .distinct()
+    )
+    stock = {
+        product_id: (opening, current, latest)
+        for product_id, opening, current, latest in batches
+    }
+
+    snapshot = []
+    products = Product.objects.only("id", "PROD_NAME", "PROD_RO_QTY").order_by("id")
+    for product in products:
+        opening, current, latest = stock.get(product.pk, (0, 0, None))
+        snapshot.append(
+            {
+                "product": product,
+                "opening_stock": opening,
+                "current_stock": current,
+                # Outbound quantity from the Product model
+                "outbound_quantity": product.PROD_RO_QTY,
+                "date_created": latest,
+            }
+        )
+    return snapshot
+
+
+def create_daily_report(today):
+    """
+    Builds today's daily inventory report and writes all of its details with a
+    single bulk insert. Returns the report and the snapshot it was built from.
+    """
+    snapshot = product_stock_snapshot()
+
+    with transaction.atomic():
+        report = Reports.objects.create(
+            REPORT_TYPE="Daily",
+            REPORT_DATETIME=datetime.now(),
+            REPORT_TITLE=f"Daily Inventory Report - {today}",
+            REPORT_DESCRIPTION=(
+                "This is the daily report for inventory status and outbound products."
+            ),
+        )
+        ReportDetails.objects.bulk_create(
+            [
+                ReportDetails(
+                    report=report,
+                    product=row["product"],
+                    opening_stock=row["opening_stock"],
+                    current_stock=row["current_stock"],
+                    outbound_quantity=row["outbound_quantity"],
+                )
+                for row in snapshot
+            ],
+            batch_size=1000,
+        )
+
+    logger.info(
+        f"Daily report {report.REPORT_ID} created for {len(snapshot)} products."
+    )
+    return report, snapshot
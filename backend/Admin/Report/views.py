@@ -1,14 +1,27 @@
+import tempfile
+from django.conf import settings
+from django.http import FileResponse, StreamingHttpResponse
 from django.shortcuts import render
+from django.utils.dateparse import parse_date
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from datetime import datetime
 from .models import Reports, ReportDetails
 from .serializers import ReportsSerializer
-from Admin.Product.models import Product  # Ensure the Product model is correctly imported
-from Admin.Inventory.models import Inventory  # Ensure the Inventory model is correctly imported
+from .utils import create_daily_report, product_stock_snapshot
+from .exports import (
+    EXPORT_FORMATS,
+    EXPORTS,
+    WRITERS,
+    export_filename,
+    export_rows,
+    iter_csv,
+    save_export,
+)
 from Admin.authentication import CookieJWTAuthentication
-from rest_framework.permissions import AllowAny
+from PHILVETS.routers import ReplicaReadMixin, use_primary
+from rest_framework.permissions import AllowAny, IsAuthenticated
 
 class ReportAPIView(APIView):
     authentication_classes = [CookieJWTAuthentication]
@@ -26,7 +39,7 @@ class ReportAPIView(APIView):
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-class DailyReportAPIView(APIView):
+class DailyReportAPIView(ReplicaReadMixin, APIView):
     authentication_classes = [CookieJWTAuthentication]
     permission_classes = [AllowAny]
 
@@ -34,66 +47,27 @@ class DailyReportAPIView(APIView):
         # Get today's date
         today = datetime.today().date()
 
-        # Check if a report already exists for today to avoid duplication
-        existing_report = Reports.objects.filter(REPORT_TYPE='Daily', REPORT_DATETIME__date=today).first()
+        # Check if a report already exists for today to avoid duplication, on
+        # the primary so a report created moments ago isn't missed
+        with use_primary():
+            existing_report = Reports.objects.filter(REPORT_TYPE='Daily', REPORT_DATETIME__date=today).first()
         if existing_report:
             return Response({'error': 'Daily report for today already exists.'}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Get all products
-        products = Product.objects.all()
-
-        # Prepare report data and report details
-        report_data = []
-        report_details = []
-        for product in products:
-            # Get the latest inventory entry for each product (based on the most recent DATE_CREATED)
-            inventory_entries = Inventory.objects.filter(PRODUCT_ID=product).order_by('DATE_CREATED')
-
-            if inventory_entries.exists():
-                # Opening stock is the first entry for the product (earliest entry)
-                opening_stock = inventory_entries.first().QUANTITY_ON_HAND  
-                # Current stock is the latest inventory entry (most recent entry)
-                current_stock = inventory_entries.last().QUANTITY_ON_HAND  
-            else:
-                opening_stock = 0
-                current_stock = 0
-
-            outbound_quantity = product.PROD_RO_QTY  # Outbound quantity from the Product model
-
-            # Add data for the report
-            report_data.append({
-                'product_name': product.PROD_NAME,
-                'opening_stock': opening_stock,
-                'current_stock': current_stock,
-                'outbound_quantity': outbound_quantity,
-                'date': today,
-            })
-
-            # Add to report details
-            report_details.append(ReportDetails(
-                product=product,
-                opening_stock=opening_stock,
-                current_stock=current_stock,
-                outbound_quantity=outbound_quantity
-            ))
-
-        # Create a new report entry
-        report_title = f"Daily Inventory Report - {today}"
-        report_description = "This is the daily report for inventory status and outbound products."
-        report = Reports(
-            REPORT_TYPE='Daily',
-            REPORT_DATETIME=datetime.now(),
-            REPORT_TITLE=report_title,
-            REPORT_DESCRIPTION=report_description,
-        )
-        report.save()
-
-        # Save the report details
-        for detail in report_details:
-            detail.report = report  # Associate each detail with the report
-            detail.save()
+        # Opening/current stock for every product in a constant number of queries
+        report, snapshot = create_daily_report(today)
 
         # Return the report data
+        report_data = [
+            {
+                'product_name': row['product'].PROD_NAME,
+                'opening_stock': row['opening_stock'],
+                'current_stock': row['current_stock'],
+                'outbound_quantity': row['outbound_quantity'],
+                'date': today,
+            }
+            for row in snapshot
+        ]
         return Response(report_data, status=status.HTTP_200_OK)
 
 class ViewDailyReportAPIView(APIView):
@@ -110,7 +84,7 @@ class ViewDailyReportAPIView(APIView):
             return Response({'error': 'No daily report found for today.'}, status=status.HTTP_404_NOT_FOUND)
 
         # Retrieve the report details
-        report_details = ReportDetails.objects.filter(report=existing_report)
+        report_details = ReportDetails.objects.filter(report=existing_report).select_related('product')
 
         # Prepare the report data to return
         report_data = []
@@ -126,44 +100,93 @@ class ViewDailyReportAPIView(APIView):
         # Return the report data
         return Response(report_data, status=status.HTTP_200_OK)
 
-class OutboundProductAPIView(APIView):
+class OutboundProductAPIView(ReplicaReadMixin, APIView):
     authentication_classes = [CookieJWTAuthentication]
     permission_classes = [AllowAny]
 
     def get(self, request):
-        # Get all products
-        products = Product.objects.all()
-
         # Prepare the outbound product data
         outbound_products = []
-
-        for product in products:
-            # Get the inventory entries for the product ordered by creation date
-            inventory_entries = Inventory.objects.filter(PRODUCT_ID=product).order_by('DATE_CREATED')
-
-            if inventory_entries.exists():
-                # Opening stock: the first entry
-                opening_stock = inventory_entries.first().QUANTITY_ON_HAND
-                # Current stock: the last entry
-                current_stock = inventory_entries.last().QUANTITY_ON_HAND
-                # Date of the most recent inventory entry
-                date_created = inventory_entries.last().DATE_CREATED
-            else:
-                opening_stock = 0
-                current_stock = 0
-                date_created = 'N/A'
-
-            # Outbound quantity from the Product model
-            outbound_quantity = product.PROD_RO_QTY
-
-            # Add data for the outbound product
+        for row in product_stock_snapshot():
+            date_created = row['date_created']
             outbound_products.append({
-                'product_name': product.PROD_NAME,
-                'opening_stock': opening_stock,
-                'current_stock': current_stock,
-                'outbound_quantity': outbound_quantity,
-                'date': str(date_created) if date_created != 'N/A' else 'N/A',
+                'product_name': row['product'].PROD_NAME,
+                'opening_stock': row['opening_stock'],
+                'current_stock': row['current_stock'],
+                'outbound_quantity': row['outbound_quantity'],
+                'date': str(date_created) if date_created else 'N/A',
             })
 
         # Return the outbound product data
-        return Response(outbound_products, status=status.HTTP_200_OK)
\ No newline at end of file
+        return Response(outbound_products, status=status.HTTP_200_OK)
+
+
+class ExportAPIView(APIView):
+    """
+    Exports sales, inventory, delivery and payment data as CSV or XLSX.
+
+    Query parameters: file_format (csv or xlsx), start_date and end_date
+    (YYYY-MM-DD, inclusive), status, and save=true to write the file under
+    MEDIA_ROOT instead of downloading it.
+    """
+    authentication_classes = [CookieJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, name):
+        if name not in EXPORTS:
+            return Response({'error': f'Unknown export {name}.'}, status=status.HTTP_404_NOT_FOUND)
+
+        file_format = request.query_params.get('file_format', 'csv').lower()
+        if file_format not in EXPORT_FORMATS:
+            return Response(
+                {'error': f"file_format must be one of {', '.join(EXPORT_FORMATS)}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if file_format == 'xlsx':
+            try:
+                import openpyxl  # noqa: F401
+            except ImportError:
+                return Response(
+                    {'error': 'XLSX export requires the openpyxl package.'},
+                    status=status.HTTP_501_NOT_IMPLEMENTED,
+                )
+
+        filters = {'status': request.query_params.get('status')}
+        for param in ('start_date', 'end_date'):
+            value = request.query_params.get(param)
+            if value:
+                try:
+                    filters[param] = parse_date(value)
+                except ValueError:
+                    # Well formed but not a real date, such as 2024-02-30
+                    filters[param] = None
+                if filters[param] is None:
+                    return Response(
+                        {'error': f'{param} must be a date in YYYY-MM-DD format.'},
+                        status=status.HTTP_400_BAD_REQUEST,
+                    )
+
+        # Save to MEDIA_ROOT for later download
+        if request.query_params.get('save', '').lower() == 'true':
+            relative_path, count = save_export(name, file_format, **filters)
+            return Response(
+                {
+                    'file': settings.MEDIA_URL + relative_path,
+                    'rows': count,
+                },
+                status=status.HTTP_201_CREATED,
+            )
+
+        filename = export_filename(name, file_format)
+        headers, rows = export_rows(name, **filters)
+        if file_format == 'csv':
+            response = StreamingHttpResponse(iter_csv(headers, rows), content_type='text/csv')
+            response['Content-Disposition'] = f'attachment; filename="{filename}"'
+            return response
+
+        # XLSX is a zip archive and can't be emitted row by row, build it in a
+        # temporary file on disk and stream that back
+        fileobj = tempfile.TemporaryFile()
+        WRITERS[file_format](headers, rows, fileobj)
+        fileobj.seek(0)
+        return FileResponse(fileobj, as_attachment=True, filename=filename)
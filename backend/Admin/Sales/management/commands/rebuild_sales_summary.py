@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from Admin.Sales.utils import rebuild_sales_summary
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes the daily sales summary from the sales invoice items. Run once "
+        "to backfill existing invoices, or over a date range to repair drift."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--start-date", help="First day to rebuild (YYYY-MM-DD).")
+        parser.add_argument("--end-date", help="Last day to rebuild (YYYY-MM-DD).")
+
+    def handle(self, *args, **options):
+        dates = {}
+        for option in ("start_date", "end_date"):
+            value = options[option]
+            if value:
+                dates[option] = parse_date(value)
+                if dates[option] is None:
+                    raise CommandError(
+                        f"Invalid date for --{option.replace('_', '-')}."
+                    )
+
+        written = rebuild_sales_summary(**dates)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} daily sales rows."))
@@ -1,12 +1,16 @@
 from datetime import datetime, timedelta
 from django.db import models
-from django.db.models import Sum
+from django.db.models import BigIntegerField, Max, Sum
+from django.db.models.functions import Cast, Substr
 
 
 from Admin.Delivery.models import OutboundDelivery
 from django.conf import settings
 from Admin.Customer.models import Clients
 from Admin.Product.models import Product
+from Admin.Sequence.utils import next_id
+
+SALES_INVOICE_SERIES = "sales_invoice"
 
 
 class CustomerPayment(models.Model):
@@ -123,14 +127,10 @@ class SalesInvoice(models.Model):
     #     self.SALES_INV_TOTAL_GROSS_INCOME = total_income
 
     def save(self, *args, **kwargs):
-        # Automatically generate the sales invoice ID (starts with INV01)
+        # Automatically generate the sales invoice ID (starts with INV001)
         if not self.SALES_INV_ID:
-            last_invoice = SalesInvoice.objects.all().order_by("SALES_INV_ID").last()
-            if last_invoice:
-                last_inv_num = int(last_invoice.SALES_INV_ID[3:]) + 1
-                self.SALES_INV_ID = f"INV{last_inv_num:03d}"
-            else:
-                self.SALES_INV_ID = "INV001"
+            number = next_id(SALES_INVOICE_SERIES, seed=last_sales_invoice_number)
+            self.SALES_INV_ID = f"INV{number:03d}"
 
         # Save the SalesInvoice first to generate a primary key
         super().save(*args, **kwargs)
@@ -139,6 +139,20 @@ class SalesInvoice(models.Model):
         db_table = "SALES_INVOICE"
         verbose_name = "Sale Invoice"
         verbose_name_plural = "Sales Invoice"
+        indexes = [
+            # The invoice list filters on a date range, newest first
+            models.Index(fields=["-SALES_INV_DATETIME"], name="SALES_INV_DATETIME_IDX"),
+        ]
+
+
+def last_sales_invoice_number():
+    """Highest numeric part of the existing INVnnn sales invoice IDs."""
+    return (
+        SalesInvoice.objects.filter(SALES_INV_ID__regex=r"^INV[0-9]+$")
+        .annotate(number=Cast(Substr("SALES_INV_ID", 4), BigIntegerField()))
+        .aggregate(last=Max("number"))["last"]
+        or 0
+    )
 
 
 class SalesInvoiceItems(models.Model):
@@ -184,3 +198,28 @@ class SalesInvoiceItems(models.Model):
         db_table = "SALES_INVOICE_ITEMS"
         verbose_name = "Sales Invoice Item"
         verbose_name_plural = "Sales Invoice Items"
+
+
+class DailySalesSummary(models.Model):
+    # One row per day, product and client, maintained when invoices are created
+    SUMMARY_DATE = models.DateField()
+    PRODUCT = models.ForeignKey(
+        Product, on_delete=models.CASCADE, related_name="daily_sales"
+    )
+    CLIENT = models.ForeignKey(
+        Clients, on_delete=models.CASCADE, related_name="daily_sales"
+    )
+    REVENUE = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    GROSS_INCOME = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    QUANTITY = models.PositiveIntegerField(default=0)
+    INVOICE_COUNT = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.SUMMARY_DATE} - {self.PRODUCT_id} - {self.CLIENT_id}"
+
+    class Meta:
+        db_table = "DAILY_SALES_SUMMARY"
+        verbose_name = "Daily Sales Summary"
+        verbose_name_plural = "Daily Sales Summaries"
+        unique_together = ("SUMMARY_DATE", "PRODUCT", "CLIENT")
+        indexes = [models.Index(fields=["PRODUCT", "SUMMARY_DATE"])]
@@ -1,3 +1,110 @@
-from django.test import TestCase
+from datetime import datetime
+from decimal import Decimal
+from django.core.management import call_command
+from io import StringIO
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
 
-# Create your tests here.
+from Admin.Customer.models import Clients
+from Admin.Delivery.models import OutboundDelivery, OutboundDeliveryDetails
+from Admin.Order.Sales_Order.models import SalesOrder
+from Admin.Product.models import Product, ProductDetails
+from .models import CustomerPayment, DailySalesSummary, SalesInvoice
+from .utils import rebuild_sales_summary
+
+
+class DailySalesSummaryTest(APITestCase):
+    def setUp(self):
+        self.client_record = Clients.objects.create(
+            name="Happy Paws", address="Main St", province="Cebu"
+        )
+        details = ProductDetails.objects.create(PROD_DETAILS_PURCHASE_PRICE=60)
+        self.product = Product.objects.create(
+            PROD_NAME="Amoxicillin", PROD_DETAILS_CODE=details
+        )
+
+    def create_payment(self, quantity, sell_price=100):
+        delivery = OutboundDelivery.objects.create(
+            SALES_ORDER_ID=SalesOrder.objects.create(CLIENT_ID=self.client_record),
+            CLIENT_ID=self.client_record,
+            OUTBOUND_DEL_CUSTOMER_NAME=self.client_record.name,
+        )
+        OutboundDeliveryDetails.objects.create(
+            OUTBOUND_DEL_ID=delivery,
+            OUTBOUND_DETAILS_PROD_ID=self.product,
+            OUTBOUND_DETAILS_PROD_NAME=self.product.PROD_NAME,
+            OUTBOUND_DETAILS_PROD_QTY_ACCEPTED=quantity,
+            OUTBOUND_DETAILS_SELL_PRICE=sell_price,
+        )
+        amount = Decimal(quantity * sell_price)
+        return CustomerPayment.objects.create(
+            OUTBOUND_DEL_ID=delivery,
+            CLIENT_ID=self.client_record,
+            CLIENT_NAME=self.client_record.name,
+            PAYMENT_TERMS=30,
+            PAYMENT_METHOD="Cash",
+            AMOUNT_BALANCE=amount,
+        )
+
+    def pay(self, payment):
+        url = reverse("customer-payment-details", args=[payment.PAYMENT_ID])
+        return self.client.patch(
+            url, {"CUSTOMER_AMOUNT_PAID": str(payment.AMOUNT_BALANCE)}, format="json"
+        )
+
+    def test_paid_invoices_are_added_to_the_summary(self):
+        for quantity in (2, 3):
+            response = self.pay(self.create_payment(quantity))
+            self.assertEqual(response.status_code, 200)
+
+        summary = DailySalesSummary.objects.get()
+        self.assertEqual(summary.SUMMARY_DATE, timezone.localdate())
+        self.assertEqual(summary.PRODUCT, self.product)
+        self.assertEqual(summary.REVENUE, Decimal("500.00"))
+        self.assertEqual(summary.GROSS_INCOME, Decimal("200.00"))
+        self.assertEqual(summary.QUANTITY, 5)
+        self.assertEqual(summary.INVOICE_COUNT, 2)
+
+    def test_rebuild_matches_incremental_totals(self):
+        for quantity in (1, 4):
+            self.pay(self.create_payment(quantity))
+        expected = list(
+            DailySalesSummary.objects.values(
+                "SUMMARY_DATE", "REVENUE", "GROSS_INCOME", "QUANTITY", "INVOICE_COUNT"
+            )
+        )
+
+        DailySalesSummary.objects.all().delete()
+        self.assertEqual(rebuild_sales_summary(), 1)
+        self.assertEqual(
+            list(
+                DailySalesSummary.objects.values(
+                    "SUMMARY_DATE",
+                    "REVENUE",
+                    "GROSS_INCOME",
+                    "QUANTITY",
+                    "INVOICE_COUNT",
+                )
+            ),
+            expected,
+        )
+
+        call_command("rebuild_sales_summary", stdout=StringIO())
+        self.assertEqual(DailySalesSummary.objects.count(), 1)
+
+    def test_monthly_revenue_reads_the_summary(self):
+        self.pay(self.create_payment(2))
+        self.assertEqual(SalesInvoice.objects.count(), 1)
+
+        response = self.client.get(reverse("monthly-sales"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 12)
+        month = response.data[datetime.now().month - 1]
+        self.assertEqual(month["revenue"], 200.0)
+        self.assertEqual(month["income"], 80.0)
+
+    def test_monthly_revenue_rejects_a_bad_product(self):
+        response = self.client.get(reverse("monthly-sales"), {"product": "abc"})
+
+        self.assertEqual(response.status_code, 400)
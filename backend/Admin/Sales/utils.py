@@ -1,4 +1,14 @@
-from .models import SalesInvoice, SalesInvoiceItems
+from itertools import islice
+
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import DailySalesSummary, SalesInvoice, SalesInvoiceItems
+
+SUMMARY_BATCH_SIZE = 1000
+SUMMARY_TOTAL_FIELDS = ["REVENUE", "GROSS_INCOME", "QUANTITY", "INVOICE_COUNT"]
 
 
 # Utility function to recalculate sales invoice and its items
@@ -27,3 +37,104 @@ def recalculate_sales_invoice(invoice_id):
     invoice.save()  # Save the updated invoice
 
     return invoice
+
+
+def record_invoice_sales(invoice, items):
+    """
+    Adds a new invoice's items to the daily sales summary. Lines are grouped
+    per product, missing summary rows are created, then the affected rows are
+    locked and incremented with one bulk update. Returns the number of summary
+    rows touched.
+    """
+    totals = {}
+    for item in items:
+        revenue, income, quantity = totals.get(
+            item.SALES_INV_ITEM_PROD_ID_id, (0, 0, 0)
+        )
+        totals[item.SALES_INV_ITEM_PROD_ID_id] = (
+            revenue + item.SALES_INV_ITEM_LINE_GROSS_REVENUE,
+            income + item.SALES_INV_ITEM_LINE_GROSS_INCOME,
+            quantity + item.SALES_INV_item_PROD_DLVRD,
+        )
+    if not totals:
+        return 0
+
+    summary_date = timezone.localdate(invoice.SALES_INV_DATETIME)
+    with transaction.atomic():
+        DailySalesSummary.objects.bulk_create(
+            [
+                DailySalesSummary(
+                    SUMMARY_DATE=summary_date,
+                    PRODUCT_id=product_id,
+                    CLIENT_id=invoice.CLIENT_id,
+                )
+                for product_id in totals
+            ],
+            ignore_conflicts=True,
+        )
+        # Lock in a fixed order so concurrent invoices can't deadlock
+        summaries = list(
+            DailySalesSummary.objects.select_for_update()
+            .filter(
+                SUMMARY_DATE=summary_date,
+                CLIENT_id=invoice.CLIENT_id,
+                PRODUCT_id__in=totals,
+            )
+            .order_by("PRODUCT_id")
+        )
+        for summary in summaries:
+            revenue, income, quantity = totals[summary.PRODUCT_id]
+            summary.REVENUE += revenue
+            summary.GROSS_INCOME += income
+            summary.QUANTITY += quantity
+            summary.INVOICE_COUNT += 1
+        DailySalesSummary.objects.bulk_update(summaries, SUMMARY_TOTAL_FIELDS)
+    return len(summaries)
+
+
+def rebuild_sales_summary(start_date=None, end_date=None):
+    """
+    Recomputes the daily sales summary from the invoice items, for an inclusive
+    date range or for the whole history. Returns the number of rows written.
+    """
+    items = SalesInvoiceItems.objects.all()
+    summaries = DailySalesSummary.objects.all()
+    if start_date:
+        items = items.filter(SALES_INV_ID__SALES_INV_DATETIME__date__gte=start_date)
+        summaries = summaries.filter(SUMMARY_DATE__gte=start_date)
+    if end_date:
+        items = items.filter(SALES_INV_ID__SALES_INV_DATETIME__date__lte=end_date)
+        summaries = summaries.filter(SUMMARY_DATE__lte=end_date)
+
+    rows = (
+        items.annotate(day=TruncDate("SALES_INV_ID__SALES_INV_DATETIME"))
+        .values("day", "SALES_INV_ITEM_PROD_ID", "SALES_INV_ID__CLIENT")
+        .annotate(
+            revenue=Sum("SALES_INV_ITEM_LINE_GROSS_REVENUE"),
+            income=Sum("SALES_INV_ITEM_LINE_GROSS_INCOME"),
+            quantity=Sum("SALES_INV_item_PROD_DLVRD"),
+            invoices=Count("SALES_INV_ID", distinct=True),
+        )
+        .order_by()
+        .iterator(chunk_size=SUMMARY_BATCH_SIZE)
+    )
+    objs = (
+        DailySalesSummary(
+            SUMMARY_DATE=row["day"],
+            PRODUCT_id=row["SALES_INV_ITEM_PROD_ID"],
+            CLIENT_id=row["SALES_INV_ID__CLIENT"],
+            REVENUE=row["revenue"],
+            GROSS_INCOME=row["income"],
+            QUANTITY=row["quantity"],
+            INVOICE_COUNT=row["invoices"],
+        )
+        for row in rows
+    )
+
+    written = 0
+    with transaction.atomic():
+        summaries.delete()
+        while batch := list(islice(objs, SUMMARY_BATCH_SIZE)):
+            DailySalesSummary.objects.bulk_create(batch)
+            written += len(batch)
+    return written
@@ -3,15 +3,22 @@ from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.filters import SearchFilter
-from rest_framework.pagination import PageNumberPagination
-
-from .models import SalesInvoice, SalesInvoiceItems, CustomerPayment
+from Admin.pagination import KeysetPagination
+from PHILVETS.routers import ReplicaReadMixin
+
+from .models import (
+    SalesInvoice,
+    SalesInvoiceItems,
+    CustomerPayment,
+    DailySalesSummary,
+)
 from .serializers import (
     CustomerPaymentSerializer,
     CustomerPaymentListSerializer,
     SalesInvoiceSerializer,
     SalesInvoiceItemsSerializer,
 )
+from .utils import record_invoice_sales
 from django.db import transaction
 from django.db.models import Sum, Q, F
 from django.db.models.functions import TruncMonth
@@ -29,7 +36,7 @@ logger = logging.getLogger(__name__)
 
 
 # # Custom pagination class to handle paginated responses
-class SalesInvoicePagination(PageNumberPagination):
+class SalesInvoicePagination(KeysetPagination):
     page_size = 10  # You can set your own page size or get it from query parameters
     page_size_query_param = "page_size"
     max_page_size = 100
@@ -188,7 +195,10 @@ class ViewPaymentDetails(APIView):
                     total_gross_income = Decimal("0.00")
 
                     # Loop through each OutboundDeliveryDetails item and create SalesInvoiceItems
-                    for item in outbound_delivery.outbound_details.all():
+                    invoice_items = []
+                    for item in outbound_delivery.outbound_details.select_related(
+                        "OUTBOUND_DETAILS_PROD_ID__PROD_DETAILS_CODE"
+                    ):
                         # Fetch the product details for the current product in the outbound details
                         product_details = (
                             item.OUTBOUND_DETAILS_PROD_ID.PROD_DETAILS_CODE
@@ -212,21 +222,25 @@ class ViewPaymentDetails(APIView):
                         total_gross_revenue += line_gross_revenue
                         total_gross_income += line_gross_income
 
-                        # Create the SalesInvoiceItems
-                        SalesInvoiceItems.objects.create(
-                            SALES_INV_ID=sales_invoice,  # Reference to the created SalesInvoice
-                            SALES_INV_ITEM_PROD_ID=item.OUTBOUND_DETAILS_PROD_ID,  # Product ID
-                            SALES_INV_ITEM_PROD_NAME=item.OUTBOUND_DETAILS_PROD_NAME,  # Product Name
-                            SALES_INV_item_PROD_DLVRD=item.OUTBOUND_DETAILS_PROD_QTY_ACCEPTED,  # Quantity Delivered
-                            SALES_INV_ITEM_PROD_SELL_PRICE=item.OUTBOUND_DETAILS_SELL_PRICE,  # Selling Price
-                            SALES_INV_ITEM_PROD_PURCH_PRICE=purchase_price,  # Purchase Price from ProductDetails
-                            SALES_INV_ITEM_LINE_GROSS_REVENUE=line_gross_revenue,  # Gross revenue for the item
-                            SALES_INV_ITEM_LINE_GROSS_INCOME=line_gross_income,  # Gross income for the item
-                        )
-                        logger.info(
-                            f"Sales invoice item created for product ID: {item.OUTBOUND_DETAILS_PROD_ID}"
+                        # Build the SalesInvoiceItems, inserted together below
+                        invoice_items.append(
+                            SalesInvoiceItems(
+                                SALES_INV_ID=sales_invoice,  # Reference to the created SalesInvoice
+                                SALES_INV_ITEM_PROD_ID=item.OUTBOUND_DETAILS_PROD_ID,  # Product ID
+                                SALES_INV_ITEM_PROD_NAME=item.OUTBOUND_DETAILS_PROD_NAME,  # Product Name
+                                SALES_INV_item_PROD_DLVRD=item.OUTBOUND_DETAILS_PROD_QTY_ACCEPTED,  # Quantity Delivered
+                                SALES_INV_ITEM_PROD_SELL_PRICE=item.OUTBOUND_DETAILS_SELL_PRICE,  # Selling Price
+                                SALES_INV_ITEM_PROD_PURCH_PRICE=purchase_price,  # Purchase Price from ProductDetails
+                                SALES_INV_ITEM_LINE_GROSS_REVENUE=line_gross_revenue,  # Gross revenue for the item
+                                SALES_INV_ITEM_LINE_GROSS_INCOME=line_gross_income,  # Gross income for the item
+                            )
                         )
 
+                    SalesInvoiceItems.objects.bulk_create(invoice_items)
+                    logger.info(
+                        f"{len(invoice_items)} sales invoice items created for {sales_invoice.SALES_INV_ID}"
+                    )
+
                     # Update the total gross revenue and gross income in the sales_invoice
                     sales_invoice.SALES_INV_TOTAL_GROSS_REVENUE = total_gross_revenue
                     sales_invoice.SALES_INV_TOTAL_GROSS_INCOME = total_gross_income
@@ -238,6 +252,9 @@ class ViewPaymentDetails(APIView):
                         f"Sales invoice totals updated: GROSS_REVENUE={total_gross_revenue}, GROSS_INCOME={total_gross_income}"
                     )
 
+                    # Keep the daily sales summary in step with the new invoice
+                    record_invoice_sales(sales_invoice, invoice_items)
+
                 # Serialize the updated payment and return the response
                 serializer = CustomerPaymentSerializer(payment)
                 logger.info(f"Payment serialized with ID: {payment.PAYMENT_ID}")
@@ -286,12 +303,12 @@ class AddPaymentView(APIView):
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
 
-class SalesInvoicePagination(PageNumberPagination):
+class SalesInvoicePagination(KeysetPagination):
     page_size = 10  # Set the number of items per page
     page_size_query_param = "page_size"  # Allow overriding via query parameter
 
 
-class SalesInvoiceListView(APIView):
+class SalesInvoiceListView(ReplicaReadMixin, APIView):
     permission_classes = [permissions.AllowAny]
 
     def get(self, request):
@@ -318,19 +335,12 @@ class SalesInvoiceListView(APIView):
         ).order_by("-SALES_INV_DATETIME")
 
         # Calculate the sum of gross income and revenue for the filtered invoices
-        total_gross_income = (
-            sales_invoices.aggregate(total_income=Sum("SALES_INV_TOTAL_GROSS_INCOME"))[
-                "total_income"
-            ]
-            or 0
-        )
-
-        total_gross_revenue = (
-            sales_invoices.aggregate(
-                total_revenue=Sum("SALES_INV_TOTAL_GROSS_REVENUE")
-            )["total_revenue"]
-            or 0
+        totals = sales_invoices.aggregate(
+            total_income=Sum("SALES_INV_TOTAL_GROSS_INCOME"),
+            total_revenue=Sum("SALES_INV_TOTAL_GROSS_REVENUE"),
         )
+        total_gross_income = totals["total_income"] or 0
+        total_gross_revenue = totals["total_revenue"] or 0
 
         # Paginate results
         paginator = SalesInvoicePagination()
@@ -381,22 +391,33 @@ class SalesInvoiceDetailsView(APIView):
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
 
-class MonthlyRevenueIncomeAPI(APIView):
+class MonthlyRevenueIncomeAPI(ReplicaReadMixin, APIView):
     permission_classes = [permissions.AllowAny]
 
     def get(self, request):
-        """Fetch total revenue and income for each month in the current year."""
+        """
+        Fetch total revenue and income for each month in the current year, read
+        from the daily sales summary. Pass `product` to limit it to one product.
+        """
         current_year = datetime.now().year  # Get the current year
 
         # Filter by current year and group by month
+        summaries = DailySalesSummary.objects.filter(SUMMARY_DATE__year=current_year)
+        product_id = request.query_params.get("product")
+        if product_id:
+            try:
+                product_id = int(product_id)
+            except ValueError:
+                return Response(
+                    {"error": "product must be a product ID."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            summaries = summaries.filter(PRODUCT_id=product_id)
+
         monthly_data = (
-            SalesInvoice.objects.filter(SALES_INV_DATETIME__year=current_year)
-            .annotate(month=TruncMonth("SALES_INV_DATETIME"))  # Group by month
+            summaries.annotate(month=TruncMonth("SUMMARY_DATE"))  # Group by month
             .values("month")
-            .annotate(
-                revenue=Sum("SALES_INV_TOTAL_GROSS_REVENUE"),
-                income=Sum("SALES_INV_TOTAL_GROSS_INCOME"),
-            )
+            .annotate(revenue=Sum("REVENUE"), income=Sum("GROSS_INCOME"))
             .order_by("month")
         )
 
@@ -0,0 +1,10 @@
+from django.contrib import admin
+
+from .models import SearchDocument
+
+
+@admin.register(SearchDocument)
+class SearchDocumentAdmin(admin.ModelAdmin):
+    list_display = ("DOC_TYPE", "OBJECT_ID", "TITLE", "LAST_UPDATED")
+    list_filter = ("DOC_TYPE",)
+    search_fields = ("OBJECT_ID", "TITLE")
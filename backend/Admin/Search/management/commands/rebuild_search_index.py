@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from Admin.Search.utils import INDEX_CHUNK_SIZE, rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = (
+        "Reindexes every product and inventory batch for search and removes "
+        "documents whose product or batch no longer exists."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=INDEX_CHUNK_SIZE,
+            help="Rows read and written per batch.",
+        )
+
+    def handle(self, *args, **options):
+        counts = rebuild_search_index(chunk_size=options["chunk_size"])
+        for doc_type, count in counts.items():
+            self.stdout.write(f"{doc_type}: {count} documents indexed")
+        self.stdout.write(self.style.SUCCESS("Search index rebuilt."))
@@ -0,0 +1,86 @@
+# Generated by Django 5.1.3 on 2026-10-18 16:00
+
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+# GIN indexes for the search vector and for the trigram list, split into an
+# array so && (shares a trigram) can use it. Neither needs an extension.
+INDEXES = [
+    (
+        "SEARCH_DOC_VECTOR_GIN",
+        'USING gin ("SEARCH_VECTOR")',
+    ),
+    (
+        "SEARCH_DOC_TRIGRAM_GIN",
+        "USING gin ((string_to_array(\"TRIGRAMS\", ' ')))",
+    ),
+]
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, definition in INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS "{name}" ON "SEARCH_DOCUMENT" {definition}'
+        )
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, _ in INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS "{name}"')
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="SearchDocument",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "DOC_TYPE",
+                    models.CharField(
+                        choices=[("product", "Product"), ("inventory", "Inventory")],
+                        max_length=20,
+                    ),
+                ),
+                ("OBJECT_ID", models.CharField(max_length=50)),
+                ("PRODUCT_ID", models.IntegerField(blank=True, null=True)),
+                ("TITLE", models.CharField(max_length=255)),
+                ("SUBTITLE", models.CharField(blank=True, default="", max_length=255)),
+                ("NAME_TOKENS", models.TextField(blank=True, default="")),
+                ("KEYWORD_TOKENS", models.TextField(blank=True, default="")),
+                ("TRIGRAMS", models.TextField(blank=True, default="")),
+                ("TRIGRAM_COUNT", models.PositiveIntegerField(default=0)),
+                (
+                    "SEARCH_VECTOR",
+                    django.contrib.postgres.search.SearchVectorField(
+                        blank=True, null=True
+                    ),
+                ),
+                ("LAST_UPDATED", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "SEARCH DOCUMENT",
+                "verbose_name_plural": "SEARCH DOCUMENTS",
+                "db_table": "SEARCH_DOCUMENT",
+                "unique_together": {("DOC_TYPE", "OBJECT_ID")},
+            },
+        ),
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
@@ -0,0 +1,32 @@
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models
+
+
+class SearchDocument(models.Model):
+    # One row per searchable object, kept in step by Admin.Search.signals
+    PRODUCT = "product"
+    INVENTORY = "inventory"
+    DOC_TYPES = [(PRODUCT, "Product"), (INVENTORY, "Inventory")]
+
+    DOC_TYPE = models.CharField(max_length=20, choices=DOC_TYPES)
+    OBJECT_ID = models.CharField(max_length=50)  # Product pk or INVENTORY_ID
+    PRODUCT_ID = models.IntegerField(null=True, blank=True)
+    TITLE = models.CharField(max_length=255)  # Shown in the results
+    SUBTITLE = models.CharField(max_length=255, blank=True, default="")
+    NAME_TOKENS = models.TextField(blank=True, default="")  # Ranked highest
+    KEYWORD_TOKENS = models.TextField(blank=True, default="")
+    TRIGRAMS = models.TextField(blank=True, default="")  # Space separated
+    TRIGRAM_COUNT = models.PositiveIntegerField(default=0)
+    # Filled from the token columns on PostgreSQL, NULL elsewhere
+    SEARCH_VECTOR = SearchVectorField(null=True, blank=True)
+    LAST_UPDATED = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.DOC_TYPE} {self.OBJECT_ID} - {self.TITLE}"
+
+    class Meta:
+        db_table = "SEARCH_DOCUMENT"
+        verbose_name = "SEARCH DOCUMENT"
+        verbose_name_plural = "SEARCH DOCUMENTS"
+        unique_together = ("DOC_TYPE", "OBJECT_ID")
+        # The GIN indexes are PostgreSQL only, see the initial migration
@@ -0,0 +1,40 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from Admin.Inventory.models import Inventory
+from Admin.Product.models import Product, ProductDetails
+from .models import SearchDocument
+from .utils import index_inventory, index_products, remove_documents
+
+# Bulk writes send no signals; those call index_products / index_inventory
+# themselves, and the rebuild_search_index command covers anything missed.
+
+
+@receiver(post_save, sender=Product)
+def index_product(sender, instance, **kwargs):
+    index_products([instance])
+
+
+@receiver(post_save, sender=ProductDetails)
+def index_product_details(sender, instance, **kwargs):
+    # Supplier and description are searched on the products using them
+    index_products(
+        Product.objects.filter(PROD_DETAILS_CODE=instance).select_related(
+            "PROD_DETAILS_CODE"
+        )
+    )
+
+
+@receiver(post_save, sender=Inventory)
+def index_batch(sender, instance, **kwargs):
+    index_inventory([instance])
+
+
+@receiver(post_delete, sender=Product)
+def remove_product(sender, instance, **kwargs):
+    remove_documents(SearchDocument.PRODUCT, [instance.pk])
+
+
+@receiver(post_delete, sender=Inventory)
+def remove_batch(sender, instance, **kwargs):
+    remove_documents(SearchDocument.INVENTORY, [instance.pk])
@@ -0,0 +1,138 @@
+from datetime import date
+from unittest import mock
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from Admin.Product.models import Product, ProductDetails
+from Admin.test_utils import create_batch, create_inbound_delivery
+from .models import SearchDocument
+from .utils import _search_fallback, autocomplete, rebuild_search_index, search
+
+
+class SearchIndexTest(APITestCase):
+    def setUp(self):
+        details = ProductDetails.objects.create(
+            PROD_DETAILS_SUPPLIER="Vet Supplies",
+            PROD_DETAILS_DESCRIPTION="Broad spectrum antibiotic",
+        )
+        self.amoxicillin = Product.objects.create(
+            PROD_NAME="Amoxicillin 500mg", PROD_BRAND="Himox", PROD_DETAILS_CODE=details
+        )
+        self.ampicillin = Product.objects.create(PROD_NAME="Ampicillin")
+        self.dewormer = Product.objects.create(
+            PROD_NAME="Dewormer Tablet", PROD_BRAND="Amox Labs"
+        )
+        self.batch = create_batch(
+            self.amoxicillin, create_inbound_delivery(), 10, date(2030, 1, 1)
+        )
+
+    def titles(self, documents):
+        return [document.TITLE for document in documents]
+
+    def test_saves_are_indexed(self):
+        self.assertEqual(
+            SearchDocument.objects.filter(DOC_TYPE=SearchDocument.PRODUCT).count(), 3
+        )
+        self.assertTrue(
+            SearchDocument.objects.filter(
+                DOC_TYPE=SearchDocument.INVENTORY, OBJECT_ID=self.batch.pk
+            ).exists()
+        )
+
+    def test_prefix_matches_rank_names_above_brands(self):
+        results = search("amox", SearchDocument.PRODUCT, fuzzy=False)
+
+        self.assertEqual(self.titles(results), ["Amoxicillin 500mg", "Dewormer Tablet"])
+        self.assertTrue(all(document.match == "prefix" for document in results))
+
+    def test_supplier_and_description_are_searched(self):
+        self.assertEqual(
+            self.titles(search("spectrum antib", SearchDocument.PRODUCT)),
+            ["Amoxicillin 500mg"],
+        )
+
+    def test_typos_fall_back_to_trigram_matches(self):
+        results = search("amoxicilin", SearchDocument.PRODUCT)
+
+        self.assertEqual(results[0].TITLE, "Amoxicillin 500mg")
+        self.assertEqual(results[0].match, "fuzzy")
+        self.assertNotIn("Dewormer Tablet", self.titles(results))
+
+    def test_batches_are_found_by_batch_id(self):
+        results = search(self.batch.BATCH_ID, SearchDocument.INVENTORY)
+
+        self.assertEqual(results[0].OBJECT_ID, self.batch.pk)
+
+    def test_autocomplete(self):
+        self.assertEqual(
+            autocomplete("am", SearchDocument.PRODUCT),
+            ["Amoxicillin 500mg", "Ampicillin", "Dewormer Tablet"],
+        )
+
+    def test_index_follows_updates_and_deletes(self):
+        self.ampicillin.PROD_NAME = "Cefalexin"
+        self.ampicillin.save()
+        self.dewormer.delete()
+
+        self.assertEqual(self.titles(search("cefa")), ["Cefalexin"])
+        self.assertEqual(
+            self.titles(search("amox", fuzzy=False)),
+            ["Amoxicillin 500mg", "Amoxicillin 500mg"],
+        )
+
+    def test_rebuild_drops_stale_documents(self):
+        Product.objects.filter(pk=self.ampicillin.pk).delete()
+        SearchDocument.objects.filter(DOC_TYPE=SearchDocument.PRODUCT).delete()
+
+        counts = rebuild_search_index()
+
+        self.assertEqual(counts, {"product": 2, "inventory": 1})
+        self.assertFalse(SearchDocument.objects.filter(TITLE="Ampicillin").exists())
+
+    def test_fallback_matches_like_postgres(self):
+        documents = SearchDocument.objects.filter(DOC_TYPE=SearchDocument.PRODUCT)
+
+        for query, fuzzy in [("amox", False), ("amoxicilin", True), ("am tab", True)]:
+            self.assertEqual(
+                self.titles(_search_fallback(documents, [*query.split()], 20, fuzzy)),
+                self.titles(search(query, SearchDocument.PRODUCT, fuzzy=fuzzy)),
+            )
+
+    def test_search_endpoints(self):
+        response = self.client.get("/search/", {"q": "ampi", "type": "product"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["results"][0]["id"], str(self.ampicillin.pk))
+
+        response = self.client.get("/search/autocomplete", {"q": "dew"})
+        self.assertEqual(response.data["suggestions"], ["Dewormer Tablet"])
+
+        response = self.client.get("/items/search/", {"q": "amoxicilin"})
+        self.assertEqual(response.data[0]["id"], self.amoxicillin.pk)
+
+    def test_search_views_keep_substring_matches(self):
+        other = create_batch(
+            self.amoxicillin, self.batch.INBOUND_DEL_ID, 5, date(2031, 1, 1)
+        )
+
+        response = self.client.get("/items/search/", {"q": "moxi"})
+        self.assertEqual([p["id"] for p in response.data], [self.amoxicillin.pk])
+
+        response = self.client.get("/inventory/search/", {"PRODUCT_NAME": "moxi"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["count"], 2)
+
+        # Batches sharing most of their ID are not fuzzy matches of each other
+        response = self.client.get("/inventory/search/", {"BATCH_ID": other.BATCH_ID})
+        self.assertEqual(
+            [item["INVENTORY_ID"] for item in response.data["results"]], [other.pk]
+        )
+
+    @mock.patch("Admin.Search.utils.MAX_RESULTS", 2)
+    def test_search_views_skip_the_substring_scan_when_the_index_is_full(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/items/search/", {"q": "am"})
+
+        # Three products start with "am", the index fills the two result slots
+        self.assertEqual(len(response.data), 2)
+        self.assertFalse(any("LIKE" in query["sql"] for query in queries))
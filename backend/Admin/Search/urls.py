@@ -0,0 +1,8 @@
+from django.urls import path
+
+from .views import AutocompleteView, SearchView
+
+urlpatterns = [
+    path("", SearchView.as_view(), name="search"),
+    path("autocomplete", AutocompleteView.as_view(), name="search-autocomplete"),
+]
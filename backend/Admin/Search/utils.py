@@ -0,0 +1,320 @@
+import logging
+import re
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection
+from django.db.models import CharField, F, Func, Q, TextField, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Cast
+
+from Admin.Inventory.models import Inventory
+from Admin.Product.models import Product
+from .models import SearchDocument
+
+logger = logging.getLogger(__name__)
+
+WORD_RE = re.compile(r"[a-z0-9]+")
+SIMILARITY_THRESHOLD = 0.5  # Share of the query's trigrams a match must contain
+MAX_RESULTS = 100
+INDEX_CHUNK_SIZE = 1000
+
+DOCUMENT_FIELDS = [
+    "PRODUCT_ID",
+    "TITLE",
+    "SUBTITLE",
+    "NAME_TOKENS",
+    "KEYWORD_TOKENS",
+    "TRIGRAMS",
+    "TRIGRAM_COUNT",
+    "LAST_UPDATED",
+]
+
+
+def tokenize(*values):
+    """Lowercase alphanumeric words of the given values, None skipped."""
+    words = []
+    for value in values:
+        if value:
+            words.extend(WORD_RE.findall(str(value).lower()))
+    return words
+
+
+def trigrams(words):
+    # Like pg_trgm, each word is padded with two blanks in front and one after
+    # so short words and word starts get trigrams of their own
+    grams = set()
+    for word in words:
+        padded = f"__{word}_"
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def _document(doc_type, object_id, product_id, title, subtitle, name, keywords):
+    grams = trigrams(name + keywords)
+    return SearchDocument(
+        DOC_TYPE=doc_type,
+        OBJECT_ID=str(object_id),
+        PRODUCT_ID=product_id,
+        TITLE=(title or "")[:255],
+        SUBTITLE=(subtitle or "")[:255],
+        NAME_TOKENS=" ".join(name),
+        KEYWORD_TOKENS=" ".join(keywords),
+        TRIGRAMS=" ".join(sorted(grams)),
+        TRIGRAM_COUNT=len(grams),
+    )
+
+
+def product_document(product):
+    details = product.PROD_DETAILS_CODE
+    keywords = tokenize(
+        product.PROD_BRAND,
+        details and details.PROD_DETAILS_SUPPLIER,
+        details and details.PROD_DETAILS_DESCRIPTION,
+    )
+    return _document(
+        SearchDocument.PRODUCT,
+        product.pk,
+        product.pk,
+        product.PROD_NAME,
+        product.PROD_BRAND,
+        tokenize(product.PROD_NAME),
+        keywords,
+    )
+
+
+def inventory_document(batch):
+    return _document(
+        SearchDocument.INVENTORY,
+        batch.INVENTORY_ID,
+        batch.PRODUCT_ID_id,
+        batch.PRODUCT_NAME or batch.BATCH_ID,
+        f"Batch {batch.BATCH_ID}",
+        tokenize(batch.BATCH_ID, batch.PRODUCT_NAME),
+        [],
+    )
+
+
+def save_documents(documents):
+    """
+    Inserts or refreshes the given documents in one upsert per chunk, then
+    rebuilds their weighted search vectors on PostgreSQL.
+    """
+    documents = list(documents)
+    if not documents:
+        return 0
+    SearchDocument.objects.bulk_create(
+        documents,
+        update_conflicts=True,
+        unique_fields=["DOC_TYPE", "OBJECT_ID"],
+        update_fields=DOCUMENT_FIELDS,
+        batch_size=INDEX_CHUNK_SIZE,
+    )
+
+    if connection.vendor == "postgresql":
+        keys = {}
+        for document in documents:
+            keys.setdefault(document.DOC_TYPE, []).append(document.OBJECT_ID)
+        condition = Q()
+        for doc_type, object_ids in keys.items():
+            condition |= Q(DOC_TYPE=doc_type, OBJECT_ID__in=object_ids)
+        SearchDocument.objects.filter(condition).update(
+            SEARCH_VECTOR=SearchVector("NAME_TOKENS", weight="A", config="simple")
+            + SearchVector("KEYWORD_TOKENS", weight="B", config="simple")
+        )
+    return len(documents)
+
+
+def index_products(products):
+    """Indexes the products; bulk writes that skip post_save call this."""
+    return save_documents(product_document(product) for product in products)
+
+
+def index_inventory(batches):
+    """Indexes the inventory batches; bulk writes that skip post_save call this."""
+    return save_documents(inventory_document(batch) for batch in batches)
+
+
+def remove_documents(doc_type, object_ids):
+    SearchDocument.objects.filter(
+        DOC_TYPE=doc_type, OBJECT_ID__in=[str(pk) for pk in object_ids]
+    ).delete()
+
+
+def rebuild_search_index(chunk_size=INDEX_CHUNK_SIZE):
+    """
+    Reindexes every product and batch chunk by chunk and drops documents whose
+    object no longer exists. Returns the number of documents per type.
+    """
+    sources = {
+        SearchDocument.PRODUCT: (
+            Product.objects.select_related("PROD_DETAILS_CODE").order_by("pk"),
+            product_document,
+        ),
+        SearchDocument.INVENTORY: (
+            Inventory.objects.order_by("pk"),
+            inventory_document,
+        ),
+    }
+    counts = {}
+    for doc_type, (queryset, build) in sources.items():
+        counts[doc_type] = 0
+        chunk = []
+        for obj in queryset.iterator(chunk_size=chunk_size):
+            chunk.append(build(obj))
+            if len(chunk) == chunk_size:
+                counts[doc_type] += save_documents(chunk)
+                chunk = []
+        counts[doc_type] += save_documents(chunk)
+
+        # OBJECT_ID is text, compare against the primary keys as text
+        existing = queryset.annotate(pk_text=Cast("pk", CharField())).values_list(
+            "pk_text", flat=True
+        )
+        SearchDocument.objects.filter(DOC_TYPE=doc_type).exclude(
+            OBJECT_ID__in=existing
+        ).delete()
+
+    logger.info(f"Search index rebuilt: {counts}.")
+    return counts
+
+
+def search(query, doc_type=None, limit=20, fuzzy=True):
+    """
+    Returns the documents matching `query`, best first, each with a `score`
+    and a `match` of "prefix" or "fuzzy".
+
+    Every query word must prefix a word of the document; those matches are
+    ranked by weight, names above brand, supplier and description. When
+    `fuzzy` is set and there are fewer than `limit` of them, documents sharing
+    most of the query's trigrams fill the rest, which tolerates typos.
+    """
+    words = tokenize(query)
+    if not words:
+        return []
+    limit = max(1, min(int(limit), MAX_RESULTS))
+    documents = SearchDocument.objects.all()
+    if doc_type:
+        documents = documents.filter(DOC_TYPE=doc_type)
+
+    if connection.vendor == "postgresql":
+        return _search_postgres(documents, words, limit, fuzzy)
+    return _search_fallback(documents, words, limit, fuzzy)
+
+
+def search_ids(query, doc_type, substring_matches, fuzzy=False):
+    """
+    Primary keys of the objects matching `query`, index matches first and at
+    most MAX_RESULTS of them. Only when the index returns fewer does
+    `substring_matches`, a queryset of the objects whose field contains the
+    query, fill the rest, for text inside a word ("moxi" in Amoxicillin) that
+    no index word starts with.
+    """
+    to_python = substring_matches.model._meta.pk.to_python
+    ids = [
+        to_python(document.OBJECT_ID)
+        for document in search(query, doc_type, limit=MAX_RESULTS, fuzzy=fuzzy)
+    ]
+    if len(ids) < MAX_RESULTS:
+        ids += substring_matches.exclude(pk__in=ids).values_list("pk", flat=True)[
+            : MAX_RESULTS - len(ids)
+        ]
+    return ids
+
+
+def autocomplete(query, doc_type=None, limit=10):
+    """Distinct titles of the prefix matches, for search-as-you-type."""
+    titles = []
+    for document in search(query, doc_type, limit=MAX_RESULTS, fuzzy=False):
+        if document.TITLE not in titles:
+            titles.append(document.TITLE)
+            if len(titles) == limit:
+                break
+    return titles
+
+
+class StringToArray(Func):
+    function = "string_to_array"
+    output_field = ArrayField(TextField())
+
+
+def _search_postgres(documents, words, limit, fuzzy):
+    # Both lookups are served by the GIN indexes from the initial migration
+    documents = documents.defer(
+        "NAME_TOKENS", "KEYWORD_TOKENS", "TRIGRAMS", "SEARCH_VECTOR"
+    )
+    query = SearchQuery(
+        " & ".join(f"{word}:*" for word in words), search_type="raw", config="simple"
+    )
+    matches = list(
+        documents.filter(SEARCH_VECTOR=query)
+        .annotate(score=SearchRank(F("SEARCH_VECTOR"), query))
+        .order_by("-score", "TITLE")[:limit]
+    )
+    for document in matches:
+        document.match = "prefix"
+    if not fuzzy or len(matches) == limit:
+        return matches
+
+    grams = sorted(trigrams(words))
+    score = RawSQL(
+        'cardinality(ARRAY(SELECT unnest(string_to_array("SEARCH_DOCUMENT"."TRIGRAMS", \' \'))'
+        " INTERSECT SELECT unnest(%s::text[])))::float / %s",
+        (grams, len(grams)),
+    )
+    similar = (
+        documents.alias(grams=StringToArray("TRIGRAMS", Value(" ")))
+        .filter(grams__overlap=grams)
+        .exclude(pk__in=[document.pk for document in matches])
+        .annotate(score=score)
+        .filter(score__gte=SIMILARITY_THRESHOLD)
+        .order_by("-score", "TRIGRAM_COUNT", "TITLE")[: limit - len(matches)]
+    )
+    for document in similar:
+        document.match = "fuzzy"
+        matches.append(document)
+    return matches
+
+
+def _search_fallback(documents, words, limit, fuzzy):
+    """
+    The same matching for databases without full-text search (SQLite in
+    tests). Candidates are narrowed with LIKE and scored in Python.
+    """
+    condition = Q()
+    for word in words:
+        condition &= (
+            Q(NAME_TOKENS__startswith=word)
+            | Q(NAME_TOKENS__contains=f" {word}")
+            | Q(KEYWORD_TOKENS__startswith=word)
+            | Q(KEYWORD_TOKENS__contains=f" {word}")
+        )
+    matches = []
+    for document in documents.filter(condition):
+        # LIKE also matches inside words, keep real prefix matches only
+        names = document.NAME_TOKENS.split()
+        keywords = document.KEYWORD_TOKENS.split()
+        in_name = sum(any(t.startswith(w) for t in names) for w in words)
+        if not all(any(t.startswith(w) for t in names + keywords) for w in words):
+            continue
+        document.score = (in_name + 1) / (len(words) + 1)
+        document.match = "prefix"
+        matches.append(document)
+    matches.sort(key=lambda d: (-d.score, d.TITLE))
+    matches = matches[:limit]
+    if not fuzzy or len(matches) == limit:
+        return matches
+
+    grams = trigrams(words)
+    condition = Q()
+    for gram in grams:
+        condition |= Q(TRIGRAMS__contains=gram)
+    similar = []
+    for document in documents.filter(condition).exclude(
+        pk__in=[document.pk for document in matches]
+    ):
+        document.score = len(grams & set(document.TRIGRAMS.split())) / len(grams)
+        if document.score >= SIMILARITY_THRESHOLD:
+            document.match = "fuzzy"
+            similar.append(document)
+    similar.sort(key=lambda d: (-d.score, d.TRIGRAM_COUNT, d.TITLE))
+    return matches + similar[: limit - len(matches)]
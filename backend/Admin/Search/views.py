@@ -0,0 +1,66 @@
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .models import SearchDocument
+from .utils import MAX_RESULTS, autocomplete, search
+
+
+def _search_params(request):
+    query = request.query_params.get("q", "").strip()
+    doc_type = request.query_params.get("type") or None
+    if doc_type and doc_type not in dict(SearchDocument.DOC_TYPES):
+        return query, doc_type, None, "type must be product or inventory."
+    try:
+        limit = int(request.query_params.get("limit", 20))
+    except ValueError:
+        return query, doc_type, None, "limit must be a number."
+    return query, doc_type, max(1, min(limit, MAX_RESULTS)), None
+
+
+class SearchView(APIView):
+    """
+    Ranked, typo-tolerant search over products and inventory batches.
+    ?q=<text>&type=product|inventory&limit=<n>
+    """
+
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request):
+        query, doc_type, limit, error = _search_params(request)
+        if error:
+            return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
+        if not query:
+            return Response(
+                {"error": "No query parameter provided."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        results = [
+            {
+                "type": document.DOC_TYPE,
+                "id": document.OBJECT_ID,
+                "product_id": document.PRODUCT_ID,
+                "title": document.TITLE,
+                "subtitle": document.SUBTITLE,
+                "match": document.match,
+                "score": round(document.score, 4),
+            }
+            for document in search(query, doc_type, limit)
+        ]
+        return Response({"results": results}, status=status.HTTP_200_OK)
+
+
+class AutocompleteView(APIView):
+    """Title suggestions for search-as-you-type, prefix matches only."""
+
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request):
+        query, doc_type, limit, error = _search_params(request)
+        if error:
+            return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(
+            {"suggestions": autocomplete(query, doc_type, limit)},
+            status=status.HTTP_200_OK,
+        )
@@ -0,0 +1,9 @@
+from django.contrib import admin
+
+from .models import IdCounter
+
+
+@admin.register(IdCounter)
+class IdCounterAdmin(admin.ModelAdmin):
+    list_display = ("NAME", "LAST_VALUE", "LAST_UPDATED")
+    search_fields = ("NAME",)
@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand
+from django.db.models.functions import Substr
+
+from Admin.Inventory.models import (
+    BATCH_SERIES,
+    INVENTORY_SERIES,
+    Inventory,
+    last_batch_number,
+    last_inventory_number,
+)
+from Admin.Sales.models import SALES_INVOICE_SERIES, last_sales_invoice_number
+from Admin.Sequence.utils import get_allocator, seed_counter
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds the ID counters (or sequences) from the IDs already in the "
+        "database so new inventory, batch and sales invoice IDs continue after them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only print the values that would be seeded.",
+        )
+
+    def handle(self, *args, **options):
+        seeds = {
+            INVENTORY_SERIES: last_inventory_number(),
+            SALES_INVOICE_SERIES: last_sales_invoice_number(),
+        }
+
+        # One batch series per MM-YY prefix found in the data
+        prefixes = (
+            Inventory.objects.filter(BATCH_ID__regex=r"^[0-9]{2}-[0-9]{2}-[0-9]+$")
+            .annotate(prefix=Substr("BATCH_ID", 1, 5))
+            .values_list("prefix", flat=True)
+            .distinct()
+        )
+        for prefix in prefixes:
+            seeds[f"{BATCH_SERIES}:{prefix}"] = last_batch_number(prefix)
+
+        self.stdout.write(f"Using the {get_allocator()} ID allocator.")
+        for name, value in sorted(seeds.items()):
+            if options["dry_run"]:
+                self.stdout.write(f"{name}: would seed to {value}")
+                continue
+            last_value = seed_counter(name, value)
+            self.stdout.write(f"{name}: seeded to {value}, last value {last_value}")
+
+        if not options["dry_run"]:
+            self.stdout.write(self.style.SUCCESS(f"Seeded {len(seeds)} ID series."))
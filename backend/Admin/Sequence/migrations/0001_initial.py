@@ -0,0 +1,29 @@
+# Generated by Django 5.1.3 on 2026-10-18 15:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="IdCounter",
+            fields=[
+                (
+                    "NAME",
+                    models.CharField(max_length=100, primary_key=True, serialize=False),
+                ),
+                ("LAST_VALUE", models.BigIntegerField(default=0)),
+                ("LAST_UPDATED", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "ID COUNTER",
+                "verbose_name_plural": "ID COUNTERS",
+                "db_table": "ID_COUNTER",
+            },
+        ),
+    ]
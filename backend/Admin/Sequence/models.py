@@ -0,0 +1,16 @@
+from django.db import models
+
+
+class IdCounter(models.Model):
+    # One row per ID series, e.g. "inventory", "sales_invoice", "batch:01-25"
+    NAME = models.CharField(max_length=100, primary_key=True)
+    LAST_VALUE = models.BigIntegerField(default=0)  # Last number handed out
+    LAST_UPDATED = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.NAME} - {self.LAST_VALUE}"
+
+    class Meta:
+        db_table = "ID_COUNTER"
+        verbose_name = "ID COUNTER"
+        verbose_name_plural = "ID COUNTERS"
@@ -0,0 +1,90 @@
+from datetime import datetime
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from Admin.Inventory.models import Inventory
+from Admin.Product.models import Product
+from Admin.test_utils import create_inbound_delivery
+from .models import IdCounter
+from .utils import next_id, reserve_ids, seed_counter
+
+
+class ReserveIdsTest(TestCase):
+    def test_counter_hands_out_consecutive_blocks(self):
+        self.assertEqual(reserve_ids("test", 3), [1, 2, 3])
+        self.assertEqual(reserve_ids("test", 2), [4, 5])
+        self.assertEqual(next_id("test"), 6)
+        self.assertEqual(IdCounter.objects.get(NAME="test").LAST_VALUE, 6)
+
+    def test_seed_is_only_used_for_a_new_series(self):
+        self.assertEqual(next_id("seeded", seed=lambda: 41), 42)
+        self.assertEqual(next_id("seeded", seed=lambda: 100), 43)
+
+    def test_seed_counter_never_moves_backwards(self):
+        reserve_ids("test", 10)
+        self.assertEqual(seed_counter("test", 5), 10)
+        self.assertEqual(seed_counter("test", 20), 20)
+        self.assertEqual(next_id("test"), 21)
+
+    @override_settings(ID_ALLOCATOR="sequence")
+    def test_sequence_allocator(self):
+        self.assertEqual(reserve_ids("seq test", 3, seed=lambda: 7), [8, 9, 10])
+        self.assertEqual(next_id("seq test"), 11)
+        self.assertEqual(seed_counter("seq test", 50), 50)
+        self.assertEqual(next_id("seq test"), 51)
+        self.assertFalse(IdCounter.objects.exists())
+
+
+class InventoryIdTest(TestCase):
+    def setUp(self):
+        self.delivery = create_inbound_delivery()
+        self.product = Product.objects.create(PROD_NAME="Amoxicillin")
+        self.prefix = datetime.now().strftime("%m-%y")
+
+    def new_batch(self, **kwargs):
+        return Inventory(
+            PRODUCT_ID=self.product,
+            INBOUND_DEL_ID=self.delivery,
+            QUANTITY_ON_HAND=1,
+            **kwargs,
+        )
+
+    def test_ids_continue_from_existing_rows(self):
+        # Rows created before the counter existed
+        Inventory.objects.bulk_create(
+            [
+                self.new_batch(INVENTORY_ID="INV00041", BATCH_ID=f"{self.prefix}-007"),
+                self.new_batch(INVENTORY_ID="INV00009", BATCH_ID="01-20-099"),
+            ]
+        )
+
+        batch = self.new_batch()
+        batch.save()
+
+        self.assertEqual(batch.INVENTORY_ID, "INV00042")
+        self.assertEqual(batch.BATCH_ID, f"{self.prefix}-008")
+
+    def test_assign_ids_reserves_one_block(self):
+        Inventory.assign_ids([self.new_batch()])  # seeds both series
+
+        batches = [self.new_batch() for _ in range(5)]
+        # Savepoint, counter UPDATE, read back, release; once per series
+        with self.assertNumQueries(8):
+            Inventory.assign_ids(batches)
+
+        self.assertEqual(
+            [b.INVENTORY_ID for b in batches], [f"INV0000{i}" for i in range(2, 7)]
+        )
+        self.assertEqual(batches[-1].BATCH_ID, f"{self.prefix}-006")
+
+    def test_backfill_command_seeds_counters(self):
+        Inventory.objects.bulk_create(
+            [self.new_batch(INVENTORY_ID="INV00120", BATCH_ID="03-24-015")]
+        )
+
+        call_command("backfill_id_counters", stdout=StringIO())
+
+        self.assertEqual(IdCounter.objects.get(NAME="inventory").LAST_VALUE, 120)
+        self.assertEqual(IdCounter.objects.get(NAME="batch:03-24").LAST_VALUE, 15)
+        self.assertEqual(IdCounter.objects.get(NAME="sales_invoice").LAST_VALUE, 0)
@@ -0,0 +1,154 @@
+import logging
+import re
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import IdCounter
+
+logger = logging.getLogger(__name__)
+
+ALLOCATORS = ("counter", "sequence")
+
+
+def get_allocator():
+    """
+    Returns the configured ID allocation backend.
+
+    "counter" keeps one row per series in ID_COUNTER and hands numbers out under
+    that row's lock, so IDs are gapless but callers inside a long transaction
+    serialize on it. "sequence" uses a native PostgreSQL sequence per series,
+    which never blocks but may leave gaps after a rollback. Other databases
+    always use the counter table.
+    """
+    allocator = getattr(settings, "ID_ALLOCATOR", "counter")
+    if allocator not in ALLOCATORS:
+        raise ImproperlyConfigured(
+            f"ID_ALLOCATOR must be one of {', '.join(ALLOCATORS)}, got {allocator!r}."
+        )
+    if allocator == "sequence" and connection.vendor != "postgresql":
+        return "counter"
+    return allocator
+
+
+def reserve_ids(name, count=1, seed=None):
+    """
+    Reserves `count` numbers from the series `name` in one call and returns them
+    in ascending order. The counter backend always hands out a consecutive
+    block; sequence numbers may interleave with concurrent callers.
+
+    `seed` is an optional callable returning the highest number already used by
+    existing rows. It is only called the first time a series is seen, so the
+    new numbers continue from the data instead of restarting at 1.
+    """
+    if count < 1:
+        return []
+    if get_allocator() == "sequence":
+        return _reserve_from_sequence(name, count, seed)
+    return _reserve_from_counter(name, count, seed)
+
+
+def next_id(name, seed=None):
+    """Returns the next number from the series `name`."""
+    return reserve_ids(name, 1, seed)[0]
+
+
+def seed_counter(name, value):
+    """
+    Moves the series `name` forward so the next number handed out is above
+    `value`. Never moves a series backwards. Returns the series' last value.
+    """
+    if get_allocator() == "sequence":
+        return _seed_sequence(name, value)
+
+    with transaction.atomic():
+        updated = IdCounter.objects.filter(NAME=name).update(
+            LAST_VALUE=Greatest(F("LAST_VALUE"), value), LAST_UPDATED=timezone.now()
+        )
+        if not updated:
+            try:
+                with transaction.atomic():
+                    IdCounter.objects.create(NAME=name, LAST_VALUE=value)
+            except IntegrityError:
+                # Created concurrently, raise it instead
+                IdCounter.objects.filter(NAME=name).update(
+                    LAST_VALUE=Greatest(F("LAST_VALUE"), value),
+                    LAST_UPDATED=timezone.now(),
+                )
+        return IdCounter.objects.values_list("LAST_VALUE", flat=True).get(NAME=name)
+
+
+def _reserve_from_counter(name, count, seed):
+    with transaction.atomic():
+        # The UPDATE takes the row lock, held until the surrounding transaction
+        # ends, so concurrent callers get disjoint ranges.
+        updated = IdCounter.objects.filter(NAME=name).update(
+            LAST_VALUE=F("LAST_VALUE") + count, LAST_UPDATED=timezone.now()
+        )
+        if not updated:
+            start = seed() if seed else 0
+            try:
+                with transaction.atomic():
+                    IdCounter.objects.create(NAME=name, LAST_VALUE=start + count)
+                logger.info(f"ID counter {name} created starting after {start}.")
+                return list(range(start + 1, start + count + 1))
+            except IntegrityError:
+                # Another process seeded the series first, take the next block
+                IdCounter.objects.filter(NAME=name).update(
+                    LAST_VALUE=F("LAST_VALUE") + count, LAST_UPDATED=timezone.now()
+                )
+        last_value = IdCounter.objects.values_list("LAST_VALUE", flat=True).get(
+            NAME=name
+        )
+    return list(range(last_value - count + 1, last_value + 1))
+
+
+def _sequence_name(name):
+    return "idseq_" + re.sub(r"[^a-z0-9]+", "_", name.lower())
+
+
+def _ensure_sequence(cursor, sequence, seed):
+    cursor.execute("SELECT to_regclass(%s)", [sequence])
+    if cursor.fetchone()[0] is not None:
+        return
+
+    with transaction.atomic():
+        # Serialize creation so only one process seeds the new sequence
+        cursor.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", [sequence])
+        cursor.execute("SELECT to_regclass(%s)", [sequence])
+        if cursor.fetchone()[0] is not None:
+            return
+        cursor.execute(f"CREATE SEQUENCE {connection.ops.quote_name(sequence)}")
+        start = seed() if seed else 0
+        if start > 0:
+            cursor.execute("SELECT setval(%s, %s)", [sequence, start])
+        logger.info(f"ID sequence {sequence} created starting after {start}.")
+
+
+def _reserve_from_sequence(name, count, seed):
+    sequence = _sequence_name(name)
+    with connection.cursor() as cursor:
+        _ensure_sequence(cursor, sequence, seed)
+        cursor.execute(
+            "SELECT nextval(%s) FROM generate_series(1, %s)", [sequence, count]
+        )
+        return sorted(row[0] for row in cursor.fetchall())
+
+
+def _seed_sequence(name, value):
+    sequence = _sequence_name(name)
+    quoted = connection.ops.quote_name(sequence)
+    with transaction.atomic(), connection.cursor() as cursor:
+        _ensure_sequence(cursor, sequence, None)
+        cursor.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", [sequence])
+        cursor.execute(f"SELECT last_value, is_called FROM {quoted}")
+        last_value, is_called = cursor.fetchone()
+        current = last_value if is_called else last_value - 1
+        if value > current:
+            cursor.execute("SELECT setval(%s, %s)", [sequence, value])
+            current = value
+    return current
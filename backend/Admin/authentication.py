@@ -1,8 +1,125 @@
 # Account/authentication.py
+import uuid
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
 from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
 
+USER_KEY = "auth:user:{}:{}"
+VERSION_KEY = "auth:user:{}:version"
 
-class CookieJWTAuthentication(JWTAuthentication):
+AUTH_USER_MODES = ("off", "cache", "stateless")
+
+# User fields copied into the token at login, read back by the stateless mode
+TOKEN_USER_CLAIMS = (
+    "username",
+    "email",
+    "first_name",
+    "last_name",
+    "accType",
+    "phonenumber",
+    "address",
+    "image",
+    "is_staff",
+    "isActive",
+)
+
+
+def get_auth_user_mode():
+    mode = getattr(settings, "AUTH_USER_CACHE", "off")
+    return mode if mode in AUTH_USER_MODES else "off"
+
+
+def add_user_claims(token, user):
+    """Copies TOKEN_USER_CLAIMS from `user` into `token`."""
+    for claim in TOKEN_USER_CLAIMS:
+        value = getattr(user, claim)
+        token[claim] = value.name if claim == "image" else value
+    return token
+
+
+def invalidate_user(user_id):
+    """
+    Drops every cached copy of the user, whatever token it was cached under,
+    by moving the user's version on. Entries stored under an older version
+    are ignored until they expire.
+    """
+    timeout = getattr(settings, "AUTH_USER_CACHE_TIMEOUT", 60)
+    cache.set(VERSION_KEY.format(user_id), uuid.uuid4().hex, timeout)
+
+
+def _invalidate(sender, instance, **kwargs):
+    invalidate_user(instance.pk)
+    # Again after commit, so a request racing the transaction can't keep the
+    # old row cached
+    transaction.on_commit(lambda: invalidate_user(instance.pk))
+
+
+def connect_signals():
+    User = get_user_model()
+    post_save.connect(_invalidate, sender=User, dispatch_uid="auth-user-cache")
+    post_delete.connect(_invalidate, sender=User, dispatch_uid="auth-user-cache")
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that avoids the per-request user query.
+
+    With AUTH_USER_CACHE = "cache" the user is cached for
+    AUTH_USER_CACHE_TIMEOUT seconds under its ID and the token's JTI, and
+    dropped whenever the user is saved or deleted. With "stateless" the user
+    is built from the token's claims without touching the database, so
+    changes, deactivation included, only apply once the token is reissued.
+    "off" loads the user on every request.
+    """
+
+    def get_user(self, validated_token):
+        mode = get_auth_user_mode()
+        if mode == "stateless":
+            return self.get_token_user(validated_token)
+        if mode == "off":
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken("Token contained no recognizable user identification")
+
+        user_key = USER_KEY.format(user_id, validated_token.get("jti", ""))
+        version_key = VERSION_KEY.format(user_id)
+        cached = cache.get_many([user_key, version_key])
+        version = cached.get(version_key)
+        entry = cached.get(user_key)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+
+        user = super().get_user(validated_token)
+        timeout = getattr(settings, "AUTH_USER_CACHE_TIMEOUT", 60)
+        # Stored with the version read before the query, so a save that
+        # happened meanwhile makes this entry stale
+        cache.set(user_key, (version, user), timeout)
+        return user
+
+    def get_token_user(self, validated_token):
+        if "accType" not in validated_token:
+            # Issued before the profile claims were added
+            return super().get_user(validated_token)
+
+        # An unsaved instance: reads work as usual, but it must not be saved
+        fields = {
+            claim: validated_token[claim]
+            for claim in TOKEN_USER_CLAIMS
+            if claim in validated_token
+        }
+        fields[api_settings.USER_ID_FIELD] = validated_token[api_settings.USER_ID_CLAIM]
+        return get_user_model()(**fields)
+
+
+class CookieJWTAuthentication(CachedJWTAuthentication):
     def authenticate(self, request):
         # Get the JWT access token from the cookie
         access_token = request.COOKIES.get("access_token")
@@ -0,0 +1,225 @@
+import base64
+import binascii
+import datetime
+import decimal
+import json
+import uuid
+
+from django.db.models import Q
+from django.http import StreamingHttpResponse
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+STREAM_CHUNK_SIZE = 500
+
+
+def _encode_value(value):
+    # Full-precision isoformat, DjangoJSONEncoder truncates to milliseconds
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (decimal.Decimal, uuid.UUID)):
+        return str(value)
+    raise TypeError(f"Cannot use {type(value).__name__} in a pagination cursor.")
+
+
+class KeysetPagination(PageNumberPagination):
+    """
+    Page-number pagination that switches to keyset (cursor) pagination when the
+    request carries a `cursor` parameter.
+
+    In keyset mode a page is fetched with a WHERE on the last row's ordering
+    values (timestamp, then primary key) instead of COUNT(*) and OFFSET, so deep
+    pages cost the same as the first one. Start with `?cursor=` and follow the
+    `next` / `previous` links. The total count is only computed when
+    `?with_count=true` is passed.
+
+    The keyset follows the queryset's ordering, falling back to `ordering` for
+    unordered querysets. The primary key is appended as a tie-breaker.
+    """
+
+    page_size = 10
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    count_query_param = "with_count"
+    ordering = ("-pk",)
+
+    keyset_mode = False
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.cursor_query_param not in request.query_params:
+            self.keyset_mode = False
+            return super().paginate_queryset(queryset, request, view)
+
+        self.keyset_mode = True
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+
+        self.keyset = self.get_keyset(queryset)
+        position, reverse = self.decode_cursor(
+            request.query_params.get(self.cursor_query_param)
+        )
+
+        self.count = None
+        if request.query_params.get(self.count_query_param, "").lower() == "true":
+            self.count = queryset.count()
+
+        ordering = [
+            ("-" if descending != reverse else "") + field
+            for field, descending in self.keyset
+        ]
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self.keyset_filter(position, reverse))
+
+        rows = list(queryset[: self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        if reverse:
+            rows.reverse()
+
+        # Going forward there is a previous page whenever we started from a
+        # cursor; going backwards there is always a next page.
+        has_next = has_more if not reverse else True
+        has_previous = has_more if reverse else position is not None
+        self.next_position = self.get_position(rows[-1]) if rows and has_next else None
+        self.previous_position = (
+            self.get_position(rows[0]) if rows and has_previous else None
+        )
+        return rows
+
+    def get_paginated_response(self, data):
+        if not self.keyset_mode:
+            return super().get_paginated_response(data)
+
+        response = {
+            "next": self.get_cursor_link(self.next_position, reverse=False),
+            "previous": self.get_cursor_link(self.previous_position, reverse=True),
+            "results": data,
+        }
+        if self.count is not None:
+            response = {"count": self.count, **response}
+        return Response(response)
+
+    def get_keyset(self, queryset):
+        """
+        Returns the ordering as a list of (field, descending) pairs, ending with
+        the primary key so every row has a unique position.
+        """
+        ordering = [f for f in queryset.query.order_by if isinstance(f, str)]
+        if not ordering:
+            ordering = list(self.ordering)
+
+        pk_name = queryset.model._meta.pk.name
+        keyset = [
+            (
+                pk_name if field.lstrip("-") == "pk" else field.lstrip("-"),
+                field[0] == "-",
+            )
+            for field in ordering
+        ]
+        if not any(field == pk_name for field, _ in keyset):
+            keyset.append((pk_name, keyset[-1][1]))
+        return keyset
+
+    def keyset_filter(self, position, reverse):
+        """Builds the WHERE clause selecting rows after `position`."""
+        condition = Q()
+        equal = Q()
+        for (field, descending), value in zip(self.keyset, position):
+            lookup = "lt" if descending != reverse else "gt"
+            condition |= equal & Q(**{f"{field}__{lookup}": value})
+            equal &= Q(**{field: value})
+        return condition
+
+    def get_position(self, row):
+        position = []
+        for field, _ in self.keyset:
+            if isinstance(row, dict):
+                # .values() querysets
+                position.append(row[field])
+            else:
+                position.append(getattr(row, row._meta.get_field(field).attname))
+        return position
+
+    def encode_cursor(self, position, reverse):
+        payload = json.dumps({"p": position, "r": reverse}, default=_encode_value)
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    def decode_cursor(self, cursor):
+        if not cursor:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            position, reverse = payload["p"], bool(payload.get("r", False))
+        except (TypeError, ValueError, KeyError, binascii.Error):
+            raise NotFound("Invalid cursor.")
+        if not isinstance(position, list) or len(position) != len(self.keyset):
+            raise NotFound("Invalid cursor.")
+        return position, reverse
+
+    def get_cursor_link(self, position, reverse):
+        if position is None:
+            return None
+        url = remove_query_param(self.base_url, "page")
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(position, reverse)
+        )
+
+
+class ListPagination(KeysetPagination):
+    """Default bounded pages for list endpoints that had none."""
+
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+
+def stream_json_list(queryset, serializer_class, context=None, chunk_size=None):
+    """
+    Streams the whole queryset as one JSON array. Rows are read with a chunked
+    server-side iterator and serialized and encoded one chunk at a time, so
+    memory use stays flat however large the table is.
+    """
+    chunk_size = chunk_size or STREAM_CHUNK_SIZE
+    encoder = JSONEncoder()
+
+    def encode(chunk, first):
+        data = serializer_class(chunk, many=True, context=context).data
+        return ("" if first else ",") + ",".join(encoder.encode(row) for row in data)
+
+    def generate():
+        yield "["
+        chunk = []
+        first = True
+        for obj in queryset.iterator(chunk_size=chunk_size):
+            chunk.append(obj)
+            if len(chunk) == chunk_size:
+                yield encode(chunk, first)
+                chunk, first = [], False
+        if chunk:
+            yield encode(chunk, first)
+        yield "]"
+
+    return StreamingHttpResponse(generate(), content_type="application/json")
+
+
+def list_response(
+    request, queryset, serializer_class, pagination_class=ListPagination, context=None
+):
+    """
+    The list contract shared by the list endpoints: a bounded page by default
+    (page numbers, or keyset with `?cursor=`), or the full result set streamed
+    as a JSON array with `?stream=true` for exports.
+    """
+    if request.query_params.get("stream", "").lower() == "true":
+        return stream_json_list(queryset, serializer_class, context=context)
+
+    paginator = pagination_class()
+    page = paginator.paginate_queryset(queryset, request)
+    serializer = serializer_class(page, many=True, context=context)
+    return paginator.get_paginated_response(serializer.data)
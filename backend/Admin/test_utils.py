@@ -0,0 +1,36 @@
+from Admin.Delivery.models import InboundDelivery
+from Admin.Inventory.models import Inventory
+from Admin.Supplier.models import Supplier
+
+# The supplier, delivery and batch rows the app tests build their stock on
+
+
+def create_supplier(**fields):
+    return Supplier.objects.create(
+        **{
+            "Supp_Company_Name": "Vet Supplies",
+            "Supp_Company_Num": "0917000000",
+            "Supp_Contact_Pname": "Juan",
+            "Supp_Contact_Num": "0917000001",
+            **fields,
+        }
+    )
+
+
+def create_inbound_delivery(supplier=None, **fields):
+    return InboundDelivery.objects.create(
+        INBOUND_DEL_SUPP_ID=supplier or create_supplier(), **fields
+    )
+
+
+def create_batch(product, delivery, quantity, expiry=None, **fields):
+    return Inventory.objects.create(
+        **{
+            "PRODUCT_ID": product,
+            "PRODUCT_NAME": product.PROD_NAME,
+            "INBOUND_DEL_ID": delivery,
+            "QUANTITY_ON_HAND": quantity,
+            "EXPIRY_DATE": expiry,
+            **fields,
+        }
+    )
@@ -0,0 +1,68 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from Benchmark.utils import (
+    CONNECTION_MODES,
+    apply_connection_mode,
+    pool_available,
+    restore_connection_settings,
+    summarize,
+    time_requests,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures p50/p99 latency of an endpoint with a new database connection "
+        "per request, with persistent connections and with psycopg's pool."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--url",
+            default="/inventory/list/",
+            help="Endpoint to request, InventoryListView by default.",
+        )
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument(
+            "--warmup",
+            type=int,
+            default=20,
+            help="Requests made before timing starts.",
+        )
+        parser.add_argument(
+            "--modes",
+            nargs="+",
+            choices=list(CONNECTION_MODES),
+            default=list(CONNECTION_MODES),
+        )
+
+    def handle(self, *args, **options):
+        if options["requests"] < 1:
+            raise CommandError("--requests must be at least 1.")
+
+        self.stdout.write(
+            f"GET {options['url']}, {options['requests']} requests per mode\n"
+            f"{'mode':<12}{'p50 ms':>10}{'p99 ms':>10}{'mean ms':>10}"
+        )
+        for mode in options["modes"]:
+            if mode == "pool" and not pool_available():
+                self.stdout.write(f"{mode:<12}skipped, needs psycopg[pool]")
+                continue
+
+            previous = apply_connection_mode(mode)
+            try:
+                # As in production: no query log and no debug toolbar
+                with override_settings(DEBUG=False):
+                    durations = time_requests(
+                        options["url"], options["requests"], warmup=options["warmup"]
+                    )
+            except RuntimeError as e:
+                raise CommandError(str(e))
+            finally:
+                restore_connection_settings(previous)
+
+            stats = summarize(durations)
+            self.stdout.write(
+                f"{mode:<12}{stats['p50']:>10}{stats['p99']:>10}{stats['mean']:>10}"
+            )
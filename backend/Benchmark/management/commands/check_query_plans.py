@@ -0,0 +1,92 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+
+from Benchmark.plans import (
+    QUERY_PLANS,
+    endpoint_queries,
+    plan_nodes,
+    sequential_scans,
+    table_rows,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Sends a request to every list and search endpoint, and the write "
+        "workflows, runs EXPLAIN on each SELECT their views run and fails if any "
+        "of them filters a large table with a sequential scan. Lists that read a "
+        "whole table are shown but not failed. Writes are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--min-rows",
+            type=int,
+            default=10000,
+            help="Sequential scans of tables with fewer estimated rows are allowed.",
+        )
+        parser.add_argument(
+            "--analyze",
+            action="store_true",
+            help="Run EXPLAIN ANALYZE, which executes the queries.",
+        )
+        parser.add_argument(
+            "--queries",
+            nargs="+",
+            choices=list(QUERY_PLANS),
+            default=list(QUERY_PLANS),
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("Query plans are only checked on PostgreSQL.")
+
+        # Fresh statistics, so the planner sees the tables at their real size
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+        failures = []
+        self.stdout.write(
+            f"{'endpoint':<26}{'status':>7}{'selects':>9}{'max cost':>12}  seq scans"
+        )
+        for name in options["queries"]:
+            # As in production: no debug toolbar
+            with override_settings(DEBUG=False):
+                result = endpoint_queries(QUERY_PLANS[name])
+            if result is None:
+                self.stdout.write(f"{name:<26}skipped, no rows to query")
+                continue
+            status_code, statements = result
+            if status_code >= 500:
+                failures.append(name)
+
+            scanned, filtered, cost = set(), set(), 0
+            for sql in statements:
+                root, tables = sequential_scans(sql, analyze=options["analyze"])
+                scanned |= tables
+                # Only a WHERE clause can be served by an index instead
+                filtered |= {
+                    node["Relation Name"]
+                    for node in plan_nodes(root)
+                    if node.get("Node Type") == "Seq Scan" and "Filter" in node
+                }
+                cost = max(cost, root["Total Cost"])
+            rows = table_rows(scanned)
+            large = sorted(t for t in filtered if rows.get(t, 0) >= options["min_rows"])
+            if large:
+                failures.append(name)
+            scans = ", ".join(f"{t} ({rows.get(t, 0)})" for t in sorted(scanned))
+            self.stdout.write(
+                f"{name:<26}{status_code:>7}{len(statements):>9}{cost:>12}  "
+                f"{scans or '-'}"
+            )
+
+        if failures:
+            raise CommandError(
+                f"Server errors or filtered sequential scans on tables of "
+                f"{options['min_rows']} rows or more in: {', '.join(failures)}."
+            )
+        self.stdout.write(
+            self.style.SUCCESS("No filtered sequential scans on large tables.")
+        )
@@ -0,0 +1,132 @@
+import json
+from pathlib import Path
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+
+from Benchmark.scenarios import SCENARIOS, ScenarioError, check_results, run_scenario
+
+DEFAULT_BASELINE = Path(settings.BASE_DIR) / "Benchmark" / "baseline.json"
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs the order, delivery, payment, inventory, report and issue workflows "
+        "against the seeded database and records their latency and query count. "
+        "Fails if a request runs more queries than its budget, or regresses "
+        "against the baseline. Every request is rolled back, so latencies leave "
+        "out the commit, unless --commit is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument(
+            "--warmup",
+            type=int,
+            default=3,
+            help="Requests per scenario made before measuring starts.",
+        )
+        parser.add_argument(
+            "--scenarios",
+            nargs="+",
+            choices=list(SCENARIOS),
+            default=list(SCENARIOS),
+        )
+        parser.add_argument(
+            "--baseline",
+            default=str(DEFAULT_BASELINE),
+            help="JSON results of an earlier run to compare against.",
+        )
+        parser.add_argument(
+            "--save-baseline",
+            action="store_true",
+            help="Write the results to --baseline instead of comparing.",
+        )
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=20,
+            help="Percent a p50 latency may grow over the baseline.",
+        )
+        parser.add_argument(
+            "--commit",
+            action="store_true",
+            help="Commit every request, so latencies include the commit. Changes "
+            "the data for good: only use it on a copy of the seeded database.",
+        )
+        parser.add_argument(
+            "--output",
+            help="Write the results, failures included, to this JSON file.",
+        )
+
+    def handle(self, *args, **options):
+        if options["iterations"] < 1 or options["warmup"] < 0:
+            raise CommandError("--iterations must be at least 1.")
+
+        baseline = {}
+        baseline_path = Path(options["baseline"])
+        if not options["save_baseline"] and baseline_path.exists():
+            previous = json.loads(baseline_path.read_text())
+            if previous.get("latency_includes_commit", False) != options["commit"]:
+                raise CommandError(
+                    f"{baseline_path} was recorded "
+                    f"{'with' if not options['commit'] else 'without'} --commit, "
+                    f"its latencies can't be compared with this run's."
+                )
+            baseline = previous["scenarios"]
+
+        self.stdout.write(
+            f"{'scenario':<26}{'p50 ms':>10}{'p99 ms':>10}{'mean ms':>10}"
+            f"{'queries':>9}{'budget':>8}"
+        )
+        results = {}
+        errors = []
+        # As in production: no query log and no debug toolbar
+        with override_settings(DEBUG=False):
+            for name in options["scenarios"]:
+                try:
+                    result = run_scenario(
+                        SCENARIOS[name],
+                        options["iterations"],
+                        warmup=options["warmup"],
+                        commit=options["commit"],
+                    )
+                except ScenarioError as e:
+                    errors.append(f"{name}: {e}")
+                    results[name] = None
+                    self.stdout.write(f"{name:<26}failed, {e}")
+                    continue
+                results[name] = result
+                if result is None:
+                    self.stdout.write(f"{name:<26}skipped, no rows to run it on")
+                    continue
+                self.stdout.write(
+                    f"{name:<26}{result['p50']:>10}{result['p99']:>10}"
+                    f"{result['mean']:>10}{result['queries']:>9}{result['budget']:>8}"
+                )
+
+        failures = errors + check_results(results, baseline, options["threshold"])
+        report = {
+            "database": connection.vendor,
+            "iterations": options["iterations"],
+            "warmup": options["warmup"],
+            # Rolled back requests never commit nor wait for the WAL flush
+            "latency_includes_commit": options["commit"],
+            "threshold": options["threshold"],
+            "baseline": str(baseline_path) if baseline else None,
+            "scenarios": results,
+            "failures": failures,
+            "passed": not failures,
+        }
+        if options["output"]:
+            Path(options["output"]).write_text(json.dumps(report, indent=2))
+        if options["save_baseline"]:
+            baseline_path.write_text(json.dumps(report, indent=2))
+            self.stdout.write(f"Baseline saved to {baseline_path}.")
+
+        if failures:
+            raise CommandError("\n".join(failures))
+        self.stdout.write(
+            self.style.SUCCESS("All scenarios within budget and baseline.")
+        )
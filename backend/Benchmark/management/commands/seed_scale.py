@@ -0,0 +1,73 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from Benchmark.seed import SCALE, SEED_CHUNK_SIZE, ScaleSeeder
+
+
+class Command(BaseCommand):
+    help = (
+        "Fills the database with synthetic products, partners, purchase and sales "
+        "orders, deliveries, inventory, payments, invoices, issues and logs, for "
+        "load and scale testing. Never run it against production data."
+    )
+
+    def add_arguments(self, parser):
+        rows = ", ".join(f"{count} {name}" for name, count in SCALE.items())
+        parser.add_argument(
+            "--scale",
+            type=float,
+            default=1,
+            help=f"Scale factor; 1 writes {rows}, plus their lines and follow-ups.",
+        )
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=365,
+            help="Days of history the data is spread over.",
+        )
+        parser.add_argument(
+            "--seed", type=int, help="Random seed, for a reproducible dataset."
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=SEED_CHUNK_SIZE,
+            help="Orders written per transaction, and rows per insert.",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Seed even though DEBUG is off.",
+        )
+
+    def handle(self, *args, **options):
+        if options["scale"] <= 0 or options["days"] < 1 or options["chunk_size"] < 1:
+            raise CommandError("--scale, --days and --chunk-size must be positive.")
+        if not settings.DEBUG and not options["force"]:
+            raise CommandError(
+                "DEBUG is off, this may be a production database. Pass --force "
+                "to seed it anyway."
+            )
+
+        seeder = ScaleSeeder(
+            scale=options["scale"],
+            days=options["days"],
+            seed=options["seed"],
+            chunk_size=options["chunk_size"],
+        )
+        started = time.monotonic()
+
+        def progress(step):
+            elapsed = time.monotonic() - started
+            self.stdout.write(f"{step} done after {elapsed:.1f}s")
+
+        created = seeder.run(progress=progress)
+        for model, count in sorted(created.items()):
+            self.stdout.write(f"{model:<26}{count:>12}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Seeded {sum(created.values())} rows in "
+                f"{time.monotonic() - started:.1f}s."
+            )
+        )
@@ -0,0 +1,218 @@
+import json
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.db import connection, reset_queries, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from Admin.Customer.models import Clients
+from Admin.Inventory.models import Inventory
+from Admin.Logs.models import Logs
+from Admin.Product.models import Product, ProductCategory
+from Login.serializers import MyTokenObtainPairSerializer
+from .scenarios import SCENARIOS, TRANSACTION_STATEMENTS
+
+# The list and search endpoints, checked through the queries their views
+# actually run. Each builder returns the request as (method, path, data), like
+# the scenarios, or None when there is no row to take its parameters from.
+
+
+def _first(model, field):
+    return model.objects.values_list(field, flat=True).first()
+
+
+def _get(path, **params):
+    return "get", path, params
+
+
+def _last_days(days=30):
+    today = timezone.localdate()
+    return {
+        "start_date": (today - timedelta(days=days)).isoformat(),
+        "end_date": today.isoformat(),
+    }
+
+
+def _word(model, field):
+    # The first word of a value, the kind of query typed into a search box
+    value = _first(model, field)
+    if not value or not value.split():
+        return None
+    return value.split()[0]
+
+
+def _with_param(path, param, value):
+    if value is None:
+        return None
+    return _get(path, **{param: value})
+
+
+def logs_by_user():
+    user_id = _first(Logs, "USER_ID")
+    if user_id is None:
+        return None
+    return _get(f"/logs/logs/user/{user_id}/")
+
+
+ENDPOINTS = {
+    "order-requests": lambda: _get("/api/orders/"),
+    "sales-orders": lambda: _get("/api/customer-order/"),
+    "purchase-orders": lambda: _get("/api/supplier-order/"),
+    "daily-purchase-orders": lambda: _get("/api/supplier-order/purchaseOrder/"),
+    "users": lambda: _get("/account/users/"),
+    "staff": lambda: _get("/account/lists/"),
+    "activated-users": lambda: _get("/account/activated/"),
+    "deactivated-users": lambda: _get("/account/deactivated/"),
+    "account-logs": lambda: _get("/account/logs/"),
+    "clients": lambda: _get("/customer/clients/"),
+    "client-balances": lambda: _get("/customer/client-balance/"),
+    "categories": lambda: _get("/items/categories/"),
+    "categories-by-name": lambda: _with_param(
+        "/items/categoryName/",
+        "prod_cat_name",
+        _first(ProductCategory, "PROD_CAT_NAME"),
+    ),
+    "products": lambda: _with_param(
+        "/items/products/", "search", _word(Product, "PROD_NAME")
+    ),
+    "product-list": lambda: _get("/items/productList/"),
+    "product-details": lambda: _get("/items/product-details/"),
+    "product-search": lambda: _with_param(
+        "/items/search/", "q", _word(Product, "PROD_NAME")
+    ),
+    "low-stock": lambda: _get("/items/lowStock/"),
+    "suppliers": lambda: _get("/supplier/suppliers/"),
+    "outbound-deliveries": lambda: _get("/api/delivery/customer"),
+    "inbound-deliveries": lambda: _get("/api/delivery/supplier"),
+    "delivered-outbound": lambda: _get("/api/delivery/customer/delivered"),
+    "outbound-today": lambda: _get("/api/delivery/customer/date"),
+    "inbound-today": lambda: _get("/api/delivery/supplier/date"),
+    "outbound-date-range": lambda: _get(
+        "/api/delivery/customer/dateRange/", **_last_days()
+    ),
+    "inbound-date-range": lambda: _get(
+        "/api/delivery/supplier/dateRange/", **_last_days()
+    ),
+    "issues": lambda: _get("/api/delivery/issue/issue-list/", status="Pending"),
+    "inventory": lambda: _get("/inventory/list/"),
+    "inventory-by-name": lambda: _with_param(
+        "/inventory/search/", "PRODUCT_NAME", _word(Inventory, "PRODUCT_NAME")
+    ),
+    "inventory-by-batch": lambda: _with_param(
+        "/inventory/search/", "BATCH_ID", _first(Inventory, "BATCH_ID")
+    ),
+    "expiring-inventory": lambda: _get("/inventory/expiredsoon/"),
+    "stock-summary": lambda: _get(
+        "/inventory/stock/", low_stock="true", expiring_within=30
+    ),
+    "logs": lambda: _get("/logs/logs/"),
+    "logs-by-user": logs_by_user,
+    "user-logs": lambda: _get("/logs/logs/user/"),
+    "transaction-logs": lambda: _get("/logs/logs/transaction/"),
+    "reports": lambda: _get("/report/report/"),
+    "daily-reports": lambda: _get("/report/viewdaily/"),
+    "outbound-products": lambda: _get("/report/current/"),
+    "sales-invoices": lambda: _get("/sales/sales-invoice-list/", **_last_days(90)),
+    "customer-payments": lambda: _with_param(
+        "/sales/customer-payment-list/", "search", _first(Clients, "name")
+    ),
+    "monthly-sales": lambda: _get("/sales/monthly-sales/"),
+    "search": lambda: _with_param("/search/", "q", _word(Product, "PROD_NAME")),
+    "autocomplete": lambda: _with_param(
+        "/search/autocomplete", "q", (_word(Product, "PROD_NAME") or "")[:3] or None
+    ),
+    "dashboard": lambda: _get("/dashboard/summary"),
+}
+
+# Plus the lookups of the write workflows, such as the client lookup of a new
+# sales order and the FEFO allocation of a dispatch
+QUERY_PLANS = {
+    **ENDPOINTS,
+    **{name: scenario.prepare for name, scenario in SCENARIOS.items()},
+}
+
+
+def _client():
+    # Signed in as a staff user, for the views that check the token cookie
+    client = Client()
+    user = get_user_model().objects.filter(is_staff=True).first()
+    if user is not None:
+        token = MyTokenObtainPairSerializer.get_token(user).access_token
+        client.cookies["access_token"] = str(token)
+    return client
+
+
+def endpoint_queries(build, client=None):
+    """
+    Sends the request of `build` in a transaction that is rolled back and
+    returns its status code and the SELECT statements the view ran, or None
+    when there is nothing to run it on.
+    """
+    client = client or _client()
+    with transaction.atomic():
+        request = build()
+        if request is None:
+            transaction.set_rollback(True)
+            return None
+        method, path, data = request
+        # The query log keeps 9000 entries, past that nothing would be captured
+        reset_queries()
+        with CaptureQueriesContext(connection) as queries:
+            if method == "get":
+                response = client.get(path, data)
+            else:
+                response = getattr(client, method)(
+                    path, data, content_type="application/json"
+                )
+        transaction.set_rollback(True)
+
+    statements = []
+    for query in queries.captured_queries:
+        sql = query["sql"].strip()
+        if sql.upper().startswith(TRANSACTION_STATEMENTS):
+            continue
+        if sql.upper().startswith(("SELECT", "WITH")) and sql not in statements:
+            statements.append(sql)
+    return response.status_code, statements
+
+
+def plan_nodes(plan):
+    """Yields every node of a JSON EXPLAIN plan, depth first."""
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def table_rows(tables):
+    """Estimated row counts of `tables`, from the planner statistics."""
+    if not tables:
+        return {}
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT relname, reltuples FROM pg_class WHERE relname = ANY(%s)",
+            [list(tables)],
+        )
+        return {name: max(int(rows), 0) for name, rows in cursor.fetchall()}
+
+
+def sequential_scans(sql, analyze=False):
+    """
+    Runs EXPLAIN on the statement `sql` and returns the plan's root node and
+    the relations it reads with a sequential scan.
+    """
+    options = "FORMAT JSON, ANALYZE" if analyze else "FORMAT JSON"
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN ({options}) {sql}")
+        plan = cursor.fetchone()[0]
+        # EXPLAIN ANALYZE runs the statement, which may lock rows
+        transaction.set_rollback(True)
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    root = plan[0]["Plan"]
+    scanned = {
+        node["Relation Name"]
+        for node in plan_nodes(root)
+        if node.get("Node Type") == "Seq Scan"
+    }
+    return root, scanned
@@ -0,0 +1,360 @@
+import time
+from contextlib import nullcontext
+from datetime import timedelta
+from django.db import connection, reset_queries, transaction
+from django.db.models import Exists, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from Admin.Delivery.models import (
+    InboundDelivery,
+    InboundDeliveryDetails,
+    OutboundDelivery,
+    OutboundDeliveryDetails,
+)
+from Admin.Inventory.models import Inventory, ProductStock
+from Admin.Issue.models import DeliveryIssue, DeliveryItemIssue
+from Admin.Order.Sales_Order.models import SalesOrder
+from Admin.Report.models import Reports
+from Admin.Sales.models import CustomerPayment
+from .utils import summarize
+
+# The write workflows of the views, run against the seeded database. Each
+# builder picks its rows, or sets them up, and returns the request as
+# (method, path, data), or None when there is no row to build it from. It runs
+# inside the iteration's transaction, so anything it changes is rolled back
+# together with the request's own writes, unless the run commits.
+
+# Statements of the benchmark's nested transactions, which the views don't run
+# in production
+TRANSACTION_STATEMENTS = ("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")
+
+
+class Scenario:
+    def __init__(self, prepare, budget):
+        self.prepare = prepare
+        self.budget = budget  # Most queries one request may run
+
+
+class ScenarioError(Exception):
+    """Raised when a scenario's request fails."""
+
+
+def create_sales_order():
+    # An admin order, which also creates its outbound delivery, copied from
+    # the latest accepted one
+    order = (
+        SalesOrder.objects.filter(
+            SALES_ORDER_STATUS="Accepted", sales_order_details__isnull=False
+        )
+        .select_related("SALES_ORDER_CREATEDBY_USER")
+        .order_by("-SALES_ORDER_ID")
+        .first()
+    )
+    if order is None:
+        return None
+    user = order.SALES_ORDER_CREATEDBY_USER
+    details = [
+        {
+            "SALES_ORDER_PROD_ID": line.SALES_ORDER_PROD_ID_id,
+            "SALES_ORDER_PROD_NAME": line.SALES_ORDER_PROD_NAME,
+            "SALES_ORDER_LINE_PRICE": line.SALES_ORDER_LINE_PRICE,
+            "SALES_ORDER_LINE_QTY": line.SALES_ORDER_LINE_QTY,
+            "SALES_ORDER_LINE_DISCOUNT": line.SALES_ORDER_LINE_DISCOUNT,
+            "SALES_ORDER_LINE_TOTAL": line.SALES_ORDER_LINE_TOTAL,
+        }
+        for line in order.sales_order_details.all()
+    ]
+    return (
+        "post",
+        reverse("sales-order-list-create"),
+        {
+            "SALES_ORDER_CREATEDBY_USER": user.pk,
+            "SALES_ORDER_CLIENT_NAME": order.SALES_ORDER_CLIENT_NAME,
+            "SALES_ORDER_CLIENT_PROVINCE": order.SALES_ORDER_CLIENT_PROVINCE,
+            "SALES_ORDER_CLIENT_CITY": order.SALES_ORDER_CLIENT_CITY,
+            "SALES_ORDER_CLIENT_PHONE_NUM": order.SALES_ORDER_CLIENT_PHONE_NUM,
+            "SALES_ORDER_DLVRY_OPTION": order.SALES_ORDER_DLVRY_OPTION,
+            "SALES_ORDER_PYMNT_OPTION": order.SALES_ORDER_PYMNT_OPTION,
+            "SALES_ORDER_PYMNT_TERMS": order.SALES_ORDER_PYMNT_TERMS,
+            "SALES_ORDER_TOTAL_QTY": order.SALES_ORDER_TOTAL_QTY,
+            "SALES_ORDER_TOTAL_PRICE": order.SALES_ORDER_TOTAL_PRICE,
+            "USER_TYPE": "admin",
+            "USERNAME": user.username,
+            "details": details,
+        },
+    )
+
+
+def dispatch_delivery():
+    # Only a delivery whose every line is in stock can be dispatched
+    short = OutboundDeliveryDetails.objects.filter(
+        OUTBOUND_DEL_ID=OuterRef("pk"),
+        OUTBOUND_DETAILS_PROD_QTY_ORDERED__gt=Coalesce(
+            F("OUTBOUND_DETAILS_PROD_ID__stock__ON_HAND"), 0
+        ),
+    )
+    pk = (
+        OutboundDelivery.objects.filter(OUTBOUND_DEL_STATUS="Pending")
+        .exclude(Exists(short))
+        .order_by("-OUTBOUND_DEL_ID")
+        .values_list("pk", flat=True)
+        .first()
+    )
+    if pk is None:
+        return None
+    return "patch", reverse("dispatch-delivery", args=[pk]), {"status": "Dispatched"}
+
+
+def complete_delivery():
+    delivery = (
+        OutboundDelivery.objects.filter(OUTBOUND_DEL_STATUS="Dispatched")
+        .order_by("-OUTBOUND_DEL_ID")
+        .first()
+    )
+    if delivery is None:
+        return None
+    items = [
+        {
+            "prod_details_id": line.pk,
+            "qtyAccepted": line.OUTBOUND_DETAILS_PROD_QTY_ORDERED,
+            "qtyDefect": 0,
+        }
+        for line in delivery.outbound_details.all()
+    ]
+    return (
+        "post",
+        reverse("complete-delivery-add-sales", args=[delivery.pk]),
+        {
+            "items": items,
+            "status": "Delivered",
+            "total_qty_accepted": sum(item["qtyAccepted"] for item in items),
+            "user_id": delivery.OUTBOUND_DEL_ACCPTD_BY_USER_id,
+        },
+    )
+
+
+def record_payment():
+    # Pays the whole balance, which also generates the sales invoice
+    payment = (
+        CustomerPayment.objects.filter(PAYMENT_STATUS="Unpaid", AMOUNT_BALANCE__gt=0)
+        .order_by("-PAYMENT_ID")
+        .first()
+    )
+    if payment is None:
+        return None
+    return (
+        "patch",
+        reverse("customer-payment-details", args=[payment.pk]),
+        {"CUSTOMER_AMOUNT_PAID": str(payment.AMOUNT_BALANCE)},
+    )
+
+
+def receive_inbound_delivery():
+    delivery = (
+        InboundDelivery.objects.filter(INBOUND_DEL_STATUS="Pending")
+        .order_by("-INBOUND_DEL_ID")
+        .first()
+    )
+    if delivery is None:
+        return None
+    expiry_date = (timezone.now() + timedelta(days=365)).date().isoformat()
+    details = [
+        {
+            "PRODUCT_ID": line.INBOUND_DEL_DETAIL_PROD_ID_id,
+            "PRODUCT_NAME": line.INBOUND_DEL_DETAIL_PROD_NAME,
+            "QUANTITY_ON_HAND": line.INBOUND_DEL_DETAIL_ORDERED_QTY,
+            "EXPIRY_DATE": expiry_date,
+            "PRICE": float(line.INBOUND_DEL_DETAIL_LINE_PRICE),
+        }
+        for line in InboundDeliveryDetails.objects.filter(INBOUND_DEL_ID=delivery)
+    ]
+    if not details:
+        return None
+    return (
+        "post",
+        reverse("add-product-inventory"),
+        {
+            "INBOUND_DEL_ID": delivery.pk,
+            "details": details,
+            "status": "Delivered",
+            "user": "benchmark",
+        },
+    )
+
+
+def daily_report():
+    # The view only creates one report a day
+    start = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+    if Reports.objects.filter(
+        REPORT_TYPE="Daily",
+        REPORT_DATETIME__gte=start,
+        REPORT_DATETIME__lt=start + timedelta(days=1),
+    ).exists():
+        return None
+    return "get", reverse("Daily report"), {}
+
+
+def inventory_search():
+    name = Inventory.objects.values_list("PRODUCT_NAME", flat=True).first()
+    if not name:
+        return None
+    return "get", reverse("inventory-search"), {"PRODUCT_NAME": name}
+
+
+def resolve_issue():
+    # The seeded issues are all resolved, the latest customer one whose
+    # replacements are in stock is reopened
+    on_hand = ProductStock.objects.filter(PRODUCT=OuterRef("ISSUE_PROD_ID"))
+    short = DeliveryItemIssue.objects.filter(
+        ISSUE_NO=OuterRef("pk"),
+        ISSUE_QTY_DEFECT__gt=Coalesce(Subquery(on_hand.values("ON_HAND")), 0),
+    )
+    issue = (
+        DeliveryIssue.objects.filter(
+            ORDER_TYPE="Customer Delivery", item_issues__ISSUE_QTY_DEFECT__gt=0
+        )
+        .exclude(Exists(short))
+        .order_by("-ISSUE_NO")
+        .first()
+    )
+    if issue is None:
+        return None
+    DeliveryIssue.objects.filter(pk=issue.pk).update(
+        STATUS="Pending", IS_RESOLVED=False, RESOLUTION="No Selected"
+    )
+    items = [
+        {
+            "PROD_ID": item.ISSUE_PROD_ID,
+            "PROD_NAME": item.ISSUE_PROD_NAME,
+            "QTY_DEFECT": item.ISSUE_QTY_DEFECT,
+            "PRICE": str(item.ISSUE_PROD_LINE_PRICE),
+        }
+        for item in issue.item_issues.filter(ISSUE_QTY_DEFECT__gt=0)
+    ]
+    return (
+        "post",
+        reverse("resolve-issue"),
+        {
+            "Issue No": issue.pk,
+            "Delivery ID": issue.DELIVERY_ID,
+            "Delivery Type": "Customer Delivery",
+            "Resolution": "Replacement",
+            "items": items,
+        },
+    )
+
+
+# Budgets hold for orders of up to seed.MAX_LINES lines; the sales order and
+# delivery completion views still run a few queries per line
+SCENARIOS = {
+    "create-sales-order": Scenario(create_sales_order, budget=45),
+    "dispatch-delivery": Scenario(dispatch_delivery, budget=15),
+    "complete-delivery": Scenario(complete_delivery, budget=20),
+    "record-payment": Scenario(record_payment, budget=18),
+    "receive-inbound-delivery": Scenario(receive_inbound_delivery, budget=28),
+    "daily-report": Scenario(daily_report, budget=8),
+    "inventory-search": Scenario(inventory_search, budget=8),
+    "resolve-issue": Scenario(resolve_issue, budget=15),
+}
+
+
+def count_queries(captured):
+    return sum(
+        1
+        for query in captured
+        if not query["sql"].lstrip().upper().startswith(TRANSACTION_STATEMENTS)
+    )
+
+
+def run_scenario(scenario, iterations, warmup=0, client=None, commit=False):
+    """
+    Sends the request of `scenario` `warmup` + `iterations` times through the
+    test client, each time in a transaction that is rolled back, and returns
+    its method, path, latency summary and query count, or None when there is
+    nothing to run it on. Raises ScenarioError if a request fails.
+
+    A rolled back request never commits, so its latency leaves out the
+    COMMIT and the WAL flush. With `commit` nothing is rolled back: the
+    requests commit as they do in production, and each one uses up the rows
+    it was built from. Only run it against a copy of the seeded database.
+    """
+    client = client or Client()
+    durations = []
+    query_counts = []
+    for i in range(warmup + iterations):
+        with transaction.atomic() if not commit else nullcontext():
+            request = scenario.prepare()
+            if request is None:
+                if not commit:
+                    transaction.set_rollback(True)
+                if i:
+                    raise ScenarioError(f"Ran out of rows after {i} requests.")
+                return None
+            method, path, data = request
+            # The query log keeps 9000 entries, past that nothing would be captured
+            reset_queries()
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                if method == "get":
+                    response = client.get(path, data)
+                else:
+                    response = getattr(client, method)(
+                        path, data, content_type="application/json"
+                    )
+                elapsed = (time.perf_counter() - start) * 1000
+            if not commit:
+                transaction.set_rollback(True)
+
+        if response.status_code >= 400:
+            raise ScenarioError(
+                f"{method.upper()} {path} returned {response.status_code}: "
+                f"{response.content[:200].decode(errors='replace')}"
+            )
+        if i >= warmup:
+            durations.append(elapsed)
+            query_counts.append(count_queries(queries.captured_queries))
+
+    return {
+        "method": method.upper(),
+        "path": path,
+        **summarize(durations),
+        "queries": max(query_counts),
+        "budget": scenario.budget,
+    }
+
+
+def check_results(results, baseline=None, threshold=20):
+    """
+    Failures of the run in `results`: query counts over their budget and,
+    against `baseline`, query counts that grew and p50 latencies more than
+    `threshold` percent slower.
+    """
+    failures = []
+    baseline = baseline or {}
+    for name, result in results.items():
+        if result is None:
+            continue
+        if result["queries"] > result["budget"]:
+            failures.append(
+                f"{name}: {result['queries']} queries, over its budget of "
+                f"{result['budget']}."
+            )
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        if result["queries"] > previous["queries"]:
+            failures.append(
+                f"{name}: {result['queries']} queries, up from "
+                f"{previous['queries']} in the baseline."
+            )
+        limit = previous["p50"] * (1 + threshold / 100)
+        if result["p50"] > limit:
+            failures.append(
+                f"{name}: p50 of {result['p50']} ms, more than {threshold}% over "
+                f"the baseline's {previous['p50']} ms."
+            )
+    return failures
@@ -0,0 +1,846 @@
+import logging
+import random
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.utils import timezone
+
+from Admin.Customer.models import Clients
+from Admin.Dashboard.counters import COUNTERS, invalidate_counters
+from Admin.Delivery.models import (
+    InboundDelivery,
+    InboundDeliveryDetails,
+    OutboundDelivery,
+    OutboundDeliveryDetails,
+)
+from Admin.Inventory.models import Inventory, StockMovement
+from Admin.Inventory.utils import rebuild_product_stock
+from Admin.Issue.models import DeliveryIssue, DeliveryItemIssue
+from Admin.Logs.models import Logs, log_month
+from Admin.Order.Purchase.models import PurchaseOrder, PurchaseOrderDetails
+from Admin.Order.Sales_Order.models import SalesOrder, SalesOrderDetails
+from Admin.Product.models import Product, ProductCategory, ProductDetails
+from Admin.Sales.models import (
+    SALES_INVOICE_SERIES,
+    CustomerPayment,
+    SalesInvoice,
+    SalesInvoiceItems,
+    last_sales_invoice_number,
+)
+from Admin.Sales.utils import rebuild_sales_summary
+from Admin.Search.utils import rebuild_search_index
+from Admin.Sequence.utils import reserve_ids
+from Admin.Supplier.models import Supplier
+
+logger = logging.getLogger(__name__)
+
+SEED_CHUNK_SIZE = 1000
+
+# Rows per unit of scale; a scale of 100 writes a few million rows in total
+SCALE = {
+    "users": 10,
+    "categories": 20,
+    "products": 500,
+    "suppliers": 50,
+    "clients": 1000,
+    "purchase_orders": 1000,
+    "sales_orders": 5000,
+    "logs": 20000,
+}
+MAX_LINES = 5  # Lines per order
+OPEN_DAYS = 14  # Orders this recent may still be pending
+ISSUE_RATE = 0.05  # Share of deliveries that come with defects
+
+FIRST_NAMES = ["Maria", "Jose", "Ana", "Juan", "Rosa", "Carlo", "Liza", "Paolo"]
+LAST_NAMES = ["Santos", "Reyes", "Cruz", "Bautista", "Garcia", "Mendoza", "Torres"]
+PROVINCES = ["Metro Manila", "Cavite", "Laguna", "Bulacan", "Pampanga", "Cebu"]
+CITIES = ["Quezon City", "Makati", "Bacoor", "Calamba", "Malolos", "Cebu City"]
+CATEGORIES = [
+    ("Antibiotics", "Injectables"),
+    ("Antibiotics", "Oral"),
+    ("Vaccines", "Canine"),
+    ("Vaccines", "Feline"),
+    ("Dewormers", "Livestock"),
+    ("Vitamins", "Supplements"),
+    ("Feeds", "Poultry"),
+    ("Grooming", "Shampoo"),
+]
+PRODUCT_WORDS = [
+    "Amoxicillin",
+    "Doxycycline",
+    "Ivermectin",
+    "Albendazole",
+    "Oxytetracycline",
+    "Enrofloxacin",
+    "Multivitamin",
+    "Rabies Vaccine",
+    "Parvo Vaccine",
+    "Calcium Gel",
+    "Iron Dextran",
+    "Tick Shampoo",
+]
+FORMS = ["Tablet", "Syrup", "Injection", "Powder", "Drops"]
+BRANDS = ["Vetmed", "AgriVet", "PetCare", "Zoetis", "Bayer", "Unilab"]
+UNITS = [("ml", "Bottle"), ("tabs", "Box"), ("g", "Sachet"), ("dose", "Vial")]
+PAYMENT_OPTIONS = ["Cash On Delivery (COD)", "Bank Transfer", "Check"]
+DELIVERY_OPTIONS = ["Standard Delivery", "Pick Up"]
+ISSUE_TYPES = [choice for choice, _ in DeliveryIssue.ISSUE_TYPE_CHOICES]
+LOG_TEMPLATES = {
+    "User logs": ["{user} logged in.", "{user} logged out.", "{user} updated a user."],
+    "Transaction logs": [
+        "{user} created a sales order.",
+        "{user} received an inbound delivery.",
+        "{user} dispatched an outbound delivery.",
+        "{user} recorded a payment.",
+    ],
+}
+
+# Models whose creation and update dates the seed writes itself
+DATED_MODELS = (
+    get_user_model(),
+    Product,
+    PurchaseOrder,
+    InboundDelivery,
+    Inventory,
+    StockMovement,
+    SalesOrder,
+    OutboundDelivery,
+    CustomerPayment,
+    SalesInvoice,
+    DeliveryIssue,
+)
+
+
+@contextmanager
+def explicit_dates(models=DATED_MODELS):
+    """
+    Turns off auto_now and auto_now_add on the models' date fields, so rows
+    keep the dates they are created with. Those fields must then be set on
+    every row. Affects the whole process, for use in management commands.
+    """
+    fields = [
+        field
+        for model in models
+        for field in model._meta.concrete_fields
+        if getattr(field, "auto_now", False) or getattr(field, "auto_now_add", False)
+    ]
+    previous = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in previous:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def money(value):
+    return Decimal(value).quantize(Decimal("0.01"))
+
+
+class ScaleSeeder:
+    """
+    Writes a synthetic, referentially consistent dataset of SCALE rows per
+    unit of `scale`, dated over the last `days` days:
+
+    - staff users, product categories, products with their details,
+      suppliers and clients
+    - purchase orders, their inbound deliveries and the inventory batches
+      received, with the stock ledger
+    - sales orders, their outbound deliveries, the payments and, for paid
+      ones, the sales invoices
+    - delivery issues for deliveries with defects, and activity logs
+
+    Orders are written `chunk_size` at a time with bulk inserts, each chunk
+    in its own transaction. A fixed `seed` reproduces the same data; runs
+    add to what is already there. The stock, sales and search summaries are
+    rebuilt at the end.
+    """
+
+    def __init__(self, scale=1, days=365, seed=None, chunk_size=SEED_CHUNK_SIZE):
+        self.rng = random.Random(seed)
+        self.scale = scale
+        self.counts = {
+            name: max(1, round(rows * scale)) for name, rows in SCALE.items()
+        }
+        self.chunk_size = chunk_size
+        self.end = timezone.now()
+        self.start = self.end - timedelta(days=days)
+        # Keeps usernames and emails unique across runs, whatever the seed
+        self.run_id = uuid.uuid4().hex[:8]
+        self.created = Counter()
+
+    def run(self, progress=None):
+        """Seeds everything and returns the number of rows written per model."""
+        steps = [
+            self.seed_users,
+            self.seed_partners,
+            self.seed_catalog,
+            self.seed_purchases,
+            self.seed_sales,
+            self.seed_logs,
+        ]
+        with explicit_dates():
+            for step in steps:
+                step()
+                if progress:
+                    progress(step.__name__)
+        self.rebuild_summaries()
+        logger.info(f"Seeded {sum(self.created.values())} rows at scale {self.scale}.")
+        return dict(self.created)
+
+    # Helpers
+
+    def insert(self, model, rows):
+        model.objects.bulk_create(rows, batch_size=self.chunk_size)
+        self.created[model.__name__] += len(rows)
+        return rows
+
+    def moment(self, index, total):
+        """Dates the `index`-th of `total` rows, spread evenly over the window."""
+        span = self.end - self.start
+        return self.start + span * ((index + self.rng.random()) / total)
+
+    def later(self, moment, min_days, max_days):
+        """A moment up to `max_days` after `moment`, never in the future."""
+        days = self.rng.uniform(min_days, max_days)
+        return min(moment + timedelta(days=days), self.end)
+
+    def is_open(self, moment):
+        """Whether a recent order or delivery is still left open."""
+        return moment > self.end - timedelta(days=OPEN_DAYS) and self.rng.random() < 0.5
+
+    def chunks(self, total):
+        for offset in range(0, total, self.chunk_size):
+            yield range(offset, min(offset + self.chunk_size, total))
+
+    def person(self):
+        return self.rng.choice(FIRST_NAMES), self.rng.choice(LAST_NAMES)
+
+    def phone(self):
+        return f"09{self.rng.randrange(10**9):09d}"
+
+    def lines(self):
+        count = self.rng.randint(1, min(MAX_LINES, len(self.products)))
+        return self.rng.sample(self.products, count)
+
+    # Master data
+
+    def seed_users(self):
+        User = get_user_model()
+        password = make_password(None)  # Hashed once, unusable
+        users = []
+        for i in range(self.counts["users"]):
+            first_name, last_name = self.person()
+            users.append(
+                User(
+                    username=f"seed-{self.run_id}-{i}",
+                    email=f"seed-{self.run_id}-{i}@example.com",
+                    first_name=first_name,
+                    last_name=last_name,
+                    accType="staff",
+                    password=password,
+                    dateCreated=self.start,
+                    dateUpdated=self.start,
+                )
+            )
+        self.users = self.insert(User, users)
+
+    def seed_partners(self):
+        suppliers = []
+        for i in range(self.counts["suppliers"]):
+            first_name, last_name = self.person()
+            suppliers.append(
+                Supplier(
+                    Supp_Company_Name=f"{last_name} Veterinary Supply {i}",
+                    Supp_Company_Num=self.phone(),
+                    Supp_Contact_Pname=f"{first_name} {last_name}",
+                    Supp_Contact_Num=self.phone(),
+                )
+            )
+        self.suppliers = self.insert(Supplier, suppliers)
+
+        self.clients = []
+
+        for indexes in self.chunks(self.counts["clients"]):
+            clients = []
+            for i in indexes:
+                first_name, last_name = self.person()
+                clients.append(
+                    Clients(
+                        name=f"{first_name} {last_name} Farm {i}",
+                        address=f"{i} {self.rng.choice(CITIES)}",
+                        province=self.rng.choice(PROVINCES),
+                        phoneNumber=self.phone(),
+                    )
+                )
+            self.clients.extend(self.insert(Clients, clients))
+
+    def seed_catalog(self):
+        categories = [
+            ProductCategory(
+                PROD_CAT_NAME=CATEGORIES[i % len(CATEGORIES)][0],
+                PROD_CAT_SUBCATEGORY=f"{CATEGORIES[i % len(CATEGORIES)][1]} {i}",
+            )
+            for i in range(self.counts["categories"])
+        ]
+        categories = self.insert(ProductCategory, categories)
+
+        self.products = []
+        for indexes in self.chunks(self.counts["products"]):
+            details, products = [], []
+            for i in indexes:
+                purchase_price = money(self.rng.uniform(20, 2000))
+                unit, packaging = self.rng.choice(UNITS)
+                name = f"{self.rng.choice(PRODUCT_WORDS)} {self.rng.choice(FORMS)} {i}"
+                details.append(
+                    ProductDetails(
+                        PROD_DETAILS_DESCRIPTION=f"{name}, {self.rng.randint(1, 500)}{unit}",
+                        PROD_DETAILS_PRICE=money(purchase_price * Decimal("1.3")),
+                        PROD_DETAILS_PURCHASE_PRICE=purchase_price,
+                        PROD_DETAILS_SUPPLIER=self.rng.choice(
+                            self.suppliers
+                        ).Supp_Company_Name,
+                        PROD_DETAILS_QUANTITY=self.rng.randint(1, 100),
+                        PROD_DETAILS_UNIT=unit,
+                        PROD_DETAILS_PACKAGING=packaging,
+                        PROD_CAT_CODE=self.rng.choice(categories),
+                    )
+                )
+                products.append(
+                    Product(
+                        PROD_NAME=name,
+                        PROD_BRAND=self.rng.choice(BRANDS),
+                        PROD_RO_LEVEL=self.rng.randint(10, 50),
+                        PROD_RO_QTY=self.rng.randint(50, 200),
+                        PROD_DATECREATED=self.start,
+                        PROD_DATEUPDATED=self.start,
+                    )
+                )
+            with transaction.atomic():
+                self.insert(ProductDetails, details)
+                for product, detail in zip(products, details):
+                    product.PROD_DETAILS_CODE = detail
+                self.insert(Product, products)
+            self.products.extend(zip(products, details))
+
+    # Purchasing: purchase orders, inbound deliveries and inventory batches
+
+    def seed_purchases(self):
+        total = self.counts["purchase_orders"]
+        for indexes in self.chunks(total):
+            with transaction.atomic():
+                self.purchase_chunk(indexes, total)
+
+    def purchase_chunk(self, indexes, total):
+        orders, order_lines = [], []
+        for i in indexes:
+            created = self.moment(i, total)
+            supplier = self.rng.choice(self.suppliers)
+            lines = [(product, self.rng.randint(10, 200)) for product in self.lines()]
+            orders.append(
+                PurchaseOrder(
+                    PURCHASE_ORDER_STATUS=(
+                        "Pending" if self.is_open(created) else "Accepted"
+                    ),
+                    PURCHASE_ORDER_TOTAL_QTY=sum(qty for _, qty in lines),
+                    PURCHASE_ORDER_SUPPLIER_ID=supplier,
+                    PURCHASE_ORDER_SUPPLIER_CMPNY_NAME=supplier.Supp_Company_Name[:60],
+                    PURCHASE_ORDER_SUPPLIER_CMPNY_NUM=supplier.Supp_Company_Num,
+                    PURCHASE_ORDER_CONTACT_PERSON=supplier.Supp_Contact_Pname[:60],
+                    PURCHASE_ORDER_CONTACT_NUMBER=supplier.Supp_Contact_Num,
+                    PURCHASE_ORDER_DATE_CREATED=created,
+                    PURCHASE_ORDER_DATE_UPDATED=created,
+                    PURCHASE_ORDER_CREATEDBY_USER=self.rng.choice(self.users),
+                )
+            )
+            order_lines.append(lines)
+        self.insert(PurchaseOrder, orders)
+        self.insert(
+            PurchaseOrderDetails,
+            [
+                PurchaseOrderDetails(
+                    PURCHASE_ORDER_DET_PROD_ID=product.pk,
+                    PURCHASE_ORDER_DET_PROD_NAME=product.PROD_NAME[:60],
+                    PURCHASE_ORDER_DET_PROD_LINE_QTY=qty,
+                    PURCHASE_ORDER_ID=order,
+                )
+                for order, lines in zip(orders, order_lines)
+                for (product, _), qty in lines
+            ],
+        )
+
+        deliveries, delivery_lines = [], []
+        for order, lines in zip(orders, order_lines):
+            if order.PURCHASE_ORDER_STATUS != "Accepted":
+                continue
+            created = self.later(order.PURCHASE_ORDER_DATE_CREATED, 0, 2)
+            delivered = self.later(created, 1, 5)
+            is_delivered = not self.is_open(created)
+            with_defects = is_delivered and self.rng.random() < ISSUE_RATE
+            details = []
+            for (product, product_details), qty in lines:
+                defect = self.rng.randint(1, qty // 5 + 1) if with_defects else 0
+                accepted = qty - defect if is_delivered else 0
+                details.append(
+                    InboundDeliveryDetails(
+                        INBOUND_DEL_DETAIL_PROD_ID=product,
+                        INBOUND_DEL_DETAIL_PROD_NAME=product.PROD_NAME[:60],
+                        INBOUND_DEL_DETAIL_LINE_PRICE=(
+                            product_details.PROD_DETAILS_PURCHASE_PRICE * accepted
+                        ),
+                        INBOUND_DEL_DETAIL_ORDERED_QTY=qty,
+                        INBOUND_DEL_DETAIL_LINE_QTY_ACCEPT=accepted,
+                        INBOUND_DEL_DETAIL_LINE_QTY_DEFECT=defect,
+                        INBOUND_DEL_DETAIL_PROD_EXP_DATE=(
+                            (
+                                delivered + timedelta(days=self.rng.randint(180, 720))
+                            ).date()
+                            if is_delivered
+                            else None
+                        ),
+                    )
+                )
+            receiver = self.rng.choice(self.users)
+            deliveries.append(
+                InboundDelivery(
+                    INBOUND_DEL_ORDER_DATE_CREATED=created,
+                    INBOUND_DEL_ORDER_DATE_UPDATED=(
+                        delivered if is_delivered else created
+                    ),
+                    PURCHASE_ORDER_ID=order,
+                    INBOUND_DEL_SUPP_ID=order.PURCHASE_ORDER_SUPPLIER_ID,
+                    INBOUND_DEL_SUPP_NAME=order.PURCHASE_ORDER_SUPPLIER_CMPNY_NAME[:50],
+                    INBOUND_DEL_DATE_DELIVERED=delivered if is_delivered else None,
+                    INBOUND_DEL_STATUS="Delivered" if is_delivered else "Pending",
+                    INBOUND_DEL_TOTAL_RCVD_QTY=sum(
+                        d.INBOUND_DEL_DETAIL_LINE_QTY_ACCEPT for d in details
+                    ),
+                    INBOUND_DEL_TOTAL_ORDERED_QTY=order.PURCHASE_ORDER_TOTAL_QTY,
+                    INBOUND_DEL_TOTAL_PRICE=sum(
+                        d.INBOUND_DEL_DETAIL_LINE_PRICE for d in details
+                    ),
+                    INBOUND_DEL_RCVD_BY_USER_NAME=(
+                        receiver.username if is_delivered else None
+                    ),
+                    INBOUND_DEL_ORDER_APPRVDBY_USER=receiver.username,
+                )
+            )
+            delivery_lines.append(details)
+        self.insert(InboundDelivery, deliveries)
+        for delivery, details in zip(deliveries, delivery_lines):
+            for detail in details:
+                detail.INBOUND_DEL_ID = delivery
+        self.insert(
+            InboundDeliveryDetails,
+            [detail for details in delivery_lines for detail in details],
+        )
+
+        self.receive(deliveries, delivery_lines)
+        self.add_issues(
+            "Supplier Delivery",
+            InboundDelivery,
+            [
+                (delivery, delivery.INBOUND_DEL_DATE_DELIVERED, details)
+                for delivery, details in zip(deliveries, delivery_lines)
+            ],
+            defect_field="INBOUND_DEL_DETAIL_LINE_QTY_DEFECT",
+            product_field="INBOUND_DEL_DETAIL_PROD_ID",
+            price=lambda d: d.INBOUND_DEL_DETAIL_LINE_PRICE
+            / max(d.INBOUND_DEL_DETAIL_LINE_QTY_ACCEPT, 1),
+        )
+
+    def receive(self, deliveries, delivery_lines):
+        """
+        Stocks the accepted lines as batches. Older batches have sold more;
+        the stock that left is written to the ledger as a dispatch.
+        """
+        window = (self.end - self.start).total_seconds() or 1
+        batches, movements = [], []
+        for delivery, details in zip(deliveries, delivery_lines):
+            received = delivery.INBOUND_DEL_DATE_DELIVERED
+            for detail in details:
+                accepted = detail.INBOUND_DEL_DETAIL_LINE_QTY_ACCEPT
+                if not received or not accepted:
+                    continue
+                age = (self.end - received).total_seconds() / window
+                sold = min(accepted, round(accepted * age * self.rng.uniform(0.8, 1.6)))
+                batch = Inventory(
+                    PRODUCT_ID=detail.INBOUND_DEL_DETAIL_PROD_ID,
+                    PRODUCT_NAME=detail.INBOUND_DEL_DETAIL_PROD_NAME,
+                    INBOUND_DEL_ID=delivery,
+                    EXPIRY_DATE=detail.INBOUND_DEL_DETAIL_PROD_EXP_DATE,
+                    QUANTITY_ON_HAND=accepted - sold,
+                    IS_ACTIVE=accepted > sold,
+                    DATE_CREATED=received,
+                    LAST_UPDATED=self.later(received, 0, 60) if sold else received,
+                )
+                batches.append(batch)
+                movements.append(
+                    StockMovement(
+                        PRODUCT_ID=batch.PRODUCT_ID,
+                        INVENTORY_ID=batch,
+                        MOVEMENT_TYPE=StockMovement.RECEIPT,
+                        QUANTITY=accepted,
+                        REFERENCE=f"Inbound Delivery {delivery.pk}",
+                        CREATED_AT=received,
+                    )
+                )
+                if sold:
+                    movements.append(
+                        StockMovement(
+                            PRODUCT_ID=batch.PRODUCT_ID,
+                            INVENTORY_ID=batch,
+                            MOVEMENT_TYPE=StockMovement.DISPATCH,
+                            QUANTITY=-sold,
+                            REFERENCE="Outbound deliveries",
+                            CREATED_AT=batch.LAST_UPDATED,
+                        )
+                    )
+        Inventory.assign_ids(batches)
+        self.insert(Inventory, batches)
+        self.insert(StockMovement, movements)
+
+    # Sales: sales orders, outbound deliveries, payments and invoices
+
+    def seed_sales(self):
+        total = self.counts["sales_orders"]
+        for indexes in self.chunks(total):
+            with transaction.atomic():
+                self.sales_chunk(indexes, total)
+
+    def sales_chunk(self, indexes, total):
+        orders, order_lines = [], []
+        for i in indexes:
+            created = self.moment(i, total)
+            client = self.rng.choice(self.clients)
+            lines = [
+                (product, details, self.rng.randint(1, 20))
+                for product, details in self.lines()
+            ]
+            if self.is_open(created):
+                status = "Pending"
+            elif self.rng.random() < 0.03:
+                status = "Cancelled"
+            else:
+                status = "Accepted"  # Until its delivery is dispatched
+            orders.append(
+                SalesOrder(
+                    SALES_ORDER_DATE_CREATED=created,
+                    SALES_ORDER_DATE_UPDATED=created,
+                    SALES_ORDER_STATUS=status,
+                    SALES_ORDER_CREATEDBY_USER=self.rng.choice(self.users),
+                    SALES_ORDER_CLIENT_NAME=client.name[:30],
+                    SALES_ORDER_CLIENT_PROVINCE=client.province[:30],
+                    SALES_ORDER_CLIENT_CITY=client.address[:30],
+                    SALES_ORDER_CLIENT_PHONE_NUM=client.phoneNumber[:13],
+                    SALES_ORDER_DLVRY_OPTION=self.rng.choice(DELIVERY_OPTIONS),
+                    SALES_ORDER_PYMNT_OPTION=self.rng.choice(PAYMENT_OPTIONS),
+                    SALES_ORDER_PYMNT_TERMS=self.rng.choice([0, 15, 30, 60]),
+                    SALES_ORDER_TOTAL_QTY=sum(qty for _, _, qty in lines),
+                    SALES_ORDER_TOTAL_PRICE=sum(
+                        d.PROD_DETAILS_PRICE * qty for _, d, qty in lines
+                    ),
+                    CLIENT_ID=client,
+                )
+            )
+            order_lines.append(lines)
+
+        # Deliveries first, their progress decides the order's status
+        deliveries, delivery_lines = [], []
+        for order, lines in zip(orders, order_lines):
+            if order.SALES_ORDER_STATUS != "Accepted":
+                continue
+            delivery = self.outbound_delivery(order)
+            details = []
+            is_delivered = delivery.OUTBOUND_DEL_STATUS.startswith("Delivered")
+            with_defects = delivery.OUTBOUND_DEL_STATUS == "Delivered with Issues"
+            for product, product_details, qty in lines:
+                defect = self.rng.randint(1, qty) if with_defects else 0
+                price = product_details.PROD_DETAILS_PRICE
+                details.append(
+                    OutboundDeliveryDetails(
+                        OUTBOUND_DETAILS_PROD_ID=product,
+                        OUTBOUND_DETAILS_PROD_NAME=product.PROD_NAME[:100],
+                        OUTBOUND_DETAILS_PROD_QTY_ORDERED=qty,
+                        OUTBOUND_DETAILS_PROD_QTY_ACCEPTED=(
+                            qty - defect if is_delivered else 0
+                        ),
+                        OUTBOUND_DETAILS_PROD_QTY_DEFECT=defect,
+                        OUTBOUND_DETAILS_SELL_PRICE=price,
+                        OUTBOUND_DETAIL_LINE_TOTAL=price * qty,
+                    )
+                )
+            delivery.OUTBOUND_DEL_DLVRD_QTY = sum(
+                d.OUTBOUND_DETAILS_PROD_QTY_ACCEPTED for d in details
+            )
+            if delivery.OUTBOUND_DEL_STATUS != "Pending":
+                order.SALES_ORDER_STATUS = "Completed"
+                order.SALES_ORDER_DATE_UPDATED = delivery.OUTBOUND_DEL_SHIPPED_DATE
+            deliveries.append(delivery)
+            delivery_lines.append(details)
+        self.insert(SalesOrder, orders)
+        self.insert(
+            SalesOrderDetails,
+            [
+                SalesOrderDetails(
+                    SALES_ORDER_ID=order,
+                    SALES_ORDER_PROD_ID=product,
+                    SALES_ORDER_PROD_NAME=product.PROD_NAME[:50],
+                    SALES_ORDER_LINE_PRICE=details.PROD_DETAILS_PRICE,
+                    SALES_ORDER_LINE_QTY=qty,
+                    SALES_ORDER_LINE_TOTAL=details.PROD_DETAILS_PRICE * qty,
+                )
+                for order, lines in zip(orders, order_lines)
+                for product, details, qty in lines
+            ],
+        )
+        self.insert(OutboundDelivery, deliveries)
+        for delivery, details in zip(deliveries, delivery_lines):
+            for detail in details:
+                detail.OUTBOUND_DEL_ID = delivery
+        self.insert(
+            OutboundDeliveryDetails,
+            [detail for details in delivery_lines for detail in details],
+        )
+
+        delivered = [
+            (delivery, details)
+            for delivery, details in zip(deliveries, delivery_lines)
+            if delivery.OUTBOUND_DEL_CSTMR_RCVD_DATE
+        ]
+        self.bill(delivered)
+        self.add_issues(
+            "Customer Delivery",
+            OutboundDelivery,
+            [
+                (delivery, delivery.OUTBOUND_DEL_CSTMR_RCVD_DATE, details)
+                for delivery, details in delivered
+            ],
+            defect_field="OUTBOUND_DETAILS_PROD_QTY_DEFECT",
+            product_field="OUTBOUND_DETAILS_PROD_ID",
+            price=lambda d: d.OUTBOUND_DETAILS_SELL_PRICE,
+        )
+
+    def outbound_delivery(self, order):
+        created = self.later(order.SALES_ORDER_DATE_CREATED, 0, 1)
+        shipped = self.later(created, 0, 2)
+        received = self.later(shipped, 1, 4)
+        if self.is_open(created):
+            status = self.rng.choice(["Pending", "Dispatched"])
+        elif self.rng.random() < ISSUE_RATE:
+            status = "Delivered with Issues"
+        else:
+            status = "Delivered"
+        is_delivered = status.startswith("Delivered")
+        client = order.CLIENT_ID
+        accepted_by = self.rng.choice(self.users)
+        return OutboundDelivery(
+            SALES_ORDER_ID=order,
+            OUTBOUND_DEL_SHIPPED_DATE=shipped if status != "Pending" else None,
+            OUTBOUND_DEL_CSTMR_RCVD_DATE=received if is_delivered else None,
+            CLIENT_ID=client,
+            OUTBOUND_DEL_CUSTOMER_NAME=client.name[:60],
+            OUTBOUND_DEL_TOTAL_PRICE=order.SALES_ORDER_TOTAL_PRICE,
+            OUTBOUND_DEL_PYMNT_TERMS=order.SALES_ORDER_PYMNT_TERMS,
+            OUTBOUND_DEL_PYMNT_OPTION=order.SALES_ORDER_PYMNT_OPTION,
+            OUTBOUND_DEL_STATUS=status,
+            OUTBOUND_DEL_TOTAL_ORDERED_QTY=order.SALES_ORDER_TOTAL_QTY,
+            OUTBOUND_DEL_DLVRY_OPTION=order.SALES_ORDER_DLVRY_OPTION,
+            OUTBOUND_DEL_CITY=order.SALES_ORDER_CLIENT_CITY,
+            OUTBOUND_DEL_PROVINCE=order.SALES_ORDER_CLIENT_PROVINCE,
+            OUTBOUND_DEL_CREATED=created,
+            OUTBOUND_DEL_DATEUPDATED=received if is_delivered else created,
+            OUTBOUND_DEL_ACCPTD_BY_USERNAME=accepted_by.username[:60],
+            OUTBOUND_DEL_ACCPTD_BY_USER=accepted_by,
+        )
+
+    def bill(self, delivered):
+        """
+        Opens a payment for every delivered order, as completing a delivery
+        does. Payments past their due date are mostly paid, and each paid one
+        gets its sales invoice.
+        """
+        payments = []
+        for delivery, details in delivered:
+            start = delivery.OUTBOUND_DEL_CSTMR_RCVD_DATE
+            terms = delivery.OUTBOUND_DEL_PYMNT_TERMS or 0
+            due = start + timedelta(days=terms)
+            total = delivery.OUTBOUND_DEL_TOTAL_PRICE
+            roll = self.rng.random()
+            if due < self.end and roll < 0.9:
+                paid = total
+            elif roll < 0.5:
+                paid = money(total * Decimal(self.rng.uniform(0.1, 0.9)))
+            else:
+                paid = Decimal("0.00")
+            if paid == total:
+                status = "Paid"
+            else:
+                status = "Partially Paid" if paid else "Unpaid"
+            updated = self.later(start, 0, terms + 1) if paid else start
+            payments.append(
+                CustomerPayment(
+                    OUTBOUND_DEL_ID=delivery,
+                    CLIENT_ID=delivery.CLIENT_ID,
+                    CLIENT_NAME=delivery.OUTBOUND_DEL_CUSTOMER_NAME,
+                    PAYMENT_TERMS=terms,
+                    PAYMENT_START_DATE=start,
+                    PAYMENT_DUE_DATE=due,
+                    PAYMENT_METHOD=delivery.OUTBOUND_DEL_PYMNT_OPTION,
+                    PAYMENT_STATUS=status,
+                    AMOUNT_PAID=paid,
+                    AMOUNT_BALANCE=total - paid,
+                    CREATED_AT=start,
+                    UPDATED_AT=updated,
+                    CREATED_BY=delivery.OUTBOUND_DEL_ACCPTD_BY_USER,
+                )
+            )
+        self.insert(CustomerPayment, payments)
+
+        paid = [
+            (payment, details)
+            for payment, (_, details) in zip(payments, delivered)
+            if payment.PAYMENT_STATUS == "Paid"
+        ]
+        numbers = reserve_ids(
+            SALES_INVOICE_SERIES, len(paid), seed=last_sales_invoice_number
+        )
+        invoices, invoice_lines = [], []
+        for (payment, details), number in zip(paid, numbers):
+            items = [
+                SalesInvoiceItems(
+                    SALES_INV_ITEM_PROD_ID=d.OUTBOUND_DETAILS_PROD_ID,
+                    SALES_INV_ITEM_PROD_NAME=d.OUTBOUND_DETAILS_PROD_NAME,
+                    SALES_INV_item_PROD_DLVRD=d.OUTBOUND_DETAILS_PROD_QTY_ACCEPTED,
+                    SALES_INV_ITEM_PROD_SELL_PRICE=d.OUTBOUND_DETAILS_SELL_PRICE,
+                    SALES_INV_ITEM_PROD_PURCH_PRICE=(
+                        d.OUTBOUND_DETAILS_PROD_ID.PROD_DETAILS_CODE.PROD_DETAILS_PURCHASE_PRICE
+                    ),
+                )
+                for d in details
+                if d.OUTBOUND_DETAILS_PROD_QTY_ACCEPTED
+            ]
+            for item in items:
+                # bulk_create skips save(), which computes these
+                item.SALES_INV_ITEM_LINE_GROSS_REVENUE = item.calculate_revenue()
+                item.SALES_INV_ITEM_LINE_GROSS_INCOME = item.calculate_gross_income()
+            invoices.append(
+                SalesInvoice(
+                    SALES_INV_ID=f"INV{number:03d}",
+                    SALES_INV_DATETIME=payment.UPDATED_AT,
+                    SALES_INV_TOTAL_PRICE=payment.AMOUNT_PAID,
+                    CLIENT=payment.CLIENT_ID,
+                    PAYMENT_ID=payment,
+                    OUTBOUND_DEL_ID=payment.OUTBOUND_DEL_ID,
+                    SALES_INV_CREATED_BY=payment.CREATED_BY,
+                    SALES_INV_CREATED_AT=payment.UPDATED_AT,
+                    SALES_INV_TOTAL_GROSS_REVENUE=sum(
+                        i.SALES_INV_ITEM_LINE_GROSS_REVENUE for i in items
+                    ),
+                    SALES_INV_TOTAL_GROSS_INCOME=sum(
+                        i.SALES_INV_ITEM_LINE_GROSS_INCOME for i in items
+                    ),
+                )
+            )
+            invoice_lines.append(items)
+        self.insert(SalesInvoice, invoices)
+        for invoice, items in zip(invoices, invoice_lines):
+            for item in items:
+                item.SALES_INV_ID = invoice
+        self.insert(
+            SalesInvoiceItems, [item for items in invoice_lines for item in items]
+        )
+
+    # Issues and logs
+
+    def add_issues(
+        self, order_type, model, deliveries, defect_field, product_field, price
+    ):
+        """
+        Files an issue for every delivery in `deliveries`, a list of
+        (delivery, delivery date, detail lines), that has defective lines.
+        Issues older than OPEN_DAYS are resolved.
+        """
+        content_type = ContentType.objects.get_for_model(model)
+        issues, issue_lines = [], []
+        for delivery, delivered, details in deliveries:
+            defects = [d for d in details if getattr(d, defect_field)]
+            if not defects:
+                continue
+            resolved = not self.is_open(delivered)
+            issues.append(
+                DeliveryIssue(
+                    ORDER_TYPE=order_type,
+                    STATUS="Resolved" if resolved else "Pending",
+                    ISSUE_TYPE=self.rng.choice(ISSUE_TYPES),
+                    RESOLUTION=(
+                        self.rng.choice(["Replacement", "Offset"])
+                        if resolved
+                        else "No Selected"
+                    ),
+                    DELIVERY_TYPE=content_type,
+                    DELIVERY_ID=delivery.pk,
+                    IS_RESOLVED=resolved,
+                    DATE_CREATED=timezone.localtime(delivered).date(),
+                )
+            )
+            lines = []
+            for detail in defects:
+                product = getattr(detail, product_field)
+                unit_price = money(price(detail))
+                quantity = getattr(detail, defect_field)
+                lines.append(
+                    DeliveryItemIssue(
+                        ISSUE_PROD_ID=product.pk,
+                        ISSUE_PROD_NAME=product.PROD_NAME,
+                        ISSUE_QTY_DEFECT=quantity,
+                        ISSUE_PROD_LINE_PRICE=unit_price,
+                        ISSUE_LINE_TOTAL_PRICE=unit_price * quantity,
+                    )
+                )
+            issue_lines.append(lines)
+        self.insert(DeliveryIssue, issues)
+        for issue, lines in zip(issues, issue_lines):
+            for line in lines:
+                line.ISSUE_NO = issue
+        self.insert(
+            DeliveryItemIssue, [line for lines in issue_lines for line in lines]
+        )
+
+    def seed_logs(self):
+        total = self.counts["logs"]
+        types = list(LOG_TEMPLATES)
+        for indexes in self.chunks(total):
+            logs = []
+            for i in indexes:
+                user = self.rng.choice(self.users)
+                log_type = self.rng.choice(types)
+                moment = self.moment(i, total)
+                logs.append(
+                    Logs(
+                        LLOG_TYPE=log_type,
+                        LOG_DESCRIPTION=self.rng.choice(LOG_TEMPLATES[log_type]).format(
+                            user=user.username
+                        ),
+                        LOG_DATETIME=moment,
+                        LOG_MONTH=log_month(moment),  # Set by save(), skipped here
+                        USER_ID=user,
+                    )
+                )
+            self.insert(Logs, logs)
+
+    def rebuild_summaries(self):
+        """Refreshes what the bulk inserts bypassed: summaries, search, counters."""
+        rebuild_product_stock()
+        rebuild_sales_summary(start_date=timezone.localtime(self.start).date())
+        rebuild_search_index()
+        counted = {model for _, models in COUNTERS.values() for model in models}
+        for model in counted:
+            invalidate_counters(model)
@@ -0,0 +1,192 @@
+import os
+from datetime import timedelta
+from unittest import mock
+from django.db.models import Sum
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from Admin.Customer.models import Clients
+from Admin.Delivery.models import OutboundDelivery
+from Admin.Inventory.models import Inventory, ProductStock
+from Admin.Order.Sales_Order.models import SalesOrder
+from Admin.Sales.models import SalesInvoice
+from PHILVETS.database import database_config, pool_sizes
+from .plans import ENDPOINTS, endpoint_queries, plan_nodes, sequential_scans
+from .scenarios import SCENARIOS, check_results, count_queries, run_scenario
+from .seed import ScaleSeeder
+from .utils import (
+    apply_connection_mode,
+    restore_connection_settings,
+    summarize,
+    time_requests,
+)
+
+
+class DatabaseConfigTest(SimpleTestCase):
+    def test_persistent_connections_by_default(self):
+        with mock.patch.dict(os.environ, {"DB_NAME": "philvets"}, clear=True):
+            config = database_config()
+
+        self.assertEqual(config["NAME"], "philvets")
+        self.assertEqual(config["CONN_MAX_AGE"], 60)
+        self.assertTrue(config["CONN_HEALTH_CHECKS"])
+        self.assertNotIn("OPTIONS", config)
+
+    def test_pool_is_sized_per_worker(self):
+        env = {"DB_POOL": "True", "DB_MAX_CONNECTIONS": "20", "WEB_CONCURRENCY": "4"}
+        with mock.patch.dict(os.environ, env, clear=True):
+            config = database_config()
+
+        self.assertEqual(config["CONN_MAX_AGE"], 0)
+        self.assertEqual(config["OPTIONS"]["pool"]["max_size"], 4)  # (20 - 3) // 4
+        self.assertEqual(config["OPTIONS"]["pool"]["min_size"], 1)
+
+        with mock.patch.dict(os.environ, {"DB_POOL_MAX_SIZE": "8"}, clear=True):
+            self.assertEqual(pool_sizes(), (1, 8))
+
+
+class SummarizeTest(SimpleTestCase):
+    def test_percentiles(self):
+        stats = summarize([float(ms) for ms in range(100, 0, -1)])
+
+        self.assertEqual(stats["requests"], 100)
+        self.assertEqual(stats["p50"], 50)
+        self.assertEqual(stats["p99"], 99)
+        self.assertEqual(stats["mean"], 50.5)
+
+
+class ConnectionModeTest(TransactionTestCase):
+    def connections_opened(self, mode):
+        previous = apply_connection_mode(mode)
+        try:
+            with mock.patch.object(
+                connection, "connect", wraps=connection.connect
+            ) as connect, override_settings(DEBUG=False):
+                time_requests("/inventory/list/", 3)
+        finally:
+            restore_connection_settings(previous)
+        return connect.call_count
+
+    def test_no_reuse_reconnects_per_request(self):
+        self.assertEqual(self.connections_opened("no-reuse"), 3)
+
+    def test_persistent_connection_is_reused(self):
+        self.assertEqual(self.connections_opened("persistent"), 1)
+
+
+class QueryPlanTest(TestCase):
+    def test_plan_nodes_walks_the_tree(self):
+        plan = {
+            "Node Type": "Limit",
+            "Plans": [
+                {"Node Type": "Sort", "Plans": [{"Node Type": "Seq Scan"}]},
+                {"Node Type": "Index Scan"},
+            ],
+        }
+
+        types = [node["Node Type"] for node in plan_nodes(plan)]
+
+        self.assertEqual(types, ["Limit", "Sort", "Seq Scan", "Index Scan"])
+
+    def test_explains_the_queries_the_view_runs(self):
+        Clients.objects.create(name="Juan", address="Manila", province="NCR")
+
+        status_code, statements = endpoint_queries(ENDPOINTS["clients"])
+
+        self.assertEqual(status_code, 200)
+        self.assertEqual(len(statements), 1)
+        self.assertIn(Clients._meta.db_table, statements[0])
+        root, scanned = sequential_scans(statements[0])
+        self.assertEqual(scanned, {Clients._meta.db_table})
+        self.assertEqual(root["Node Type"], "Seq Scan")
+
+    def test_skips_endpoints_without_rows(self):
+        self.assertIsNone(endpoint_queries(ENDPOINTS["product-search"]))
+
+
+class SeedScaleTest(TestCase):
+    def test_seeds_consistent_data(self):
+        created = ScaleSeeder(scale=0.02, days=90, seed=1, chunk_size=50).run()
+
+        self.assertEqual(created["SalesOrder"], 100)
+        self.assertEqual(SalesOrder.objects.count(), 100)
+        for model in ("Inventory", "OutboundDelivery", "SalesInvoice", "Logs"):
+            self.assertGreater(created[model], 0, model)
+
+        # Every batch matches its ledger and the stock summary its batches
+        for batch in Inventory.objects.annotate(ledger=Sum("movements__QUANTITY")):
+            self.assertEqual(batch.ledger, batch.QUANTITY_ON_HAND)
+        self.assertEqual(
+            ProductStock.objects.aggregate(total=Sum("ON_HAND"))["total"],
+            Inventory.objects.aggregate(total=Sum("QUANTITY_ON_HAND"))["total"],
+        )
+        self.assertFalse(
+            SalesInvoice.objects.exclude(PAYMENT_ID__PAYMENT_STATUS="Paid").exists()
+        )
+        # Dates were spread over the window and the auto dates are back on
+        oldest = SalesOrder.objects.order_by("SALES_ORDER_DATE_CREATED").first()
+        self.assertLess(
+            oldest.SALES_ORDER_DATE_CREATED, timezone.now() - timedelta(days=30)
+        )
+        self.assertTrue(
+            SalesOrder._meta.get_field("SALES_ORDER_DATE_CREATED").auto_now_add
+        )
+
+
+class ScenarioTest(TestCase):
+    def test_checks_budgets_and_baseline(self):
+        result = {"p50": 12.0, "queries": 9, "budget": 10}
+        baseline = {"payment": {"p50": 10.0, "queries": 9}}
+
+        self.assertEqual(check_results({"payment": result}, baseline, 25), [])
+        self.assertEqual(check_results({"payment": None}, baseline), [])
+        failures = check_results(
+            {"payment": dict(result, queries=11)}, baseline, threshold=10
+        )
+        self.assertEqual(len(failures), 3)  # Budget, query and latency regression
+
+    def test_commit_keeps_the_requests_writes(self):
+        ScaleSeeder(scale=0.02, days=30, seed=1, chunk_size=50).run()
+        orders = SalesOrder.objects.count()
+
+        result = run_scenario(SCENARIOS["create-sales-order"], 2, commit=True)
+
+        self.assertLessEqual(result["queries"], result["budget"])
+        self.assertEqual(SalesOrder.objects.count(), orders + 2)
+
+    def test_ignores_savepoints(self):
+        captured = [
+            {"sql": 'SAVEPOINT "s1"'},
+            {"sql": 'SELECT 1 FROM "Inventory"'},
+            {"sql": 'RELEASE SAVEPOINT "s1"'},
+        ]
+
+        self.assertEqual(count_queries(captured), 1)
+
+    def test_scenarios_stay_in_budget_and_roll_back(self):
+        ScaleSeeder(scale=0.02, days=30, seed=1, chunk_size=50).run()
+        statuses = list(
+            OutboundDelivery.objects.order_by("pk").values_list(
+                "OUTBOUND_DEL_STATUS", flat=True
+            )
+        )
+        orders = SalesOrder.objects.count()
+
+        results = {
+            name: run_scenario(scenario, iterations=1)
+            for name, scenario in SCENARIOS.items()
+        }
+
+        self.assertEqual(check_results(results), [])
+        self.assertIsNotNone(results["create-sales-order"])
+        self.assertEqual(SalesOrder.objects.count(), orders)
+        self.assertEqual(
+            list(
+                OutboundDelivery.objects.order_by("pk").values_list(
+                    "OUTBOUND_DEL_STATUS", flat=True
+                )
+            ),
+            statuses,
+        )
@@ -0,0 +1,100 @@
+import logging
+import time
+from django.db import close_old_connections, connections
+from django.test import Client
+
+from Admin.Monitoring.metrics import percentile
+
+logger = logging.getLogger(__name__)
+
+# Connection settings compared by benchmark_connections
+CONNECTION_MODES = {
+    "no-reuse": {"CONN_MAX_AGE": 0, "CONN_HEALTH_CHECKS": False},
+    "persistent": {"CONN_MAX_AGE": 60, "CONN_HEALTH_CHECKS": True},
+    "pool": {
+        "CONN_MAX_AGE": 0,
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {"pool": {"min_size": 1, "max_size": 4}},
+    },
+}
+
+
+def summarize(durations):
+    """Request count, p50, p99 and mean of a list of durations in ms."""
+    durations = sorted(durations)
+    return {
+        "requests": len(durations),
+        "p50": round(percentile(durations, 50), 2),
+        "p99": round(percentile(durations, 99), 2),
+        "mean": round(sum(durations) / len(durations), 2) if durations else 0,
+    }
+
+
+def time_requests(url, count, warmup=0, client=None, **extra):
+    """
+    GETs `url` `warmup` + `count` times through the test client and returns
+    the durations of the last `count` requests in ms. The client goes through
+    the whole request cycle, connection setup and teardown included.
+    """
+    client = client or Client()
+    durations = []
+    for i in range(warmup + count):
+        start = time.perf_counter()
+        response = client.get(url, **extra)
+        # The test client keeps the connection across requests; close it as
+        # the request_finished handler does in production
+        close_old_connections()
+        elapsed = (time.perf_counter() - start) * 1000
+        if response.status_code >= 500:
+            raise RuntimeError(f"GET {url} returned {response.status_code}.")
+        if i >= warmup:
+            durations.append(elapsed)
+    return durations
+
+
+def pool_available(alias="default"):
+    connection = connections[alias]
+    if connection.vendor != "postgresql" or connection.Database.__name__ != "psycopg":
+        return False
+    try:
+        import psycopg_pool  # noqa:F401
+    except ImportError:
+        return False
+    return True
+
+
+def apply_connection_mode(mode, alias="default"):
+    """
+    Switches `alias` to the connection settings of `mode` and returns the
+    previous ones, for restore_connection_settings().
+    """
+    connection = connections[alias]
+    previous = {
+        key: connection.settings_dict.get(key)
+        for key in ("CONN_MAX_AGE", "CONN_HEALTH_CHECKS", "OPTIONS")
+    }
+    _reset_connection(connection)
+    settings = dict(CONNECTION_MODES[mode])
+    settings["OPTIONS"] = {
+        **{
+            key: value
+            for key, value in (previous["OPTIONS"] or {}).items()
+            if key != "pool"
+        },
+        **settings.get("OPTIONS", {}),
+    }
+    connection.settings_dict.update(settings)
+    return previous
+
+
+def restore_connection_settings(previous, alias="default"):
+    connection = connections[alias]
+    _reset_connection(connection)
+    connection.settings_dict.update(previous)
+
+
+def _reset_connection(connection):
+    connection.close()
+    if hasattr(connection, "close_pool"):
+        # The pool is built from the settings on first use
+        connection.close_pool()
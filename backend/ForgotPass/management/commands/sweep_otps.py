@@ -0,0 +1,32 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+
+from ForgotPass.utils import sweep_otps
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes expired OTPs in batches. Run it periodically, e.g. hourly "
+        "from the scheduler, to keep the OTP table small."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--grace-minutes",
+            type=int,
+            default=60,
+            help="Only delete OTPs that expired at least this long ago.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=5000,
+            help="Rows deleted per statement.",
+        )
+
+    def handle(self, *args, **options):
+        deleted = sweep_otps(
+            grace=timedelta(minutes=options["grace_minutes"]),
+            chunk_size=options["chunk_size"],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired OTPs."))
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.3 on 2026-10-18 16:12
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ForgotPass", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="otp",
+            index=models.Index(
+                fields=["user", "-created_at"], name="OTP_USER_CREATED_IDX"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="otp",
+            index=models.Index(fields=["expires_at"], name="OTP_EXPIRES_IDX"),
+        ),
+    ]
@@ -13,6 +13,13 @@ class OTP(models.Model):
     expires_at = models.DateTimeField()
     is_used = models.BooleanField(default=False)  # To mark OTP as used
 
+    class Meta:
+        indexes = [
+            # Latest OTP per user, and the expiry sweep
+            models.Index(fields=["user", "-created_at"], name="OTP_USER_CREATED_IDX"),
+            models.Index(fields=["expires_at"], name="OTP_EXPIRES_IDX"),
+        ]
+
     def save(self, *args, **kwargs):
         # Set expiration time to 15 minutes from creation (you can adjust as needed)
         self.expires_at = timezone.now() + timedelta(minutes=15)
@@ -1,3 +1,175 @@
-from django.test import TestCase
+from datetime import timedelta
+from django.core import mail
+from django.core.cache import cache
+from django.test import RequestFactory, override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
 
-# Create your tests here.
+from Account.models import User
+from Outbox.models import EmailJob
+from .models import OTP
+from .utils import (
+    OTP_EXPIRED,
+    OTP_KEY,
+    OTP_OK,
+    check_otp,
+    client_ip,
+    issue_otp,
+    sweep_otps,
+)
+
+
+class SendOTPTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_otp_email_is_queued_not_sent(self):
+        User.objects.create_user(
+            username="vet",
+            password="testpassword",
+            email="vet@example.com",
+            first_name="Vet",
+            last_name="User",
+        )
+
+        response = self.client.post("/forgot/otp/", {"email": "vet@example.com"})
+
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(mail.outbox, [])
+        job = EmailJob.objects.get()
+        self.assertEqual(job.RECIPIENTS, ["vet@example.com"])
+        self.assertIn(User.objects.get().otps.get().otp_value, job.BODY)
+
+
+class OTPServiceTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="vet",
+            password="testpassword",
+            email="vet@example.com",
+            first_name="Vet",
+            last_name="User",
+        )
+
+    @override_settings(OTP_HOT_STORE=True)
+    def test_verify_reads_the_cached_otp(self):
+        otp_value = issue_otp(self.user)
+
+        with self.assertNumQueries(1):  # The user lookup only
+            response = self.client.post(
+                "/forgot/verifyotp/", {"email": "vet@example.com", "otp": otp_value}
+            )
+        self.assertEqual(response.status_code, 200, response.data)
+
+        # A cold cache falls back to the latest row
+        cache.clear()
+        self.assertEqual(check_otp(self.user, otp_value), OTP_OK)
+
+    def test_per_process_cache_is_not_trusted(self):
+        first = issue_otp(self.user)
+        stale = {
+            "value": first,
+            "expires_at": (timezone.now() + timedelta(minutes=15)).timestamp(),
+            "is_used": False,
+        }
+        # Another worker resends, this worker's cache still holds the old OTP
+        second = issue_otp(self.user, invalidate_previous=True)
+        cache.set(OTP_KEY.format(self.user.pk), stale)
+
+        self.assertEqual(check_otp(self.user, second), OTP_OK)
+        self.assertNotEqual(check_otp(self.user, first), OTP_OK)
+
+        # Nothing depends on the local cache surviving between issue and verify
+        third = issue_otp(self.user, invalidate_previous=True)
+        cache.clear()
+        self.assertEqual(check_otp(self.user, third), OTP_OK)
+
+    def test_resend_invalidates_previous_otps(self):
+        first = issue_otp(self.user)
+        second = issue_otp(self.user, invalidate_previous=True)
+
+        self.assertEqual(self.user.otps.filter(is_used=False).count(), 1)
+        self.assertEqual(check_otp(self.user, second), OTP_OK)
+        self.assertNotEqual(check_otp(self.user, first), OTP_OK)
+
+    def test_expired_otp_is_rejected(self):
+        otp_value = issue_otp(self.user)
+        OTP.objects.update(expires_at=timezone.now() - timedelta(minutes=1))
+        cache.clear()
+
+        self.assertEqual(check_otp(self.user, otp_value), OTP_EXPIRED)
+
+    @override_settings(
+        OTP_RATE_LIMITS={
+            "send": {"per_ip": 100, "per_email": 2, "window": 60},
+            "verify": {"per_ip": 100, "per_email": 2, "window": 60},
+        }
+    )
+    def test_rate_limit_per_email(self):
+        for _ in range(2):
+            response = self.client.post("/forgot/otp/", {"email": "vet@example.com"})
+            self.assertEqual(response.status_code, 200)
+
+        with self.assertNumQueries(0):
+            response = self.client.post("/forgot/otp/", {"email": "vet@example.com"})
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(self.user.otps.count(), 2)
+
+    @override_settings(
+        OTP_RATE_LIMITS={
+            "send": {"per_ip": 1, "per_email": 100, "window": 60},
+            "verify": {"per_ip": 100, "per_email": 100, "window": 60},
+        }
+    )
+    def test_rate_limit_per_ip(self):
+        self.client.post("/forgot/otp/", {"email": "vet@example.com"})
+        response = self.client.post("/forgot/otp/", {"email": "other@example.com"})
+        self.assertEqual(response.status_code, 429)
+
+    @override_settings(
+        OTP_RATE_LIMITS={
+            "send": {"per_ip": 1, "per_email": 100, "window": 60},
+            "verify": {"per_ip": 100, "per_email": 100, "window": 60},
+        }
+    )
+    def test_spoofed_forwarded_for_does_not_reset_the_ip_limit(self):
+        # The router appends the real address after whatever the client sent
+        self.client.post(
+            "/forgot/otp/",
+            {"email": "vet@example.com"},
+            HTTP_X_FORWARDED_FOR="10.0.0.1, 203.0.113.7",
+        )
+        response = self.client.post(
+            "/forgot/otp/",
+            {"email": "other@example.com"},
+            HTTP_X_FORWARDED_FOR="10.0.0.2, 203.0.113.7",
+        )
+        self.assertEqual(response.status_code, 429)
+
+    def test_client_ip_counts_trusted_hops(self):
+        request = RequestFactory().get(
+            "/", HTTP_X_FORWARDED_FOR="1.1.1.1, 2.2.2.2, 3.3.3.3"
+        )
+
+        self.assertEqual(client_ip(request), "3.3.3.3")
+        with self.settings(TRUSTED_PROXY_HOPS=2):
+            self.assertEqual(client_ip(request), "2.2.2.2")
+        with self.settings(TRUSTED_PROXY_HOPS=0):
+            self.assertEqual(client_ip(request), "127.0.0.1")
+        with self.settings(TRUSTED_PROXY_HOPS=4):
+            self.assertEqual(client_ip(request), "127.0.0.1")
+
+    def test_sweep_deletes_expired_otps(self):
+        issue_otp(self.user)
+        issue_otp(self.user)
+        current = issue_otp(self.user)
+        old = list(OTP.objects.order_by("pk").values_list("pk", flat=True)[:2])
+        OTP.objects.filter(pk__in=old).update(
+            expires_at=timezone.now() - timedelta(days=1)
+        )
+
+        self.assertEqual(sweep_otps(chunk_size=1), 2)
+        self.assertEqual(
+            list(OTP.objects.values_list("otp_value", flat=True)), [current]
+        )
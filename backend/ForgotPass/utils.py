@@ -0,0 +1,151 @@
+import hmac
+import logging
+import random
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import OTP
+
+logger = logging.getLogger(__name__)
+
+OTP_KEY = "otp:user:{}"
+RATE_KEY = "otp:rate:{}:{}"
+
+# check_otp results
+OTP_OK = "ok"
+OTP_MISSING = "missing"
+OTP_INVALID = "invalid"
+OTP_EXPIRED = "expired"
+
+
+def _cache_otp(user_id, otp):
+    entry = {
+        "value": otp.otp_value,
+        "expires_at": otp.expires_at.timestamp(),
+        "is_used": otp.is_used,
+    }
+    if not settings.OTP_HOT_STORE:
+        return entry
+    timeout = max(1, int(otp.expires_at.timestamp() - timezone.now().timestamp()))
+    cache.set(OTP_KEY.format(user_id), entry, timeout)
+    return entry
+
+
+def issue_otp(user, invalidate_previous=False):
+    """
+    Creates a new 6-digit OTP for `user` and puts it in the hot store, when
+    OTP_HOT_STORE is on. With
+    `invalidate_previous`, the user's unused OTPs are marked used first in a
+    single UPDATE. Returns the OTP value.
+    """
+    if invalidate_previous:
+        OTP.objects.filter(user=user, is_used=False).update(is_used=True)
+    otp = OTP.objects.create(user=user, otp_value=str(random.randint(100000, 999999)))
+    _cache_otp(user.pk, otp)
+    return otp.otp_value
+
+
+def latest_otp(user):
+    """
+    The user's latest OTP as a dict, from the cache when it is there, else
+    from the (USER, created_at) index, which then warms the cache. Without
+    OTP_HOT_STORE it always comes from the index.
+    """
+    if settings.OTP_HOT_STORE:
+        entry = cache.get(OTP_KEY.format(user.pk))
+        if entry is not None:
+            return entry
+    otp = OTP.objects.filter(user=user).order_by("-created_at").first()
+    if otp is None:
+        return None
+    return _cache_otp(user.pk, otp)
+
+
+def check_otp(user, value):
+    """Compares `value` with the user's latest OTP, returns an OTP_* result."""
+    entry = latest_otp(user)
+    if entry is None:
+        return OTP_MISSING
+    if not value or not hmac.compare_digest(entry["value"], str(value)):
+        return OTP_INVALID
+    if entry["is_used"] or timezone.now().timestamp() >= entry["expires_at"]:
+        return OTP_EXPIRED
+    return OTP_OK
+
+
+def client_ip(request):
+    """
+    The client's address, as recorded by the trusted proxies. The leftmost
+    X-Forwarded-For entries are whatever the client sent, so the address is
+    taken TRUSTED_PROXY_HOPS entries from the right.
+    """
+    hops = settings.TRUSTED_PROXY_HOPS
+    forwarded = [
+        address.strip()
+        for address in request.META.get("HTTP_X_FORWARDED_FOR", "").split(",")
+        if address.strip()
+    ]
+    if hops > 0 and len(forwarded) >= hops:
+        return forwarded[-hops]
+    return request.META.get("REMOTE_ADDR", "")
+
+
+def hit_rate_limit(scope, identifier, limit, window):
+    """
+    Counts one request against `identifier` in a fixed window of `window`
+    seconds. Returns True once more than `limit` requests were made, so
+    callers can refuse before touching the database.
+    """
+    key = RATE_KEY.format(scope, str(identifier).lower())
+    if cache.add(key, 1, window):
+        return limit < 1
+    try:
+        count = cache.incr(key)
+    except ValueError:
+        # Expired between add() and incr()
+        cache.add(key, 1, window)
+        count = 1
+    return count > limit
+
+
+def otp_rate_limited(request, email, scope="send"):
+    """
+    Applies the per-IP and per-email OTP limits from settings. `scope`
+    separates sending from verifying, which is allowed more attempts.
+    """
+    limits = settings.OTP_RATE_LIMITS[scope]
+    ip_limit, email_limit, window = (
+        limits["per_ip"],
+        limits["per_email"],
+        limits["window"],
+    )
+    if hit_rate_limit(f"{scope}:ip", client_ip(request), ip_limit, window):
+        logger.warning(f"OTP {scope} rate limit hit for IP {client_ip(request)}.")
+        return True
+    if email and hit_rate_limit(f"{scope}:email", email, email_limit, window):
+        logger.warning(f"OTP {scope} rate limit hit for {email}.")
+        return True
+    return False
+
+
+def sweep_otps(grace=None, chunk_size=5000):
+    """
+    Deletes OTPs that expired more than `grace` ago, `chunk_size` rows per
+    DELETE so the sweep never holds long locks. Returns the number deleted.
+    """
+    grace = grace if grace is not None else timedelta(hours=1)
+    cutoff = timezone.now() - grace
+    deleted = 0
+    while True:
+        ids = list(
+            OTP.objects.filter(expires_at__lt=cutoff).values_list("pk", flat=True)[
+                :chunk_size
+            ]
+        )
+        if not ids:
+            break
+        deleted += OTP.objects.filter(pk__in=ids).delete()[0]
+    logger.info(f"Swept {deleted} expired OTPs.")
+    return deleted
@@ -2,17 +2,30 @@ from django.shortcuts import render
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import permissions, status
-from django.core.mail import send_mail
+from Outbox.utils import enqueue_email
 from django.contrib.auth import get_user_model
-import random
 import re
 from django.conf import settings
-from .models import OTP  # Ensure to import your OTP model
-from django.utils import timezone
+from .utils import (
+    OTP_EXPIRED,
+    OTP_INVALID,
+    OTP_MISSING,
+    OTP_OK,
+    check_otp,
+    issue_otp,
+    otp_rate_limited,
+)
 
 User = get_user_model()
 
 
+def too_many_requests():
+    return Response(
+        {"message": "Too many requests. Please try again later."},
+        status=status.HTTP_429_TOO_MANY_REQUESTS,
+    )
+
+
 class SendOTPView(APIView):
     permission_classes = [permissions.AllowAny]  # Allow public access to this endpoint
 
@@ -24,20 +37,19 @@ class SendOTPView(APIView):
                 {"message": "Email is required."}, status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Check if email exists
-        if not User.objects.filter(email=email).exists():
+        # Refuse floods before they reach the database
+        if otp_rate_limited(request, email):
+            return too_many_requests()
+
+        # Retrieve the user
+        user = User.objects.filter(email=email).first()
+        if user is None:
             return Response(
                 {"message": "Email not found."}, status=status.HTTP_404_NOT_FOUND
             )
 
-        # Retrieve the user
-        user = User.objects.get(email=email)
-
-        # Generate a 6-digit OTP
-        otp_value = str(random.randint(100000, 999999))
-
-        # Create and save the OTP instance
-        otp_instance = OTP.objects.create(user=user, otp_value=otp_value)  # noqa:F841
+        # Generate and store a 6-digit OTP
+        otp_value = issue_otp(user)
 
         # Custom email message
         email_message = f"""
@@ -47,14 +59,13 @@ class SendOTPView(APIView):
         If you did not request this, please ignore this email.
         """
 
-        # Send the OTP via email
+        # Queue the OTP email, the outbox worker sends it
         try:
-            send_mail(
+            enqueue_email(
                 "Your OTP for Password Reset",
                 email_message,
                 settings.DEFAULT_FROM_EMAIL,
                 [email],
-                fail_silently=False,
             )
             return Response(
                 {"message": "OTP sent to email successfully."},
@@ -80,30 +91,32 @@ class VerifyOTPView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        try:
-            user = User.objects.get(email=email)
-        except User.DoesNotExist:
+        # Limits guessing as well as floods
+        if otp_rate_limited(request, email, scope="verify"):
+            return too_many_requests()
+
+        user = User.objects.filter(email=email).first()
+        if user is None:
             return Response(
                 {"message": "User with this email does not exist."},
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        # Get the latest OTP associated with the user
-        otp_instance = OTP.objects.filter(user=user).order_by("-created_at").first()
-        if not otp_instance:
+        # Check the latest OTP associated with the user
+        result = check_otp(user, otp)
+        if result == OTP_MISSING:
             return Response(
                 {"message": "No OTP found. Please request a new one."},
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        # Check if the OTP matches and is still valid
-        if otp_instance.otp_value != otp:
+        if result == OTP_INVALID:
             return Response(
                 {"message": "Invalid OTP. Please try again."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        if not otp_instance.is_valid():
+        if result == OTP_EXPIRED:
             return Response(
                 {"message": "OTP has expired. Please request a new one."},
                 status=status.HTTP_400_BAD_REQUEST,
@@ -147,32 +160,29 @@ class ChangePasswordView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        try:
-            user = User.objects.get(email=email)
-
-            # Check if the OTP is valid before allowing password change
-            otp_instance = OTP.objects.filter(user=user).order_by("-created_at").first()
-            if (
-                not otp_instance
-                or otp_instance.otp_value != otp
-                or not otp_instance.is_valid()
-            ):
-                return Response(
-                    {"message": "Invalid or expired OTP. Please request a new one."},
-                    status=status.HTTP_400_BAD_REQUEST,
-                )
-
-            # Set the new password
-            user.set_password(new_password)
-            user.save()
+        if otp_rate_limited(request, email, scope="verify"):
+            return too_many_requests()
+
+        user = User.objects.filter(email=email).first()
+        if user is None:
             return Response(
-                {"message": "Password changed successfully."}, status=status.HTTP_200_OK
+                {"message": "User not found."}, status=status.HTTP_404_NOT_FOUND
             )
-        except User.DoesNotExist:
+
+        # Check if the OTP is valid before allowing password change
+        if check_otp(user, otp) != OTP_OK:
             return Response(
-                {"message": "User not found."}, status=status.HTTP_404_NOT_FOUND
+                {"message": "Invalid or expired OTP. Please request a new one."},
+                status=status.HTTP_400_BAD_REQUEST,
             )
 
+        # Set the new password
+        user.set_password(new_password)
+        user.save()
+        return Response(
+            {"message": "Password changed successfully."}, status=status.HTTP_200_OK
+        )
+
 
 class ResendOTPView(APIView):
     permission_classes = [permissions.AllowAny]  # Allow public access to this endpoint
@@ -185,30 +195,19 @@ class ResendOTPView(APIView):
                 {"message": "Email is required."}, status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Check if email exists
-        if not User.objects.filter(email=email).exists():
+        # Refuse floods before they reach the database
+        if otp_rate_limited(request, email):
+            return too_many_requests()
+
+        # Retrieve the user
+        user = User.objects.filter(email=email).first()
+        if user is None:
             return Response(
                 {"message": "Email not found."}, status=status.HTTP_404_NOT_FOUND
             )
 
-        # Retrieve the user
-        user = User.objects.get(email=email)
-
-        # Mark the current OTP as used (if it exists)
-        otp_instance = (
-            OTP.objects.filter(user=user, is_used=False).order_by("-created_at").first()
-        )
-        if otp_instance:
-            otp_instance.is_used = True
-            otp_instance.save()
-
-        # Generate a new 6-digit OTP
-        otp_value = str(random.randint(100000, 999999))
-
-        # Create and save the new OTP instance
-        new_otp_instance = OTP.objects.create(  # noqa:F841
-            user=user, otp_value=otp_value
-        )
+        # Mark the current OTPs as used and generate a new one
+        otp_value = issue_otp(user, invalidate_previous=True)
 
         # Custom email message
         email_message = f"""
@@ -218,14 +217,13 @@ class ResendOTPView(APIView):
         If you did not request this, please ignore this email.
         """
 
-        # Send the OTP via email
+        # Queue the OTP email, the outbox worker sends it
         try:
-            send_mail(
+            enqueue_email(
                 "Your OTP for Password Reset",
                 email_message,
                 settings.DEFAULT_FROM_EMAIL,
                 [email],
-                fail_silently=False,
             )
             return Response(
                 {"message": "New OTP sent to email successfully."},
@@ -249,20 +247,19 @@ class RegisterOTPView(APIView):
                 {"message": "Email is required."}, status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Check if email exists
-        if not User.objects.filter(email=email).exists():
+        # Refuse floods before they reach the database
+        if otp_rate_limited(request, email):
+            return too_many_requests()
+
+        # Retrieve the user
+        user = User.objects.filter(email=email).first()
+        if user is None:
             return Response(
                 {"message": "Email not found."}, status=status.HTTP_404_NOT_FOUND
             )
 
-        # Retrieve the user
-        user = User.objects.get(email=email)
-
-        # Generate a 6-digit OTP
-        otp_value = str(random.randint(100000, 999999))
-
-        # Create and save the OTP instance
-        otp_instance = OTP.objects.create(user=user, otp_value=otp_value)  # noqa:F841
+        # Generate and store a 6-digit OTP
+        otp_value = issue_otp(user)
 
         # Custom email message
         email_message = f"""
@@ -272,14 +269,13 @@ class RegisterOTPView(APIView):
         If you did not request this, please ignore this email.
         """
 
-        # Send the OTP via email
+        # Queue the OTP email, the outbox worker sends it
         try:
-            send_mail(
+            enqueue_email(
                 "Your OTP for Password Reset",
                 email_message,
                 settings.DEFAULT_FROM_EMAIL,
                 [email],
-                fail_silently=False,
             )
             return Response(
                 {"message": "OTP sent to email successfully."},
@@ -289,4 +285,4 @@ class RegisterOTPView(APIView):
             return Response(
                 {"message": f"Failed to send OTP. Error: {str(e)}"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            )
\ No newline at end of file
+            )
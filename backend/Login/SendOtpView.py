@@ -1,6 +1,6 @@
 # Login/otp_views.py
 import random
-from django.core.mail import send_mail
+from Outbox.utils import enqueue_email
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from rest_framework import status
@@ -37,14 +37,13 @@ class SendOTPView(APIView):
         user.otp = otp
         user.save()
 
-        # Send the OTP via email
+        # Queue the OTP email, the outbox worker sends it
         try:
-            send_mail(
+            enqueue_email(
                 "Your OTP for Password Reset",
                 f"Your OTP is: {otp}",
                 settings.DEFAULT_FROM_EMAIL,
                 [email],
-                fail_silently=False,
             )
             return Response(
                 {"message": "OTP sent to email successfully."},
@@ -3,13 +3,15 @@ from rest_framework import serializers
 from django.contrib.auth import authenticate
 from django.utils.translation import gettext_lazy as _
 
+from Admin.authentication import add_user_claims
+
 
 class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
     @classmethod
     def get_token(cls, user):
         token = super().get_token(user)
-        token["username"] = user.username
-        return token
+        # Profile claims, which let AUTH_USER_CACHE = "stateless" skip the DB
+        return add_user_claims(token, user)
 
 
 class LoginSerializer(serializers.Serializer):  # to connect to frontend
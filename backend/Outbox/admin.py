@@ -0,0 +1,10 @@
+from django.contrib import admin
+
+from .models import EmailJob
+
+
+@admin.register(EmailJob)
+class EmailJobAdmin(admin.ModelAdmin):
+    list_display = ("SUBJECT", "STATUS", "ATTEMPTS", "NEXT_ATTEMPT_AT", "SENT_AT")
+    list_filter = ("STATUS",)
+    search_fields = ("SUBJECT", "RECIPIENTS")
@@ -0,0 +1,31 @@
+from django.core.mail.backends.locmem import EmailBackend
+
+
+class LocalOutboxBackend(EmailBackend):
+    """
+    Stand-in for SMTP in tests and local runs. Messages land in
+    django.core.mail.outbox like the locmem backend; `fail_next` makes the
+    next sends raise, and `connections_opened` counts sessions so connection
+    reuse can be checked.
+    """
+
+    connections_opened = 0
+    failures = []
+
+    @classmethod
+    def fail_next(cls, count=1, error="Simulated SMTP failure"):
+        cls.failures = [error] * count
+
+    @classmethod
+    def reset(cls):
+        cls.connections_opened = 0
+        cls.failures = []
+
+    def open(self):
+        LocalOutboxBackend.connections_opened += 1
+        return True
+
+    def send_messages(self, messages):
+        if LocalOutboxBackend.failures:
+            raise ConnectionError(LocalOutboxBackend.failures.pop(0))
+        return super().send_messages(messages)
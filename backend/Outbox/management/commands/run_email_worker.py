@@ -0,0 +1,52 @@
+import signal
+import threading
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from Outbox.utils import process_outbox, run_workers
+
+
+class Command(BaseCommand):
+    help = (
+        "Sends queued emails from the outbox with a pool of worker threads, "
+        "each reusing one SMTP connection, and retries failures with backoff."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=getattr(settings, "OUTBOX_WORKERS", 2),
+            help="Worker threads, each with its own SMTP connection.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="Jobs claimed per batch.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Send the jobs that are due now and exit.",
+        )
+
+    def handle(self, *args, **options):
+        if options["once"]:
+            total_sent = total_failed = 0
+            while True:
+                sent, failed = process_outbox(options["batch_size"])
+                if not sent and not failed:
+                    break
+                total_sent, total_failed = total_sent + sent, total_failed + failed
+            self.stdout.write(
+                self.style.SUCCESS(f"Sent {total_sent}, failed {total_failed}.")
+            )
+            return
+
+        stop = threading.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: stop.set())
+        self.stdout.write(f"Email worker running with {options['workers']} threads.")
+        run_workers(options["workers"], stop, options["batch_size"])
+        self.stdout.write("Email worker stopped.")
@@ -0,0 +1,65 @@
+# Generated by Django 5.1.3 on 2026-10-18 16:09
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="EmailJob",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("SUBJECT", models.CharField(max_length=255)),
+                ("BODY", models.TextField()),
+                ("FROM_EMAIL", models.CharField(blank=True, max_length=255, null=True)),
+                ("RECIPIENTS", models.JSONField(default=list)),
+                (
+                    "STATUS",
+                    models.CharField(
+                        choices=[
+                            ("Pending", "Pending"),
+                            ("Sending", "Sending"),
+                            ("Sent", "Sent"),
+                            ("Failed", "Failed"),
+                        ],
+                        default="Pending",
+                        max_length=20,
+                    ),
+                ),
+                ("ATTEMPTS", models.PositiveIntegerField(default=0)),
+                ("MAX_ATTEMPTS", models.PositiveIntegerField(default=5)),
+                (
+                    "NEXT_ATTEMPT_AT",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                ("LOCKED_AT", models.DateTimeField(blank=True, null=True)),
+                ("LAST_ERROR", models.TextField(blank=True, default="")),
+                ("CREATED_AT", models.DateTimeField(auto_now_add=True)),
+                ("SENT_AT", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "verbose_name": "EMAIL JOB",
+                "verbose_name_plural": "EMAIL JOBS",
+                "db_table": "EMAIL_JOB",
+                "indexes": [
+                    models.Index(
+                        fields=["STATUS", "NEXT_ATTEMPT_AT"], name="EMAIL_JOB_DUE_IDX"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,43 @@
+from django.db import models
+from django.utils import timezone
+
+
+class EmailJob(models.Model):
+    # Queued email, sent by the run_email_worker command
+    PENDING = "Pending"
+    SENDING = "Sending"
+    SENT = "Sent"
+    FAILED = "Failed"
+    STATUSES = [
+        (PENDING, "Pending"),
+        (SENDING, "Sending"),
+        (SENT, "Sent"),
+        (FAILED, "Failed"),
+    ]
+
+    SUBJECT = models.CharField(max_length=255)
+    BODY = models.TextField()
+    FROM_EMAIL = models.CharField(max_length=255, blank=True, null=True)
+    RECIPIENTS = models.JSONField(default=list)
+    STATUS = models.CharField(max_length=20, choices=STATUSES, default=PENDING)
+    ATTEMPTS = models.PositiveIntegerField(default=0)
+    MAX_ATTEMPTS = models.PositiveIntegerField(default=5)
+    NEXT_ATTEMPT_AT = models.DateTimeField(default=timezone.now)
+    LOCKED_AT = models.DateTimeField(null=True, blank=True)  # Claimed by a worker
+    LAST_ERROR = models.TextField(blank=True, default="")
+    CREATED_AT = models.DateTimeField(auto_now_add=True)
+    SENT_AT = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.SUBJECT} to {', '.join(self.RECIPIENTS)} - {self.STATUS}"
+
+    class Meta:
+        db_table = "EMAIL_JOB"
+        verbose_name = "EMAIL JOB"
+        verbose_name_plural = "EMAIL JOBS"
+        indexes = [
+            # The worker's claim query
+            models.Index(
+                fields=["STATUS", "NEXT_ATTEMPT_AT"], name="EMAIL_JOB_DUE_IDX"
+            ),
+        ]
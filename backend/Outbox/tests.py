@@ -0,0 +1,97 @@
+from datetime import timedelta
+from unittest import mock
+from django.core import mail
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .backends import LocalOutboxBackend
+from .models import EmailJob
+from .utils import claim_jobs, enqueue_email, process_outbox
+
+
+@override_settings(OUTBOX_EMAIL_BACKEND="Outbox.backends.LocalOutboxBackend")
+class OutboxTest(TestCase):
+    def setUp(self):
+        LocalOutboxBackend.reset()
+        self.addCleanup(LocalOutboxBackend.reset)
+
+    def test_enqueue_does_not_send(self):
+        job = enqueue_email("Subject", "Body", "noreply@example.com", "vet@example.com")
+
+        self.assertEqual(job.STATUS, EmailJob.PENDING)
+        self.assertEqual(job.RECIPIENTS, ["vet@example.com"])
+        self.assertEqual(mail.outbox, [])
+
+    def test_batch_shares_one_connection(self):
+        for i in range(3):
+            enqueue_email(f"Subject {i}", "Body", None, ["vet@example.com"])
+
+        self.assertEqual(process_outbox(), (3, 0))
+
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(LocalOutboxBackend.connections_opened, 1)
+        self.assertEqual(EmailJob.objects.filter(STATUS=EmailJob.SENT).count(), 3)
+        self.assertEqual(process_outbox(), (0, 0))
+
+    def test_failures_are_retried_with_backoff(self):
+        job = enqueue_email("Subject", "Body", None, ["vet@example.com"])
+        LocalOutboxBackend.fail_next()
+
+        with self.assertLogs("Outbox.utils", "WARNING"):
+            self.assertEqual(process_outbox(), (0, 1))
+
+        job.refresh_from_db()
+        self.assertEqual(job.STATUS, EmailJob.PENDING)
+        self.assertEqual(job.ATTEMPTS, 1)
+        self.assertIn("Simulated SMTP failure", job.LAST_ERROR)
+        self.assertGreater(job.NEXT_ATTEMPT_AT, timezone.now() + timedelta(seconds=20))
+        # Not due yet
+        self.assertEqual(process_outbox(), (0, 0))
+
+        EmailJob.objects.update(NEXT_ATTEMPT_AT=timezone.now())
+        self.assertEqual(process_outbox(), (1, 0))
+        job.refresh_from_db()
+        self.assertEqual((job.STATUS, job.ATTEMPTS), (EmailJob.SENT, 2))
+
+    def test_gives_up_after_max_attempts(self):
+        job = enqueue_email("Subject", "Body", None, ["vet@example.com"])
+        EmailJob.objects.update(MAX_ATTEMPTS=2, ATTEMPTS=1)
+        LocalOutboxBackend.fail_next()
+
+        with self.assertLogs("Outbox.utils", "ERROR"):
+            process_outbox()
+
+        job.refresh_from_db()
+        self.assertEqual(job.STATUS, EmailJob.FAILED)
+        self.assertEqual(mail.outbox, [])
+
+    def test_connection_failure_releases_the_batch_for_retry(self):
+        job = enqueue_email("Subject", "Body", None, ["vet@example.com"])
+
+        with mock.patch.object(
+            LocalOutboxBackend, "open", side_effect=ConnectionRefusedError("down")
+        ), self.assertLogs("Outbox.utils", "WARNING"):
+            self.assertEqual(process_outbox(), (0, 1))
+
+        job.refresh_from_db()
+        self.assertEqual((job.STATUS, job.ATTEMPTS), (EmailJob.PENDING, 1))
+        self.assertIsNone(job.LOCKED_AT)
+        self.assertIn("ConnectionRefusedError", job.LAST_ERROR)
+        self.assertGreater(job.NEXT_ATTEMPT_AT, timezone.now())
+
+    def test_failed_send_does_not_block_the_rest_of_the_batch(self):
+        enqueue_email("First", "Body", None, ["vet@example.com"])
+        enqueue_email("Second", "Body", None, ["vet@example.com"])
+        LocalOutboxBackend.fail_next()
+
+        with self.assertLogs("Outbox.utils", "WARNING"):
+            self.assertEqual(process_outbox(), (1, 1))
+        self.assertEqual([m.subject for m in mail.outbox], ["Second"])
+
+    def test_stale_claims_are_picked_up_again(self):
+        job = enqueue_email("Subject", "Body", None, ["vet@example.com"])
+        self.assertEqual(claim_jobs(10), [job])
+        self.assertEqual(claim_jobs(10), [])
+
+        EmailJob.objects.update(LOCKED_AT=timezone.now() - timedelta(hours=1))
+        self.assertEqual(claim_jobs(10), [job])
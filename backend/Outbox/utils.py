@@ -0,0 +1,205 @@
+import logging
+import random
+import threading
+from datetime import timedelta
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import EmailJob
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def enqueue_email(subject, body, from_email, recipients):
+    """
+    Queues an email and returns its job. Takes send_mail's arguments, costs
+    one INSERT, and leaves the SMTP work to the run_email_worker process.
+    """
+    if isinstance(recipients, str):
+        recipients = [recipients]
+    return EmailJob.objects.create(
+        SUBJECT=subject,
+        BODY=body,
+        FROM_EMAIL=from_email or settings.DEFAULT_FROM_EMAIL,
+        RECIPIENTS=list(recipients),
+        MAX_ATTEMPTS=_setting("OUTBOX_MAX_ATTEMPTS", 5),
+    )
+
+
+def backoff_delay(attempts):
+    """Exponential backoff with jitter, in seconds, after `attempts` failures."""
+    base = _setting("OUTBOX_RETRY_BASE_SECONDS", 30)
+    cap = _setting("OUTBOX_RETRY_MAX_SECONDS", 3600)
+    delay = min(cap, base * 2 ** (attempts - 1))
+    return delay * random.uniform(0.8, 1.2)
+
+
+def claim_jobs(limit):
+    """
+    Marks up to `limit` due jobs as sending and returns them. Rows are locked
+    with SKIP LOCKED, so concurrent workers never claim the same job. Jobs a
+    crashed worker left in "sending" are picked up again after
+    OUTBOX_LOCK_TIMEOUT seconds.
+    """
+    now = timezone.now()
+    stale = now - timedelta(seconds=_setting("OUTBOX_LOCK_TIMEOUT", 600))
+    with transaction.atomic():
+        jobs = list(
+            EmailJob.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(STATUS=EmailJob.PENDING, NEXT_ATTEMPT_AT__lte=now)
+                | Q(STATUS=EmailJob.SENDING, LOCKED_AT__lt=stale)
+            )
+            .order_by("NEXT_ATTEMPT_AT", "pk")[:limit]
+        )
+        for job in jobs:
+            job.STATUS = EmailJob.SENDING
+            job.LOCKED_AT = now
+        EmailJob.objects.bulk_update(jobs, ["STATUS", "LOCKED_AT"])
+    return jobs
+
+
+def send_jobs(jobs, connection):
+    """
+    Sends the claimed jobs over one open mail connection and records each
+    outcome. A failed job is retried with backoff until MAX_ATTEMPTS, then
+    marked failed. Returns (sent, failed).
+    """
+    sent, failed = [], []
+    for job in jobs:
+        message = EmailMessage(
+            job.SUBJECT,
+            job.BODY,
+            job.FROM_EMAIL,
+            job.RECIPIENTS,
+            connection=connection,
+        )
+        try:
+            message.send()
+        except Exception as e:
+            _record_failure(job, e)
+            failed.append(job)
+            _reconnect(connection)
+            continue
+
+        job.ATTEMPTS += 1
+        job.STATUS = EmailJob.SENT
+        job.SENT_AT = timezone.now()
+        job.LOCKED_AT = None
+        sent.append(job)
+
+    _save_outcomes(sent + failed)
+    return len(sent), len(failed)
+
+
+def _record_failure(job, error):
+    # Retried with backoff until MAX_ATTEMPTS, then failed for good
+    job.ATTEMPTS += 1
+    job.LAST_ERROR = f"{type(error).__name__}: {error}"
+    if job.ATTEMPTS >= job.MAX_ATTEMPTS:
+        job.STATUS = EmailJob.FAILED
+        logger.error(f"Email job {job.pk} failed for good: {job.LAST_ERROR}")
+    else:
+        job.STATUS = EmailJob.PENDING
+        job.NEXT_ATTEMPT_AT = timezone.now() + timedelta(
+            seconds=backoff_delay(job.ATTEMPTS)
+        )
+        logger.warning(
+            f"Email job {job.pk} attempt {job.ATTEMPTS} failed: {job.LAST_ERROR}"
+        )
+    job.LOCKED_AT = None
+
+
+def _save_outcomes(jobs):
+    EmailJob.objects.bulk_update(
+        jobs,
+        ["STATUS", "ATTEMPTS", "SENT_AT", "NEXT_ATTEMPT_AT", "LOCKED_AT", "LAST_ERROR"],
+    )
+
+
+def _reconnect(connection):
+    # The session may be broken after a failure, start a fresh one
+    connection.close()
+    try:
+        connection.open()
+    except Exception as e:
+        logger.warning(f"Could not reopen the mail connection: {e}")
+
+
+def get_mail_connection():
+    backend = _setting("OUTBOX_EMAIL_BACKEND", None)
+    return get_connection(backend)
+
+
+def process_outbox(batch_size=None, connection=None):
+    """
+    Claims and sends one batch of due jobs. The connection is opened once for
+    the batch so a whole batch shares one SMTP session. If it can't be opened,
+    every claimed job counts a failed attempt and is released for a retry with
+    backoff. Returns (sent, failed).
+    """
+    jobs = claim_jobs(batch_size or _setting("OUTBOX_BATCH_SIZE", 20))
+    if not jobs:
+        return 0, 0
+    own_connection = connection is None
+    connection = connection or get_mail_connection()
+    try:
+        try:
+            connection.open()
+        except Exception as e:
+            logger.warning(f"Could not open the mail connection: {e}")
+            for job in jobs:
+                _record_failure(job, e)
+            _save_outcomes(jobs)
+            return 0, len(jobs)
+        return send_jobs(jobs, connection)
+    finally:
+        if own_connection:
+            connection.close()
+
+
+def run_worker(stop, batch_size=None, poll_interval=None):
+    """
+    Worker loop for one thread: keeps a mail connection open while there is
+    work, closes it when the queue is idle, and returns when `stop` is set.
+    """
+    poll_interval = poll_interval or _setting("OUTBOX_POLL_INTERVAL", 2.0)
+    connection = get_mail_connection()
+    try:
+        while not stop.is_set():
+            close_old_connections()
+            try:
+                sent, failed = process_outbox(batch_size, connection)
+            except Exception:
+                logger.exception("Email worker batch failed.")
+                sent = failed = 0
+            if not sent and not failed:
+                connection.close()
+                stop.wait(poll_interval)
+    finally:
+        connection.close()
+        close_old_connections()
+
+
+def run_workers(workers, stop, batch_size=None, poll_interval=None):
+    """Runs `workers` worker threads until `stop` is set."""
+    threads = [
+        threading.Thread(
+            target=run_worker,
+            args=(stop, batch_size, poll_interval),
+            name=f"email-worker-{number}",
+            daemon=True,
+        )
+        for number in range(workers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
@@ -0,0 +1,71 @@
+import os
+
+# Connections the database plan allows in total, shared by every web worker
+DEFAULT_MAX_CONNECTIONS = 20
+
+
+def env_flag(name, default):
+    return os.getenv(name, default) == "True"
+
+
+def pool_sizes():
+    """
+    Per-worker pool sizes. DB_POOL_MAX_SIZE wins when set; otherwise the
+    DB_MAX_CONNECTIONS budget is split over the WEB_CONCURRENCY gunicorn
+    workers, less DB_RESERVED_CONNECTIONS kept for the email worker,
+    migrations and management commands.
+    """
+    workers = max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+    budget = int(os.getenv("DB_MAX_CONNECTIONS", str(DEFAULT_MAX_CONNECTIONS)))
+    reserved = int(os.getenv("DB_RESERVED_CONNECTIONS", "3"))
+    max_size = int(
+        os.getenv("DB_POOL_MAX_SIZE") or max(1, (budget - reserved) // workers)
+    )
+    min_size = min(int(os.getenv("DB_POOL_MIN_SIZE", "1")), max_size)
+    return min_size, max_size
+
+
+def database_config(prefix="DB"):
+    """
+    Builds a DATABASES entry from the `<prefix>_NAME`, `_USER`, `_PASSWORD`,
+    `_HOST` and `_PORT` environment variables, with connection reuse. Unset
+    ones fall back to the DB_ variables.
+
+    By default connections persist for DB_CONN_MAX_AGE seconds and are checked
+    with a ping before reuse (DB_CONN_HEALTH_CHECKS), so a request no longer
+    pays a TCP and auth handshake. DB_POOL=True uses psycopg's connection pool
+    instead, sized per worker by pool_sizes(); it needs psycopg 3 with the
+    pool extra (`psycopg[pool]`) in place of psycopg2. DB_CONN_MAX_AGE=0
+    without a pool opens a connection per request, as before.
+    """
+
+    def env(key):
+        # Unset replica settings fall back to the primary's
+        return os.getenv(f"{prefix}_{key}") or os.getenv(f"DB_{key}")
+
+    config = {
+        "ENGINE": "django.db.backends.postgresql",
+        "NAME": env("NAME"),
+        "USER": env("USER"),
+        "PASSWORD": env("PASSWORD"),
+        "HOST": env("HOST"),
+        "PORT": env("PORT"),
+    }
+    if env_flag("DB_POOL", "False"):
+        min_size, max_size = pool_sizes()
+        # Django refuses persistent connections on top of a pool
+        config["CONN_MAX_AGE"] = 0
+        config["OPTIONS"] = {
+            "pool": {
+                "min_size": min_size,
+                "max_size": max_size,
+                "timeout": float(os.getenv("DB_POOL_TIMEOUT", "10")),
+                # Idle connections above min_size are closed after this
+                "max_idle": float(os.getenv("DB_POOL_MAX_IDLE", "300")),
+            }
+        }
+    else:
+        config["CONN_MAX_AGE"] = int(os.getenv("DB_CONN_MAX_AGE", "60"))
+    # Pings a reused connection first, or checks connections leaving the pool
+    config["CONN_HEALTH_CHECKS"] = env_flag("DB_CONN_HEALTH_CHECKS", "True")
+    return config
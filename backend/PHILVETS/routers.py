@@ -0,0 +1,129 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.permissions import SAFE_METHODS
+
+REPLICA_ALIAS = "replica"
+PIN_COOKIE = "db_pin"
+
+# Set for views and blocks whose reads may go to the replica
+_replica_reads = ContextVar("replica_reads", default=False)
+# Pinning state of the current request or use_replica() block
+_state = ContextVar("replica_state", default=None)
+
+
+class PinState:
+    def __init__(self, pinned=False):
+        self.pinned = pinned  # Unsafe request, or the client wrote recently
+        self.wrote = False
+
+
+def replica_configured():
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+@contextmanager
+def use_replica():
+    """
+    Sends the reads inside the block to the replica, when one is set up, up to
+    the first write. Outside a request the block tracks its own writes.
+    """
+    reads_token = _replica_reads.set(True)
+    state_token = _state.set(PinState()) if _state.get() is None else None
+    try:
+        yield
+    finally:
+        _replica_reads.reset(reads_token)
+        if state_token is not None:
+            _state.reset(state_token)
+
+
+@contextmanager
+def use_primary():
+    """Keeps the reads inside the block on the primary."""
+    token = _replica_reads.set(False)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Reads made inside use_replica() go to the "replica" database; everything
+    else, writes included, goes to the primary.
+
+    Reads stay on the primary after a write, for the rest of the request and,
+    through ReplicaPinningMiddleware, for REPLICA_PIN_SECONDS afterwards so a
+    client always sees its own writes despite replication lag. They also stay
+    on the primary inside a transaction, which the replica can't see.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if not _replica_reads.get() or state is None or not replica_configured():
+            return None
+        if state.pinned or state.wrote:
+            return None
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return REPLICA_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both databases hold the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica gets its schema through replication
+        if db == REPLICA_ALIAS:
+            return False
+        return None
+
+
+class ReplicaReadMixin:
+    """
+    Serves a view's GET requests from the replica. Add it before APIView in
+    the bases of read-heavy reporting and list views.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in SAFE_METHODS:
+            return super().dispatch(request, *args, **kwargs)
+        with use_replica():
+            return super().dispatch(request, *args, **kwargs)
+
+
+class ReplicaPinningMiddleware:
+    """
+    Pins a client to the primary after it writes. Requests carrying the pin
+    cookie, and all unsafe requests, read from the primary; a request that
+    wrote sets the cookie for REPLICA_PIN_SECONDS.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        pinned = PIN_COOKIE in request.COOKIES or request.method not in SAFE_METHODS
+        state = PinState(pinned)
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        if state.wrote:
+            response.set_cookie(
+                PIN_COOKIE,
+                "1",
+                max_age=getattr(settings, "REPLICA_PIN_SECONDS", 15),
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
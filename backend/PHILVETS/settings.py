@@ -14,6 +14,8 @@ from pathlib import Path
 import os
 from dotenv import load_dotenv
 
+from .database import database_config
+
 # Load .env file
 load_dotenv()
 
@@ -44,6 +46,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "rest_framework",
     "rest_framework_simplejwt",  # for token
     "debug_toolbar",  # for debugging check inside the middleware also.
@@ -65,6 +68,12 @@ INSTALLED_APPS = [
     "Admin.Logs",
     "Admin.Report",
     "Admin.Issue",
+    "Admin.Sequence",
+    "Admin.Dashboard",
+    "Admin.Search",
+    "Admin.Monitoring",
+    "Outbox",
+    "Benchmark",
 ]
 
 REST_FRAMEWORK = {
@@ -107,6 +116,17 @@ SIMPLE_JWT = {
     # 'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
 }
 
+# How CookieJWTAuthentication finds the request's user: "cache" keeps it for
+# AUTH_USER_CACHE_TIMEOUT seconds, dropped when the user is saved; "stateless"
+# builds it from the token's claims, so changes only apply to new tokens;
+# "off" queries the user on every request. "cache" is only the default with
+# REDIS_URL: a per-process locmem cache would drop the user in the worker that
+# saved it and keep a deactivated user signed in on the others.
+AUTH_USER_CACHE = os.getenv(
+    "AUTH_USER_CACHE", "cache" if os.getenv("REDIS_URL") else "off"
+)
+AUTH_USER_CACHE_TIMEOUT = int(os.getenv("AUTH_USER_CACHE_TIMEOUT", "60"))
+
 # Email configuration
 EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
 EMAIL_HOST = "smtp.gmail.com"
@@ -116,7 +136,35 @@ EMAIL_HOST_USER = os.getenv("EMAIL_HOST_USER")
 EMAIL_HOST_PASSWORD = os.getenv("EMAIL_HOST_PASSWORD")
 DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
 
+# Emails are queued in EMAIL_JOB and sent by `manage.py run_email_worker`.
+# OUTBOX_EMAIL_BACKEND overrides EMAIL_BACKEND for the worker, e.g.
+# "Outbox.backends.LocalOutboxBackend" to run without SMTP locally.
+OUTBOX_EMAIL_BACKEND = os.getenv("OUTBOX_EMAIL_BACKEND")
+OUTBOX_WORKERS = int(os.getenv("OUTBOX_WORKERS", "2"))
+OUTBOX_BATCH_SIZE = 20
+OUTBOX_MAX_ATTEMPTS = 5
+OUTBOX_RETRY_BASE_SECONDS = 30  # Doubles on every failed attempt
+OUTBOX_RETRY_MAX_SECONDS = 3600
+OUTBOX_POLL_INTERVAL = 2.0
+OUTBOX_LOCK_TIMEOUT = 600  # Seconds before a job claimed by a dead worker is retried
+
+# Requests per window (seconds) on the OTP endpoints, counted in the cache per
+# client IP and per email; over the limit they get a 429 without a DB query.
+# Share the counters between workers by setting REDIS_URL.
+OTP_RATE_LIMITS = {
+    "send": {"per_ip": 20, "per_email": 5, "window": 3600},
+    "verify": {"per_ip": 50, "per_email": 10, "window": 900},
+}
+
+# Reverse proxies in front of the app that append to X-Forwarded-For. The
+# client's address is the entry the outermost of them added, counted from the
+# right; entries further left come from the client and can't be trusted. 0
+# ignores the header and uses the socket address.
+TRUSTED_PROXY_HOPS = int(os.getenv("TRUSTED_PROXY_HOPS", "1"))
+
 MIDDLEWARE = [
+    "Admin.Monitoring.middleware.InstrumentationMiddleware",  # Request metrics
+    "PHILVETS.routers.ReplicaPinningMiddleware",  # Read-your-writes on the replica
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
@@ -166,17 +214,26 @@ WSGI_APPLICATION = "PHILVETS.wsgi.application"
 
 
 # P@ssTh1s*** - Venice Pass || P@ssw0rd - Edie
+# Connection reuse is configured from the environment, see PHILVETS/database.py:
+# DB_CONN_MAX_AGE and DB_CONN_HEALTH_CHECKS for persistent connections, or
+# DB_POOL=True with DB_POOL_MIN_SIZE / DB_POOL_MAX_SIZE (or DB_MAX_CONNECTIONS
+# split over WEB_CONCURRENCY workers) for psycopg's pool
 DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.postgresql",
-        "NAME": os.getenv("DB_NAME"),
-        "USER": os.getenv("DB_USER"),
-        "PASSWORD": os.getenv("DB_PASSWORD"),
-        "HOST": os.getenv("DB_HOST"),
-        "PORT": os.getenv("DB_PORT"),
-    }
+    "default": database_config(),
 }
 
+# Optional read replica for the reporting and list views (ReplicaReadMixin).
+# DB_REPLICA_HOST enables it; DB_REPLICA_NAME, _USER, _PASSWORD and _PORT
+# default to the primary's. Clients read from the primary for
+# REPLICA_PIN_SECONDS after they write.
+if os.getenv("DB_REPLICA_HOST"):
+    DATABASES["replica"] = {
+        **database_config("DB_REPLICA"),
+        "TEST": {"MIRROR": "default"},
+    }
+DATABASE_ROUTERS = ["PHILVETS.routers.ReplicaRouter"]
+REPLICA_PIN_SECONDS = int(os.getenv("REPLICA_PIN_SECONDS", "15"))
+
 # DATABASES = {
 #     "default": {
 #         "ENGINE": "django.db.backends.postgresql",
@@ -188,6 +245,55 @@ DATABASES = {
 #     }
 # }
 
+# ID allocation for inventory, batch and sales invoice IDs: "counter" (row-locked
+# ID_COUNTER table) or "sequence" (native PostgreSQL sequences)
+ID_ALLOCATOR = os.getenv("ID_ALLOCATOR", "counter")
+
+# Cache for the dashboard counters. locmem is per process, so with several
+# workers set REDIS_URL (Redis or any server speaking its protocol) to share
+# one cache and its invalidations.
+if os.getenv("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.getenv("REDIS_URL"),
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "philvets",
+        }
+    }
+
+# Keep the latest OTP of each user in the cache, so verifying skips the OTP
+# table. Only safe with a cache shared by all workers: a per-process locmem
+# entry would outlive a resend handled by another worker.
+OTP_HOT_STORE = bool(os.getenv("REDIS_URL"))
+
+# Seconds a dashboard counter may stay cached; writes that skip model signals
+# (bulk_create, update()) show up at the latest after this
+DASHBOARD_COUNTER_TIMEOUT = int(os.getenv("DASHBOARD_COUNTER_TIMEOUT", "300"))
+
+# Request instrumentation, served on /monitoring/metrics to staff users or to
+# scrapers sending "Authorization: Bearer <METRICS_TOKEN>"
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "True") == "True"
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+METRICS_WINDOW = int(os.getenv("METRICS_WINDOW", "1000"))  # Samples per endpoint
+METRICS_SLOW_REQUEST_MS = int(os.getenv("METRICS_SLOW_REQUEST_MS", "500"))
+METRICS_SLOW_QUERY_COUNT = int(os.getenv("METRICS_SLOW_QUERY_COUNT", "50"))
+
+# Audit logs are buffered and written in batches by a background thread
+# (Admin.Logs.utils.log_event); False writes each log inline
+AUDIT_LOG_ASYNC = os.getenv("AUDIT_LOG_ASYNC", "True") == "True"
+AUDIT_LOG_BATCH_SIZE = int(os.getenv("AUDIT_LOG_BATCH_SIZE", "200"))
+AUDIT_LOG_FLUSH_INTERVAL = float(os.getenv("AUDIT_LOG_FLUSH_INTERVAL", "2.0"))
+AUDIT_LOG_MAX_QUEUE = int(os.getenv("AUDIT_LOG_MAX_QUEUE", "10000"))
+# Months of logs kept in the table; older ones are moved to
+# MEDIA_ROOT/log_archive by the archive_logs command
+LOG_RETENTION_MONTHS = int(os.getenv("LOG_RETENTION_MONTHS", "12"))
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
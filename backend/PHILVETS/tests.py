@@ -0,0 +1,89 @@
+from unittest import mock, skipUnless
+from django.db import connections
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TransactionTestCase
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from Account.models import User
+from Admin.Logs.models import Logs
+from .routers import (
+    PIN_COOKIE,
+    REPLICA_ALIAS,
+    ReplicaPinningMiddleware,
+    ReplicaRouter,
+    replica_configured,
+    use_replica,
+)
+
+
+@mock.patch("PHILVETS.routers.replica_configured", return_value=True)
+class ReplicaRouterTest(SimpleTestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+
+    def test_reads_go_to_replica_only_when_asked(self, _):
+        self.assertIsNone(self.router.db_for_read(Logs))
+        with use_replica():
+            self.assertEqual(self.router.db_for_read(Logs), REPLICA_ALIAS)
+        self.assertEqual(self.router.db_for_write(Logs), "default")
+        self.assertFalse(self.router.allow_migrate(REPLICA_ALIAS, "Logs"))
+
+    def test_write_pins_the_client_to_the_primary(self, _):
+        def view(request):
+            with use_replica():
+                before = self.router.db_for_read(Logs)
+                self.router.db_for_write(Logs)
+                after = self.router.db_for_read(Logs)
+            return HttpResponse(f"{before} {after}")
+
+        middleware = ReplicaPinningMiddleware(view)
+        factory = RequestFactory()
+
+        response = middleware(factory.get("/"))
+        self.assertEqual(response.content, b"replica None")
+        self.assertIn(PIN_COOKIE, response.cookies)
+
+        # A pinned client reads from the primary from the start
+        request = factory.get("/")
+        request.COOKIES[PIN_COOKIE] = "1"
+        self.assertEqual(middleware(request).content, b"None None")
+
+
+@skipUnless(replica_configured(), "set DB_REPLICA_HOST to test against a replica")
+@override_settings(AUDIT_LOG_ASYNC=False)
+class ReplicaReadTest(TransactionTestCase):
+    databases = {"default", REPLICA_ALIAS} if replica_configured() else {"default"}
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="reporter",
+            password="password123",
+            email="reporter@example.com",
+            first_name="Report",
+            last_name="User",
+        )
+
+    def test_list_reads_from_replica_until_client_writes(self):
+        replica = connections[REPLICA_ALIAS]
+        with CaptureQueriesContext(replica) as queries:
+            response = self.client.get("/logs/logs/")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(queries.captured_queries)
+
+        response = self.client.post(
+            "/logs/logs/",
+            {
+                "LLOG_TYPE": "User logs",
+                "LOG_DESCRIPTION": "Logged in",
+                "USER_ID": self.user.pk,
+            },
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertIn(PIN_COOKIE, response.cookies)
+
+        # The client sees its own write, read from the primary
+        with CaptureQueriesContext(replica) as queries:
+            response = self.client.get("/logs/logs/")
+        self.assertEqual(queries.captured_queries, [])
+        self.assertEqual(len(response.data), 1)
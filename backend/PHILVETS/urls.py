@@ -37,6 +37,9 @@ urlpatterns = [
     path("logs/", include("Admin.Logs.urls")),
     path("report/", include("Admin.Report.urls")),
     path("sales/", include("Admin.Sales.urls")),
+    path("dashboard/", include("Admin.Dashboard.urls")),
+    path("search/", include("Admin.Search.urls")),
+    path("monitoring/", include("Admin.Monitoring.urls")),
 ]
 
 # Serve media files during development